@@ -0,0 +1,53 @@
+"""
+Virtual network allocation engine
+
+The public names below are loaded on first access, so `import Allocation`
+does not import NumPy, SciPy or any solver module until one is used:
+
+    from Allocation import VirtualNetworkAllocation, load_network
+    allocator = VirtualNetworkAllocation(load_network('red.json'))
+"""
+import importlib
+
+# Public name -> defining submodule
+_EXPORTS = {
+    'VirtualNetworkAllocation': 'allocation',
+    'SparseVirtualNetworkAllocation': 'sparse_allocation',
+    'Demand': 'demands',
+    'DemandTable': 'demands',
+    'AllocationResult': 'result',
+    'load_network': 'network_io',
+    'save_network': 'network_io',
+    'ResultCache': 'result_cache',
+    'AdmissionServer': 'server',
+    'VirtualNetworkEmbedder': 'embedding',
+    'reoptimize': 'reoptimization',
+    'solve_mcf': 'mcf',
+    'splittable_allocation': 'mcf',
+    'upper_bounds': 'mcf',
+    'column_generation_allocation': 'column_generation',
+    'save_snapshot': 'snapshot',
+    'load_snapshot': 'snapshot',
+    'SharedTopology': 'shared_topology',
+}
+
+__all__ = sorted(_EXPORTS)
+
+
+def __getattr__(name):
+    module_name = _EXPORTS.get(name)
+    if module_name is None:
+        try:
+            # Submodules are also reachable as attributes (Allocation.mcf)
+            return importlib.import_module(f'{__name__}.{name}')
+        except ModuleNotFoundError as e:
+            if e.name != f'{__name__}.{name}':
+                raise
+            raise AttributeError(f"module {__name__!r} has no attribute {name!r}") from None
+    value = getattr(importlib.import_module(f'{__name__}.{module_name}'), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_EXPORTS))
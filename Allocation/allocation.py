@@ -1,58 +1,90 @@
 import itertools
-import copy
+from collections import deque
 from typing import List, Dict, Tuple, Optional
 import numpy as np
 
+from Allocation.demands import DemandTable
+from Allocation.result import AllocationResult
+
+def _clean_capacity_array(capacity_matrix_raw) -> np.ndarray:
+    """
+    Convert a raw capacity matrix into a new float numpy array
+    Blank cells (empty strings, None) and unparseable values become 0
+    """
+    # SciPy sparse matrices expose toarray(); avoid importing scipy just to check
+    if hasattr(capacity_matrix_raw, 'toarray'):
+        matrix = np.array(capacity_matrix_raw.toarray(), dtype=float)
+    elif isinstance(capacity_matrix_raw, np.ndarray) and capacity_matrix_raw.dtype.kind in 'biuf':
+        # Always a private copy: the caller may keep editing its array
+        matrix = np.array(capacity_matrix_raw, dtype=float)
+    else:
+        try:
+            # Fast path: clean numeric nested lists
+            matrix = np.array(capacity_matrix_raw, dtype=float)
+            if np.isnan(matrix).any():
+                # None also turns into NaN here; tell it apart from real NaN cells
+                raise ValueError
+        except (ValueError, TypeError):
+            # Slow path: mixed cells such as "", None or "abc" coming from the GUI
+            cells = np.array(capacity_matrix_raw, dtype=object)
+            blanks = (cells == "") | np.equal(cells, None)
+            cells[blanks] = 0.0
+            try:
+                matrix = cells.astype(float)
+            except (ValueError, TypeError):
+                matrix = np.vectorize(_cell_to_float, otypes=[float])(cells)
+
+    if matrix.ndim != 2 or matrix.shape[0] != matrix.shape[1]:
+        raise ValueError(f"La matriz de capacidad debe ser cuadrada, recibida con forma {matrix.shape}")
+    return matrix
+
+
+def _cell_to_float(cell) -> float:
+    try:
+        return float(cell)
+    except (ValueError, TypeError):
+        return 0.0
+
+
+def _edges_to_capacity_array(edges, num_nodes: Optional[int] = None) -> np.ndarray:
+    """
+    Build a capacity matrix from an edge list of (source, destination, capacity)
+    Each entry is a directed link; list both directions for bidirectional links
+    """
+    edge_array = np.asarray(edges, dtype=float).reshape(-1, 3)
+    sources = edge_array[:, 0].astype(np.intp)
+    destinations = edge_array[:, 1].astype(np.intp)
+    if num_nodes is None:
+        num_nodes = int(max(sources.max(initial=-1), destinations.max(initial=-1))) + 1
+
+    matrix = np.zeros((num_nodes, num_nodes), dtype=float)
+    matrix[sources, destinations] = np.nan_to_num(edge_array[:, 2], nan=0.0)
+    return matrix
+
+
 class VirtualNetworkAllocation:
+    # Topology arrays persisted by Allocation.snapshot besides the capacities
+    _snapshot_arrays = ('adjacency_matrix', 'component_labels')
+    
     def __init__(self, network_data: Dict):
         """
         Initialize the Virtual Network Allocation system
         
         Args:
-            network_data: Dictionary containing network information
-        """
-        # Convert empty strings to 0 in the capacity matrix
-        capacity_matrix_raw = network_data['capacity_matrix']
-        capacity_matrix_processed = []
-        
-        for row in capacity_matrix_raw:
-            processed_row = []
-            for cell in row:
-                if cell == "" or cell is None:
-                    processed_row.append(0)
-                else:
-                    try:
-                        processed_row.append(float(cell))
-                    except (ValueError, TypeError):
-                        processed_row.append(0)
-            capacity_matrix_processed.append(processed_row)
-        
-        # Store the processed capacity matrix as numpy arrays
-        self.capacity_matrix = np.array(capacity_matrix_processed, dtype=float)
-        self.original_capacity_matrix = np.array(capacity_matrix_processed, dtype=float)
-        
-        # Convert demands to the expected format
-        demands_formatted = []
-        for demand in network_data['demands']:
-            if len(demand) >= 3:
-                demands_formatted.append({
-                    'source': int(demand[0]),
-                    'destination': int(demand[1]),
-                    'bandwidth': float(demand[2]),
-                    'duration': 1,  # Default value
-                    'price_per_unit': 1.0  # Default value
-                })
-        
-        self.demands = demands_formatted
+            network_data: Dictionary containing network information.
+                'capacity_matrix' may be a nested list, a numpy array or a
+                SciPy sparse matrix; alternatively 'edges' may hold a list of
+                (source, destination, capacity) with an optional 'num_nodes'
+        """
+        self._load_topology(network_data)
         
-        # Create adjacency matrix based on capacities (1 if link exists, 0 otherwise)
-        self.adjacency_matrix = (self.capacity_matrix > 0).astype(int)
-        self.num_nodes = len(self.capacity_matrix)
+        # Demands are kept in a compact structured table; rows with fewer than
+        # three fields are skipped and duration/price take their defaults
+        self.demands = DemandTable.from_rows(network_data['demands'])
         
         # Calculate network statistics
-        self.total_links = np.sum(self.adjacency_matrix) // 2  # Divide by 2 if undirected
-        self.total_capacity = np.sum(self.capacity_matrix)
-        self.total_demand = sum([d['bandwidth'] for d in self.demands])
+        self.total_demand = float(self.demands.bandwidths.sum())
+        self.component_labels = self._label_components()
         self.network_connected = self._check_connectivity()
         
         # Track allocations and statistics
@@ -60,28 +92,128 @@ class VirtualNetworkAllocation:
         self.rejected_demands = []
         self.current_revenue = 0
         self.current_cost = 0
+        # Path currently reserved for each allocated demand, keyed by demand index
+        self.allocation_paths = {}
+    
+    def _load_topology(self, network_data: Dict) -> None:
+        """
+        Build the capacity storage and topology statistics from network_data
+        The dense backend keeps n x n capacity and adjacency matrices
+        """
+        if 'capacity_matrix' in network_data:
+            capacity_matrix = _clean_capacity_array(network_data['capacity_matrix'])
+        else:
+            capacity_matrix = _edges_to_capacity_array(network_data['edges'],
+                                                       network_data.get('num_nodes'))
+        
+        # The original capacities are read-only and shared with the residual
+        # matrix until the first allocation writes to it (copy-on-write)
+        capacity_matrix.flags.writeable = False
+        self.original_capacity_matrix = capacity_matrix
+        self._capacity_matrix = capacity_matrix
+        
+        # Create adjacency matrix based on capacities (True if link exists)
+        self.adjacency_matrix = self.original_capacity_matrix > 0
+        self.num_nodes = len(self.original_capacity_matrix)
+        
+        self.total_links = np.count_nonzero(self.adjacency_matrix) // 2  # Divide by 2 if undirected
+        self.total_capacity = np.sum(self.original_capacity_matrix)
+    
+    @property
+    def capacity_matrix(self) -> np.ndarray:
+        """
+        Residual capacity matrix
+        Read-only while it still shares memory with the original capacities
+        """
+        return self._capacity_matrix
+    
+    @capacity_matrix.setter
+    def capacity_matrix(self, matrix: np.ndarray) -> None:
+        self._capacity_matrix = matrix
+    
+    def _writable_capacity_matrix(self) -> np.ndarray:
+        """
+        Return the residual capacity matrix, copying it first if it is still
+        shared with the original capacities
+        """
+        if self._capacity_matrix is self.original_capacity_matrix:
+            self._capacity_matrix = self.original_capacity_matrix.copy()
+        return self._capacity_matrix
+    
+    def _neighbors(self, node: int) -> np.ndarray:
+        """
+        Return the nodes reachable from node over a link with residual capacity
+        """
+        return np.flatnonzero(self.adjacency_matrix[node] & (self.capacity_matrix[node] > 0))
+    
+    def _link_endpoints(self) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Return the (sources, destinations) arrays of every directed link
+        """
+        return np.nonzero(self.adjacency_matrix)
+    
+    def _label_components(self) -> np.ndarray:
+        """
+        Label the connected components of the network with union-find
+        Link direction is ignored, so two nodes with different labels can never
+        reach each other; labels are numbered in order of their first node
+        """
+        parent = list(range(self.num_nodes))
+        
+        def find(node):
+            while parent[node] != node:
+                parent[node] = parent[parent[node]]
+                node = parent[node]
+            return node
+        
+        sources, destinations = self._link_endpoints()
+        for u, v in zip(sources.tolist(), destinations.tolist()):
+            root_u, root_v = find(u), find(v)
+            if root_u != root_v:
+                parent[max(root_u, root_v)] = min(root_u, root_v)
+        
+        roots = np.array([find(node) for node in range(self.num_nodes)], dtype=np.int64)
+        return np.unique(roots, return_inverse=True)[1].reshape(-1).astype(np.int32)
+    
+    @property
+    def component_sizes(self) -> np.ndarray:
+        """
+        Number of nodes of each connected component, indexed by component label
+        """
+        return np.bincount(self.component_labels)
+    
+    @property
+    def num_components(self) -> int:
+        return len(self.component_sizes)
+    
+    def is_reachable(self, source: int, destination: int) -> bool:
+        """
+        O(1) precheck: False if source and destination lie in different components
+        """
+        return self.component_labels[source] == self.component_labels[destination]
     
     def _check_connectivity(self) -> bool:
         """
-        Check if the network is connected using DFS
+        Check if the network is connected using an iterative BFS
         Returns True if all nodes are reachable from node 0
         """
         if self.num_nodes <= 1:
             return True
-        
-        visited = [False] * self.num_nodes
-        
-        def dfs(node):
-            visited[node] = True
-            for neighbor in range(self.num_nodes):
-                if not visited[neighbor] and self.adjacency_matrix[node][neighbor] == 1:
-                    dfs(neighbor)
-        
-        # Start DFS from the first node
-        dfs(0)
+        if self.num_components > 1:
+            return False
+        
+        visited = np.zeros(self.num_nodes, dtype=bool)
+        visited[0] = True
+        frontier = deque([0])
+        while frontier:
+            node = frontier.popleft()
+            for neighbor in self._neighbors(node):
+                if not visited[neighbor]:
+                    visited[neighbor] = True
+                    frontier.append(neighbor)
         
         # Check if all nodes were visited
-        return all(visited)
+        return bool(visited.all())
     
     def calculate_path_cost(self, path: List[int], demand_bandwidth: float) -> float:
         """
@@ -99,6 +231,7 @@ class VirtualNetworkAllocation:
         """
         Calculate revenue from a demand
         Revenue = bandwidth * duration * price per unit
+        Every solver and the admission server credit accepted demands with it
         """
         return demand.get('bandwidth', 0) * demand.get('duration', 1) * demand.get('price_per_unit', 1.0)
     
@@ -120,10 +253,9 @@ class VirtualNetworkAllocation:
                 all_paths.append(path.copy())
                 return
             
-            for next_node in range(self.num_nodes):
-                if (next_node not in visited and 
-                    self.adjacency_matrix[current_node][next_node] == 1 and
-                    self.capacity_matrix[current_node][next_node] > 0):
+            for next_node in self._neighbors(current_node):
+                next_node = int(next_node)
+                if next_node not in visited:
                     
                     visited.add(next_node)
                     path.append(next_node)
@@ -134,40 +266,61 @@ class VirtualNetworkAllocation:
         visited = {source}
         dfs(source, destination, [source], visited)
         return all_paths
-    
+
+    def find_shortest_path(self, source: int, destination: int, bandwidth: float = 0.0) -> Optional[List[int]]:
+        """
+        Find the path with the fewest hops whose links can all carry bandwidth
+        Breadth-first search on the residual network; returns None if there is none
+        """
+        if source == destination:
+            return [source]
+        if not self.is_reachable(source, destination):
+            return None
+
+        capacity_matrix = self.capacity_matrix
+        previous = {source: None}
+        queue = deque([source])
+        while queue:
+            node = queue.popleft()
+            for next_node in self._neighbors(node):
+                next_node = int(next_node)
+                if next_node in previous or not self.can_allocate_path_on_matrix(
+                        [node, next_node], bandwidth, capacity_matrix):
+                    continue
+                previous[next_node] = node
+                if next_node == destination:
+                    path = [destination]
+                    while previous[path[-1]] is not None:
+                        path.append(previous[path[-1]])
+                    return path[::-1]
+                queue.append(next_node)
+        return None
+
     def can_allocate_path(self, path: List[int], bandwidth: float) -> bool:
         """
         Check if a path has enough capacity for the bandwidth requirement
         Returns True if all links in the path have enough capacity
         """
-        for i in range(len(path) - 1):
-            node_from, node_to = path[i], path[i + 1]
-            if self.capacity_matrix[node_from][node_to] < bandwidth:
-                return False
-        return True
+        return self.can_allocate_path_on_matrix(path, bandwidth, self.capacity_matrix)
     
     def allocate_path(self, path: List[int], bandwidth: float) -> None:
         """
         Allocate bandwidth on a path by reducing capacity on each link
         If the network is undirected, also reduce the reverse direction
         """
-        for i in range(len(path) - 1):
-            node_from, node_to = path[i], path[i + 1]
-            self.capacity_matrix[node_from][node_to] -= bandwidth
-            # If the network is undirected, also reduce the reverse direction
-            if self.capacity_matrix[node_to][node_from] > 0:
-                self.capacity_matrix[node_to][node_from] -= bandwidth
+        self.allocate_path_on_matrix(path, bandwidth, self._writable_capacity_matrix())
     
     def deallocate_path(self, path: List[int], bandwidth: float) -> None:
         """
         Deallocate bandwidth from a path by restoring capacity on each link
         If the network is undirected, also restore the reverse direction
         """
+        capacity_matrix = self._writable_capacity_matrix()
         for i in range(len(path) - 1):
             node_from, node_to = path[i], path[i + 1]
-            self.capacity_matrix[node_from][node_to] += bandwidth
+            capacity_matrix[node_from][node_to] += bandwidth
             if self.original_capacity_matrix[node_to][node_from] > 0:
-                self.capacity_matrix[node_to][node_from] += bandwidth
+                capacity_matrix[node_to][node_from] += bandwidth
     
     def can_allocate_path_on_matrix(self, path: List[int], bandwidth: float, capacity_matrix: np.ndarray) -> bool:
         """
@@ -204,8 +357,7 @@ class VirtualNetworkAllocation:
         
         valid_scenario = True
         for demand_idx, path in allocation_scenario:
-            demand = self.demands[demand_idx]
-            bandwidth = demand.get('bandwidth', 0)
+            bandwidth = float(self.demands.bandwidths[demand_idx])
             
             if self.can_allocate_path_on_matrix(path, bandwidth, temp_capacity):
                 self.allocate_path_on_matrix(path, bandwidth, temp_capacity)
@@ -213,7 +365,7 @@ class VirtualNetworkAllocation:
                 # Calculate cost and revenue for the allocation
                 cost = self.calculate_path_cost(path, bandwidth)
                 
-                total_revenue += cost
+                total_revenue += self.calculate_revenue(self.demands[demand_idx])
                 total_cost += cost
                 allocated_demands.append((demand_idx, path))
             else:
@@ -243,39 +395,14 @@ class VirtualNetworkAllocation:
             'temp_capacity_matrix': temp_capacity
         }
     
-    def offline_brute_force_allocation(self) -> Dict:
+    def _search_scenarios(self, demand_paths: List[Tuple[int, List[List[int]]]],
+                          upper_bound: Optional[int] = None,
+                          checkpoint_path: Optional[str] = None,
+                          checkpoint_every: int = 100000) -> Tuple[Optional[List[Tuple]], Dict, int, int]:
         """
-        Perform offline brute-force allocation to find the optimal scenario
-        Tries all possible combinations of demand allocations and selects the best one
+        Enumerate every combination of the candidate paths in demand_paths
+        Returns the best scenario, its metrics and the number of combinations evaluated and valid
         """
-        print("Iniciando asignación offline por fuerza bruta...")
-        
-        # Generate all possible paths for each demand
-        demand_paths = []
-        for i, demand in enumerate(self.demands):
-            source = demand.get('source')
-            destination = demand.get('destination')
-            
-            if source is None or destination is None:
-                print(f"Advertencia: Demanda {i} sin origen o destino")
-                continue
-                
-            paths = self.find_all_paths(source, destination)
-            if paths:
-                demand_paths.append((i, paths))
-            else:
-                print(f"No se encontraron caminos para demanda {i} de {source} a {destination}")
-        
-        if not demand_paths:
-            return {
-                'success': False,
-                'message': 'No se encontraron caminos válidos para ninguna demanda',
-                'acceptance_ratio': 0,
-                'allocated_demands': [],
-                'rejected_demands': list(range(len(self.demands))),
-                'allocation_details': []
-            }
-        
         best_scenario = None
         best_metrics = {
             'acceptance_ratio': -1,
@@ -285,18 +412,34 @@ class VirtualNetworkAllocation:
         # Generate options for each demand (including not assigning)
         demand_options = []
         for demand_idx, paths in demand_paths:
-            options = [(demand_idx, None)]  # Option to not assign
-            for path in paths:
-                options.append((demand_idx, path))  # Options to assign on different paths
+            options = [(demand_idx, path) for path in paths]  # Options to assign on different paths
+            # Option to not assign; with a bound, fuller scenarios are tried first
+            if upper_bound is None:
+                options.insert(0, (demand_idx, None))
+            else:
+                options.append((demand_idx, None))
             demand_options.append(options)
         
-        print(f"Evaluando escenarios de asignación para {len(demand_paths)} demandas...")
-        
         total_combinations = 0
         valid_combinations = 0
+        combinations = itertools.product(*demand_options)
+        
+        if checkpoint_path is not None:
+            from Allocation import checkpoint
+            fingerprint = checkpoint.search_fingerprint(self, upper_bound)
+            state = checkpoint.read_checkpoint(checkpoint_path, fingerprint)
+            if state is not None:
+                # The product order is fixed: skip what was already evaluated
+                total_combinations = state['total_combinations']
+                valid_combinations = state['valid_combinations']
+                combinations = itertools.islice(combinations, total_combinations, None)
+                if state['best_scenario'] is not None:
+                    best_scenario = [(demand_idx, path) for demand_idx, path in state['best_scenario']]
+                    best_metrics = self.evaluate_allocation_scenario(best_scenario)
+                print(f"Reanudando desde el checkpoint: {total_combinations} combinaciones ya evaluadas")
         
         # Generate all combinations of assignments
-        for combination in itertools.product(*demand_options):
+        for combination in combinations:
             total_combinations += 1
             
             # Filter out unassigned options and create scenario
@@ -308,29 +451,113 @@ class VirtualNetworkAllocation:
             if metrics['valid']:
                 valid_combinations += 1
                 
-                # Check if this is the best scenario so far
-                is_better = False
+                # Check if this is the best scenario so far; among scenarios
+                # that accept as many demands the first one enumerated is kept
                 if metrics['acceptance_ratio'] > best_metrics['acceptance_ratio']:
-                    is_better = True
-                elif (metrics['acceptance_ratio'] == best_metrics['acceptance_ratio'] and 
-                      metrics['revenue_cost_ratio'] > best_metrics['revenue_cost_ratio']):
-                    is_better = True
-                
-                if is_better:
                     best_scenario = scenario
                     best_metrics = metrics
+                    if upper_bound is not None and len(scenario) >= upper_bound:
+                        print(f"Alcanzada la cota superior de {upper_bound} demandas aceptadas")
+                        break
+            
+            if checkpoint_path is not None and total_combinations % checkpoint_every == 0:
+                checkpoint.write_checkpoint(checkpoint_path, {
+                    'fingerprint': fingerprint,
+                    'total_combinations': total_combinations,
+                    'valid_combinations': valid_combinations,
+                    'best_scenario': None if best_scenario is None else
+                        [(int(demand_idx), [int(node) for node in path]) for demand_idx, path in best_scenario]
+                })
+        
+        if checkpoint_path is not None:
+            checkpoint.remove_checkpoint(checkpoint_path)
+        return best_scenario, best_metrics, total_combinations, valid_combinations
+    
+    def offline_brute_force_allocation(self, upper_bound: Optional[int] = None,
+                                       checkpoint_path: Optional[str] = None,
+                                       checkpoint_every: int = 100000,
+                                       use_tree_solver: bool = True,
+                                       decompose: bool = True,
+                                       processes: int = 1) -> Dict:
+        """
+        Perform offline brute-force allocation to find the optimal scenario
+        Tries all possible combinations of demand allocations and selects the best one
+        
+        Args:
+            upper_bound: Largest number of demands that can be accepted, e.g.
+                Allocation.mcf.upper_bounds(allocator)['max_accepted']. Scenarios
+                that assign more demands are tried first and the search stops as
+                soon as a valid one reaches the bound
+            checkpoint_path: File where the search position, counters and best
+                scenario are saved every checkpoint_every combinations. If it
+                exists the search resumes from it; it is removed once the search ends
+            use_tree_solver: If the residual network is a tree or a chain, every
+                demand has a single path and the exact dynamic program of
+                Allocation.tree_solver is used instead of the enumeration; it
+                returns the scenario the enumeration would
+            decompose: Split the demands into groups whose candidate paths share
+                no link and search each group on its own (Allocation.decomposition).
+                Not used together with checkpoint_path
+            processes: Worker processes for the large independent groups
+                (1 = run in this process, None = one per CPU)
+        """
+        if use_tree_solver:
+            from Allocation.tree_solver import tree_allocation
+            result = tree_allocation(self, upper_bound=upper_bound)
+            if result is not None:
+                return result
+        
+        print("Iniciando asignación offline por fuerza bruta...")
+        
+        # Generate all possible paths for each demand
+        demand_paths = []
+        for i, demand in enumerate(self.demands):
+            source = demand.get('source')
+            destination = demand.get('destination')
+            
+            if source is None or destination is None:
+                print(f"Advertencia: Demanda {i} sin origen o destino")
+                continue
+            
+            if not self.is_reachable(source, destination):
+                print(f"Demanda {i} de {source} a {destination} rechazada: nodos en componentes distintas")
+                continue
+                
+            paths = self.find_all_paths(source, destination)
+            if paths:
+                demand_paths.append((i, paths))
+            else:
+                print(f"No se encontraron caminos para demanda {i} de {source} a {destination}")
+        
+        if not demand_paths:
+            return AllocationResult({
+                'success': False,
+                'message': 'No se encontraron caminos válidos para ninguna demanda',
+                'acceptance_ratio': 0,
+                'allocated_demands': [],
+                'rejected_demands': list(range(len(self.demands)))
+            })
         
+        if decompose and checkpoint_path is None:
+            # Demands whose candidate paths share no link are searched separately
+            from Allocation.decomposition import solve_components
+            best_scenario, best_metrics, total_combinations, valid_combinations, components = \
+                solve_components(self, demand_paths, upper_bound, processes)
+        else:
+            print(f"Evaluando escenarios de asignación para {len(demand_paths)} demandas...")
+            best_scenario, best_metrics, total_combinations, valid_combinations = self._search_scenarios(
+                demand_paths, upper_bound, checkpoint_path, checkpoint_every)
+            components = None
         print(f"Evaluadas {total_combinations} combinaciones, {valid_combinations} fueron válidas")
         
         if best_scenario is None:
-            return {
+            return AllocationResult({
                 'success': False,
                 'message': 'No se encontró escenario de asignación válido',
                 'acceptance_ratio': 0,
                 'allocated_demands': [],
-                'rejected_demands': list(range(len(self.demands))),
-                'allocation_details': []
-            }
+                'rejected_demands': list(range(len(self.demands)))
+            })
         
         # Apply the best scenario to the network
         self.capacity_matrix = best_metrics['temp_capacity_matrix'].copy()
@@ -339,23 +566,9 @@ class VirtualNetworkAllocation:
         self.rejected_demands = [self.demands[i] for i in range(len(self.demands)) if i not in allocated_indices]
         self.current_revenue = best_metrics['total_revenue']
         self.current_cost = best_metrics['total_cost']
+        self.allocation_paths = {i: path for i, path in best_scenario}
         
-        # Create allocation details for display
-        allocation_details = []
-        for demand_idx, path in best_scenario:
-            demand = self.demands[demand_idx]
-            allocation_details.append({
-                'demand_index': demand_idx,
-                'source': demand['source'],
-                'destination': demand['destination'],
-                'bandwidth': demand['bandwidth'],
-                'path': path,
-                'path_length': len(path) - 1,
-                'cost': self.calculate_path_cost(path, demand['bandwidth']),
-                'revenue': demand['bandwidth']
-            })
-        
-        return {
+        fields = {
             'success': True,
             'acceptance_ratio': best_metrics['acceptance_ratio'],
             'revenue_cost_ratio': best_metrics['revenue_cost_ratio'],
@@ -364,9 +577,12 @@ class VirtualNetworkAllocation:
             'total_revenue': best_metrics['total_revenue'],
             'total_cost': best_metrics['total_cost'],
             'total_combinations_evaluated': total_combinations,
-            'valid_combinations': valid_combinations,
-            'allocation_details': allocation_details
+            'valid_combinations': valid_combinations
         }
+        if components is not None:
+            fields['components'] = components
+        # The per-demand details for display are built on first access
+        return AllocationResult(fields, self, best_scenario)
     
     def get_network_status(self) -> Dict:
         """
@@ -396,9 +612,10 @@ class VirtualNetworkAllocation:
         Reset network to original state
         Restores capacity matrix and clears allocation statistics
         """
-        self.capacity_matrix = self.original_capacity_matrix.copy()
+        self.capacity_matrix = self.original_capacity_matrix
         self.allocated_demands = []
         self.rejected_demands = []
         self.current_revenue = 0
         self.current_cost = 0
+        self.allocation_paths = {}
         print("Red restablecida al estado original")
\ No newline at end of file
@@ -0,0 +1,131 @@
+"""
+Joint admission of small batches of online requests
+
+Deciding a burst one request at a time lets an early, cheap request take the
+path a later, more valuable one needed. solve_batch() instead looks at the
+whole batch: every request gets a few candidate paths on the current residual
+network (shortest first, then detours around the links already used) and a
+bounded branch and bound picks the combination with the highest revenue, with
+lower bandwidth x hops breaking ties. When the node budget runs out the best
+combination found so far is returned; the first dive of the search is the
+greedy assignment, so the result is never worse than deciding in order of
+revenue.
+
+commit_batch() reserves the chosen paths as one transaction: either every
+path of the batch is reserved or none is.
+"""
+import time
+from typing import Dict, List, Optional, Sequence, Tuple
+import numpy as np
+
+from Allocation.links import ArcIndex, LinkArcs, residual_links
+from Allocation.reoptimization import PathTransaction
+
+# (source, destination, bandwidth, revenue)
+BatchRequest = Tuple[int, int, float, float]
+
+
+def candidate_paths(index: ArcIndex, links: LinkArcs, source: int, destination: int,
+                    bandwidth: float, max_paths: int = 3) -> List[Tuple[List[int], np.ndarray]]:
+    """
+    Up to max_paths distinct paths able to carry bandwidth, as (nodes, resources)
+    Each new path is searched with the arcs of the previous ones made more expensive
+    """
+    usable = links.resource_capacity[links.resources] >= bandwidth
+    weights = np.ones(links.num_arcs)
+    paths = []
+    seen = set()
+    for _ in range(max_paths):
+        found = index.shortest_path(source, destination, weights, usable)
+        if found is None:
+            break
+        nodes, arcs, _ = found
+        key = tuple(nodes)
+        if key not in seen:
+            seen.add(key)
+            paths.append((nodes, links.resources[arcs]))
+        weights[arcs] *= 2.0
+    return paths
+
+
+def solve_batch(allocator, requests: Sequence[BatchRequest], max_paths: int = 3,
+                max_nodes: int = 20000) -> Dict:
+    """
+    Choose a path (or rejection) for every request of a batch
+
+    Args:
+        requests: (source, destination, bandwidth, revenue) per request
+        max_paths: candidate paths per request
+        max_nodes: limit on branch and bound nodes; 0 keeps only the greedy dive
+
+    Returns the chosen path per request (None = rejected), the revenue, whether
+    the search finished (exact) and the time spent.
+    """
+    start = time.perf_counter()
+    links = residual_links(allocator)
+    index = ArcIndex(links)
+    count = len(requests)
+    candidates = [candidate_paths(index, links, source, destination, bandwidth, max_paths)
+                  if source != destination else [([source], np.zeros(0, dtype=np.int64))]
+                  for source, destination, bandwidth, _ in requests]
+
+    # Most valuable requests are decided first; the bound adds the revenue still undecided
+    order = sorted(range(count), key=lambda k: -requests[k][3])
+    revenues = np.array([requests[k][3] for k in order], dtype=float)
+    remaining_revenue = np.concatenate([np.cumsum(revenues[::-1])[::-1], [0.0]])
+
+    remaining = links.resource_capacity.copy()
+    choice = [None] * count
+    best = {'revenue': -1.0, 'cost': np.inf, 'choice': list(choice)}
+    nodes_explored = 0
+    truncated = False
+
+    def search(depth: int, revenue: float, cost: float) -> None:
+        nonlocal nodes_explored, truncated
+        if depth == count:
+            if revenue > best['revenue'] or (revenue == best['revenue'] and cost < best['cost']):
+                best.update(revenue=revenue, cost=cost, choice=list(choice))
+            return
+        # Cost only grows, so a branch that can at best tie on revenue is
+        # still worth exploring while it is cheaper than the incumbent
+        bound = revenue + remaining_revenue[depth]
+        if bound < best['revenue'] or (bound == best['revenue'] and cost >= best['cost']):
+            return
+        if nodes_explored >= max_nodes and best['revenue'] >= 0:
+            truncated = True
+            return
+        nodes_explored += 1
+        k = order[depth]
+        bandwidth = requests[k][2]
+        for nodes, resources in candidates[k]:
+            if np.all(remaining[resources] >= bandwidth):
+                remaining[resources] -= bandwidth
+                choice[k] = nodes
+                search(depth + 1, revenue + requests[k][3], cost + bandwidth * (len(nodes) - 1))
+                remaining[resources] += bandwidth
+                choice[k] = None
+        search(depth + 1, revenue, cost)
+
+    search(0, 0.0, 0.0)
+    return {
+        'paths': best['choice'],
+        'revenue': max(best['revenue'], 0.0),
+        'accepted': sum(path is not None for path in best['choice']),
+        'exact': not truncated,
+        'nodes_explored': nodes_explored,
+        'solve_time': time.perf_counter() - start
+    }
+
+
+def commit_batch(allocator, bandwidths: Sequence[float], paths: Sequence[Optional[List[int]]]) -> bool:
+    """
+    Reserve every chosen path or none of them
+    """
+    try:
+        with PathTransaction(allocator) as transaction:
+            for bandwidth, path in zip(bandwidths, paths):
+                if path is not None:
+                    transaction.allocate(path, bandwidth)
+    except ValueError:
+        return False
+    return True
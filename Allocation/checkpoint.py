@@ -0,0 +1,67 @@
+"""
+Checkpoints of the offline brute-force search
+
+The search walks itertools.product over the options of every demand in a
+fixed order, so its state is just the number of combinations consumed, the
+two counters and the best scenario so far. That state is stored as a small
+JSON file, written to a temporary file in the same directory and moved over
+the previous checkpoint with os.replace, so a crash never leaves a partial
+file. A fingerprint of the residual capacities, the demands and the search
+options ties a checkpoint to the run that produced it.
+"""
+import hashlib
+import json
+import os
+import tempfile
+from typing import Dict, Optional
+
+CHECKPOINT_FORMAT_VERSION = 1
+
+
+def search_fingerprint(allocator, upper_bound: Optional[int]) -> str:
+    digest = hashlib.sha256()
+    capacity = allocator.capacity_matrix
+    digest.update(f"{type(allocator).__name__}:{capacity.shape}:{upper_bound}".encode())
+    digest.update(capacity.astype(float).tobytes())
+    digest.update(allocator.demands.as_array().astype(float).tobytes())
+    return digest.hexdigest()
+
+
+def write_checkpoint(path: str, state: Dict) -> None:
+    """
+    Atomically replace the checkpoint at path with state
+    """
+    directory = os.path.dirname(os.path.abspath(path))
+    os.makedirs(directory, exist_ok=True)
+    descriptor, staging = tempfile.mkstemp(prefix='.checkpoint-', suffix='.json', dir=directory)
+    try:
+        with os.fdopen(descriptor, 'w', encoding='utf-8') as f:
+            json.dump(dict(state, format_version=CHECKPOINT_FORMAT_VERSION), f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(staging, path)
+    except BaseException:
+        if os.path.exists(staging):
+            os.remove(staging)
+        raise
+
+
+def read_checkpoint(path: str, fingerprint: str) -> Optional[Dict]:
+    """
+    Load the checkpoint at path, or None if there is none
+    A checkpoint written for another network or other options is an error
+    """
+    if not os.path.exists(path):
+        return None
+    with open(path, encoding='utf-8') as f:
+        state = json.load(f)
+    if state.get('format_version') != CHECKPOINT_FORMAT_VERSION:
+        raise ValueError(f"Versión de checkpoint no soportada: {state.get('format_version')}")
+    if state.get('fingerprint') != fingerprint:
+        raise ValueError(f"El checkpoint {path} corresponde a otra red, otras demandas u otras opciones")
+    return state
+
+
+def remove_checkpoint(path: str) -> None:
+    if os.path.exists(path):
+        os.remove(path)
@@ -0,0 +1,141 @@
+"""
+Independent-subproblem decomposition of the offline brute force
+
+Two demands can only compete for capacity if a candidate path of one and a
+candidate path of the other cross the same link (either direction, since an
+allocation also reduces the reverse direction). Joining such demands gives a
+conflict graph whose connected components can be searched separately: every
+combination of one component fits or not regardless of the others, and the
+number of accepted demands adds up over components. The search space is then
+the sum of the per-component products instead of the product over all demands.
+
+Each component keeps the option order of the full search (not assigning
+first), so the merged scenario is the one the full enumeration would pick.
+Components are independent, so on request (processes other than 1) the
+large ones are spread over a process pool that shares the topology and
+candidate paths through SharedTopology. The default stays in this process,
+as callers such as the GUI should not spawn workers implicitly.
+"""
+import math
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Optional, Tuple
+import numpy as np
+
+from Allocation.shared_topology import SharedTopology, attach_worker_topology, worker_topology
+
+DemandPaths = List[Tuple[int, List[List[int]]]]
+
+# Combinations a component needs before it is worth sending to a worker
+PARALLEL_MIN_COMBINATIONS = 10000
+
+
+def conflict_components(demand_paths: DemandPaths) -> List[DemandPaths]:
+    """
+    Group the (demand, candidate paths) entries into connected components
+    of the conflict graph, keeping the demand order inside every group
+    """
+    parent = list(range(len(demand_paths)))
+
+    def find(position: int) -> int:
+        while parent[position] != position:
+            parent[position] = parent[parent[position]]
+            position = parent[position]
+        return position
+
+    owner: Dict[Tuple[int, int], int] = {}
+    for position, (_, paths) in enumerate(demand_paths):
+        for path in paths:
+            for u, v in zip(path[:-1], path[1:]):
+                link = (u, v) if u < v else (v, u)
+                other = find(owner.setdefault(link, position))
+                mine = find(position)
+                if other != mine:
+                    parent[max(other, mine)] = min(other, mine)
+
+    groups: Dict[int, DemandPaths] = {}
+    for position, entry in enumerate(demand_paths):
+        groups.setdefault(find(position), []).append(entry)
+    return list(groups.values())
+
+
+def search_space(component: DemandPaths) -> int:
+    """
+    Combinations of the brute force over a component, not assigning included
+    """
+    return math.prod(len(paths) + 1 for _, paths in component)
+
+
+# Per-worker residual capacities set by _init_worker
+_worker_residual = None
+
+
+def _init_worker(descriptor: Dict, residual: np.ndarray) -> None:
+    global _worker_residual
+    attach_worker_topology(descriptor)
+    _worker_residual = residual
+
+
+def _component_task(task: Tuple[List[int], Optional[int]]) -> Tuple[Optional[List[Tuple]], int, int]:
+    demand_indices, upper_bound = task
+    topology = worker_topology()
+    allocator = topology.allocator(_worker_residual.copy())
+    component = [(demand_idx, topology.paths(demand_idx)) for demand_idx in demand_indices]
+    scenario, _, total, valid = allocator._search_scenarios(component, upper_bound)
+    return scenario, total, valid
+
+
+def solve_components(allocator, demand_paths: DemandPaths, upper_bound: Optional[int] = None,
+                     processes: Optional[int] = 1) -> Tuple[Optional[List[Tuple]], Dict, int, int, List[Dict]]:
+    """
+    Search every component of the conflict graph and merge the optima
+
+    With an upper_bound, every component tries its fuller scenarios first and
+    stops once all of its demands are accepted; the global bound itself
+    cannot be split between components.
+
+    Returns the merged best scenario, its metrics, the combinations evaluated
+    and valid over all components, and one row per component with its
+    demands, search space, combinations evaluated and accepted demands.
+    """
+    components = conflict_components(demand_paths)
+    full_space = search_space(demand_paths)
+    spaces = [search_space(component) for component in components]
+    print(f"Descomposición: {len(components)} grupos de demandas independientes, "
+          f"{sum(spaces)} combinaciones en lugar de {full_space}")
+
+    def component_bound(component: DemandPaths) -> Optional[int]:
+        return None if upper_bound is None else len(component)
+
+    large = [i for i, space in enumerate(spaces) if space >= PARALLEL_MIN_COMBINATIONS]
+    results: List[Optional[Tuple[Optional[List[Tuple]], int, int]]] = [None] * len(components)
+    if processes != 1 and len(large) > 1:
+        # Largest components first so the pool ends evenly
+        large.sort(key=lambda i: -spaces[i])
+        tasks = [([demand_idx for demand_idx, _ in components[i]], component_bound(components[i])) for i in large]
+        with SharedTopology.create(allocator, demand_paths=dict(demand_paths)) as topology:
+            with ProcessPoolExecutor(max_workers=processes, initializer=_init_worker,
+                                     initargs=(topology.descriptor, np.array(allocator.capacity_matrix))) as pool:
+                for i, result in zip(large, pool.map(_component_task, tasks)):
+                    results[i] = result
+    for i, component in enumerate(components):
+        if results[i] is None:
+            scenario, _, total, valid = allocator._search_scenarios(component, component_bound(component))
+            results[i] = (scenario, total, valid)
+
+    best_scenario = []
+    total_combinations = valid_combinations = 0
+    rows = []
+    for component, space, (scenario, total, valid) in zip(components, spaces, results):
+        # The empty scenario always fits, so every component has a best scenario
+        best_scenario.extend(scenario)
+        total_combinations += total
+        valid_combinations += valid
+        rows.append({
+            'demands': [demand_idx for demand_idx, _ in component],
+            'search_space': space,
+            'combinations_evaluated': total,
+            'accepted_demands': [demand_idx for demand_idx, _ in scenario]
+        })
+    best_scenario.sort(key=lambda entry: entry[0])
+    return (best_scenario, allocator.evaluate_allocation_scenario(best_scenario),
+            total_combinations, valid_combinations, rows)
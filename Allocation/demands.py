@@ -0,0 +1,163 @@
+"""
+Compact demand storage for VirtualNetworkAllocation
+
+Demands live in a single numpy structured array instead of one dict per
+demand. Indexing the table returns a Demand, a slotted view of one row that
+still answers demand['source'] and demand.get('bandwidth') like the old dicts.
+"""
+from typing import Dict, Iterator, Optional
+import numpy as np
+
+DEMAND_DTYPE = np.dtype([
+    ('source', np.int32),
+    ('destination', np.int32),
+    ('bandwidth', np.float64),
+    ('duration', np.int32),
+    ('price_per_unit', np.float64),
+])
+
+# Default duration and price applied to demands given as (source, destination, bandwidth)
+DEFAULT_DURATION = 1
+DEFAULT_PRICE_PER_UNIT = 1.0
+
+
+class Demand:
+    """
+    Read-only view of one row of a DemandTable
+    Supports the mapping access of the former demand dicts
+    """
+    __slots__ = ('_records', 'index')
+
+    def __init__(self, records: np.ndarray, index: int):
+        self._records = records
+        self.index = index
+
+    @property
+    def source(self) -> int:
+        return int(self._records['source'][self.index])
+
+    @property
+    def destination(self) -> int:
+        return int(self._records['destination'][self.index])
+
+    @property
+    def bandwidth(self) -> float:
+        return float(self._records['bandwidth'][self.index])
+
+    @property
+    def duration(self) -> int:
+        return int(self._records['duration'][self.index])
+
+    @property
+    def price_per_unit(self) -> float:
+        return float(self._records['price_per_unit'][self.index])
+
+    def __getitem__(self, key: str):
+        if key not in DEMAND_DTYPE.names:
+            raise KeyError(key)
+        return getattr(self, key)
+
+    def get(self, key: str, default=None):
+        return getattr(self, key) if key in DEMAND_DTYPE.names else default
+
+    def keys(self):
+        return DEMAND_DTYPE.names
+
+    def items(self):
+        return [(key, getattr(self, key)) for key in DEMAND_DTYPE.names]
+
+    def to_dict(self) -> Dict:
+        return dict(self.items())
+
+    def __eq__(self, other) -> bool:
+        if isinstance(other, Demand):
+            return self._records is other._records and self.index == other.index
+        if isinstance(other, dict):
+            return self.to_dict() == other
+        return NotImplemented
+
+    def __hash__(self) -> int:
+        return hash((id(self._records), self.index))
+
+    def __repr__(self) -> str:
+        return f"Demand({self.index}, {self.to_dict()})"
+
+
+class DemandTable:
+    """
+    Demands stored column-wise in a structured array (one row per demand)
+    """
+    __slots__ = ('records',)
+
+    def __init__(self, records: Optional[np.ndarray] = None):
+        self.records = np.zeros(0, dtype=DEMAND_DTYPE) if records is None else records
+
+    @classmethod
+    def from_rows(cls, rows) -> 'DemandTable':
+        """
+        Build the table from (source, destination, bandwidth[, duration, price])
+        rows; rows with fewer than three fields are skipped
+        """
+        try:
+            array = np.asarray(rows, dtype=float)
+        except (ValueError, TypeError):
+            array = None
+        if array is None or array.ndim != 2:
+            # Ragged input: keep only the rows that carry the three required
+            # fields, filling the duration and price each row leaves out
+            defaults = (DEFAULT_DURATION, DEFAULT_PRICE_PER_UNIT)
+            array = np.array([list(row[:5]) + list(defaults[len(row) - 3:]) for row in rows if len(row) >= 3],
+                             dtype=float).reshape(-1, 5)
+        elif array.shape[1] < 3:
+            array = np.zeros((0, 3))
+        return cls.from_columns(array)
+
+    @classmethod
+    def from_columns(cls, array: np.ndarray) -> 'DemandTable':
+        """
+        Build the table from a (K, 3), (K, 4) or (K, 5) float array
+        """
+        records = np.zeros(len(array), dtype=DEMAND_DTYPE)
+        records['source'] = array[:, 0]
+        records['destination'] = array[:, 1]
+        records['bandwidth'] = array[:, 2]
+        records['duration'] = array[:, 3] if array.shape[1] >= 4 else DEFAULT_DURATION
+        records['price_per_unit'] = array[:, 4] if array.shape[1] >= 5 else DEFAULT_PRICE_PER_UNIT
+        return cls(records)
+
+    def as_array(self) -> np.ndarray:
+        """
+        (K, 5) float array with the columns in DEMAND_DTYPE order
+        """
+        return np.column_stack([self.records[name].astype(float) for name in DEMAND_DTYPE.names]
+                               ).reshape(-1, len(DEMAND_DTYPE.names))
+
+    @property
+    def sources(self) -> np.ndarray:
+        return self.records['source']
+
+    @property
+    def destinations(self) -> np.ndarray:
+        return self.records['destination']
+
+    @property
+    def bandwidths(self) -> np.ndarray:
+        return self.records['bandwidth']
+
+    def __len__(self) -> int:
+        return len(self.records)
+
+    def __getitem__(self, index: int) -> Demand:
+        index = int(index)
+        if index < 0:
+            index += len(self.records)
+        if not 0 <= index < len(self.records):
+            raise IndexError(f"Índice de demanda fuera de rango: {index}")
+        return Demand(self.records, index)
+
+    def __iter__(self) -> Iterator[Demand]:
+        records = self.records
+        return (Demand(records, i) for i in range(len(records)))
+
+    def __repr__(self) -> str:
+        return f"DemandTable({len(self)} demandas)"
@@ -0,0 +1,248 @@
+"""
+Virtual network embedding (VNE) on top of VirtualNetworkAllocation
+
+A virtual network request is a dict with
+    'cpu':   list with the CPU demand of every virtual node
+    'links': list of (virtual_u, virtual_v, bandwidth)
+
+Every virtual node is placed on a distinct substrate node with enough
+residual CPU, and every virtual link is routed on a substrate path through
+the allocator (find_shortest_path / allocate_path / deallocate_path).
+
+Node mapping is staged: virtual nodes are placed one at a time, heaviest
+first and then following the virtual topology, and the links towards already
+placed neighbours are routed in the same stage. When a stage has no feasible
+candidate the search backtracks to the previous stage, restoring the residual
+capacities saved before its links were routed.
+Candidates come from an index of substrate nodes sorted by residual CPU, so
+nodes that cannot host a virtual node are never examined.
+"""
+from typing import Dict, List, Tuple
+import numpy as np
+
+from Allocation.links import residual_links
+
+
+class VirtualNetworkEmbedder:
+    def __init__(self, allocator, node_cpu):
+        """
+        Args:
+            allocator: substrate network (dense or sparse backend)
+            node_cpu: CPU capacity of every substrate node
+        """
+        self.allocator = allocator
+        self.original_node_cpu = np.asarray(node_cpu, dtype=float).copy()
+        if len(self.original_node_cpu) != allocator.num_nodes:
+            raise ValueError(f"Se esperaban {allocator.num_nodes} capacidades de CPU, "
+                             f"recibidas {len(self.original_node_cpu)}")
+        self.node_cpu = self.original_node_cpu.copy()
+        # Accepted embeddings keyed by embedding id
+        self.embeddings = {}
+        self._next_id = 0
+
+    # --- Candidate index --------------------------------------------------
+
+    def _candidate_index(self) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Substrate nodes sorted by residual CPU (ascending) and the sorted CPUs
+        """
+        order = np.argsort(self.node_cpu, kind='stable')
+        return order, self.node_cpu[order]
+
+    @staticmethod
+    def _candidates(order: np.ndarray, sorted_cpu: np.ndarray, cpu_demand: float) -> np.ndarray:
+        """
+        Nodes with at least cpu_demand residual CPU, largest residual first
+        """
+        start = np.searchsorted(sorted_cpu, cpu_demand, side='left')
+        return order[start:][::-1]
+
+    # --- Staging ----------------------------------------------------------
+
+    @staticmethod
+    def _stage_order(cpu: np.ndarray, neighbors: List[List[Tuple[int, int]]],
+                     incident_bandwidth: np.ndarray) -> List[int]:
+        """
+        Place the heaviest virtual node first, then always the unplaced node
+        with most bandwidth towards placed ones, so links are routed early
+        """
+        num_virtual = len(cpu)
+        remaining = set(range(num_virtual))
+        order = []
+        attached = np.zeros(num_virtual)
+        weight = cpu + incident_bandwidth
+        while remaining:
+            node = max(remaining, key=lambda v: (attached[v], weight[v]))
+            remaining.discard(node)
+            order.append(node)
+            for other, link in neighbors[node]:
+                attached[other] += 1
+        return order
+
+    def embed(self, request: Dict, max_candidates: int = 10, max_backtracks: int = 200) -> Dict:
+        """
+        Embed a virtual network request, committing it only if it fits entirely
+
+        Args:
+            request: {'cpu': [...], 'links': [(u, v, bandwidth), ...]}
+            max_candidates: substrate candidates tried per virtual node
+            max_backtracks: limit on undone stages before the request is rejected
+        """
+        allocator = self.allocator
+        cpu = np.asarray(request.get('cpu', []), dtype=float)
+        virtual_links = [(int(u), int(v), float(bw)) for u, v, bw in request.get('links', [])]
+        num_virtual = len(cpu)
+        if num_virtual == 0:
+            return {'success': False, 'message': 'La petición no tiene nodos virtuales'}
+
+        neighbors = [[] for _ in range(num_virtual)]
+        incident_bandwidth = np.zeros(num_virtual)
+        for index, (u, v, bandwidth) in enumerate(virtual_links):
+            if not (0 <= u < num_virtual and 0 <= v < num_virtual) or u == v:
+                return {'success': False, 'message': f"Enlace virtual {index} no válido: ({u}, {v})"}
+            neighbors[u].append((v, index))
+            neighbors[v].append((u, index))
+            incident_bandwidth[u] += bandwidth
+            incident_bandwidth[v] += bandwidth
+
+        # Substrate nodes whose residual link capacity cannot serve the
+        # incident virtual bandwidth are skipped: virtual nodes always land on
+        # distinct substrate nodes, so all of that bandwidth crosses the
+        # node's links, in one direction or the other
+        links = residual_links(allocator)
+        node_bandwidth = (np.bincount(links.sources, weights=links.capacities, minlength=allocator.num_nodes)
+                          + np.bincount(links.destinations, weights=links.capacities,
+                                        minlength=allocator.num_nodes))
+        labels = np.asarray(allocator.component_labels)
+
+        order, sorted_cpu = self._candidate_index()
+        stages = self._stage_order(cpu, neighbors, incident_bandwidth)
+        placement = {}
+        used_nodes = set()
+        link_paths = {}
+        # Per stage: remaining candidates, and the link indices routed in that
+        # stage with the residual capacities from before they were routed
+        candidate_stack = []
+        routed_stack = []
+        backtracks = 0
+
+        def stage_candidates(virtual):
+            placed = [placement[other] for other, _ in neighbors[virtual] if other in placement]
+            result = []
+            for node in self._candidates(order, sorted_cpu, cpu[virtual]):
+                node = int(node)
+                if node in used_nodes:
+                    continue
+                if placed and labels[node] != labels[placed[0]]:
+                    continue
+                if node_bandwidth[node] < incident_bandwidth[virtual] and incident_bandwidth[virtual] > 0:
+                    continue
+                result.append(node)
+                if len(result) >= max_candidates:
+                    break
+            return result
+
+        # deallocate_path does not exactly undo allocate_path on links whose
+        # directions hold different residual capacities, so stages are undone
+        # by restoring the capacities saved before them
+        def undo_links(routed, saved):
+            for index in routed:
+                del link_paths[index]
+            if saved is not None:
+                allocator.capacity_matrix = saved
+
+        def undo_stage(virtual):
+            undo_links(*routed_stack.pop())
+            used_nodes.discard(placement.pop(virtual))
+
+        def try_place(virtual, node) -> bool:
+            placement[virtual] = node
+            used_nodes.add(node)
+            routed = []
+            to_route = [index for other, index in neighbors[virtual] if other in placement and other != virtual]
+            saved = allocator.capacity_matrix.copy() if to_route else None
+            for index in to_route:
+                u, v, bandwidth = virtual_links[index]
+                path = allocator.find_shortest_path(placement[u], placement[v], bandwidth)
+                if path is None:
+                    undo_links(routed, saved)
+                    used_nodes.discard(node)
+                    del placement[virtual]
+                    return False
+                allocator.allocate_path(path, bandwidth)
+                link_paths[index] = path
+                routed.append(index)
+            routed_stack.append((routed, saved))
+            return True
+
+        depth = 0
+        candidate_stack.append(stage_candidates(stages[0]))
+        while 0 <= depth < num_virtual:
+            virtual = stages[depth]
+            candidates = candidate_stack[depth]
+            placed = False
+            while candidates:
+                if try_place(virtual, candidates.pop(0)):
+                    placed = True
+                    break
+            if placed:
+                depth += 1
+                if depth < num_virtual:
+                    candidate_stack.append(stage_candidates(stages[depth]))
+                continue
+            # No candidate left for this stage: go back one stage
+            candidate_stack.pop()
+            depth -= 1
+            backtracks += 1
+            if depth >= 0:
+                undo_stage(stages[depth])
+            if backtracks > max_backtracks:
+                while depth >= 0:
+                    if stages[depth] in placement:
+                        undo_stage(stages[depth])
+                    depth -= 1
+                break
+
+        if depth < num_virtual:
+            return {'success': False, 'message': 'No se encontró un embedding factible',
+                    'backtracks': backtracks}
+
+        self.node_cpu[[placement[v] for v in range(num_virtual)]] -= cpu
+        bandwidth_cost = sum(virtual_links[i][2] * (len(path) - 1) for i, path in link_paths.items())
+        embedding = {
+            'node_mapping': {v: placement[v] for v in range(num_virtual)},
+            'link_paths': {i: link_paths[i] for i in range(len(virtual_links))},
+            'cpu': cpu,
+            'links': virtual_links,
+        }
+        embedding_id = self._next_id
+        self._next_id += 1
+        self.embeddings[embedding_id] = embedding
+        return {
+            'success': True,
+            'embedding_id': embedding_id,
+            'node_mapping': embedding['node_mapping'],
+            'link_paths': embedding['link_paths'],
+            'revenue': float(cpu.sum() + sum(bw for _, _, bw in virtual_links)),
+            'cost': float(cpu.sum() + bandwidth_cost),
+            'backtracks': backtracks
+        }
+
+    def release(self, embedding_id: int) -> None:
+        """
+        Return the CPU and bandwidth of an accepted embedding to the substrate
+        """
+        embedding = self.embeddings.pop(embedding_id)
+        for index, path in embedding['link_paths'].items():
+            self.allocator.deallocate_path(path, embedding['links'][index][2])
+        for virtual, node in embedding['node_mapping'].items():
+            self.node_cpu[node] += embedding['cpu'][virtual]
+
+    def get_status(self) -> Dict:
+        total_cpu = float(self.original_node_cpu.sum())
+        used_cpu = total_cpu - float(self.node_cpu.sum())
+        return {
+            'embeddings': len(self.embeddings),
+            'cpu_utilization': used_cpu / total_cpu if total_cpu > 0 else 0,
+            'network': self.allocator.get_network_status()
+        }
@@ -0,0 +1,155 @@
+"""
+Link-failure what-if analysis on a solved allocation
+
+failure_sweep() takes an allocator after an allocation (allocation_paths and
+residual capacities set) and, for every failure scenario, takes the failed
+links out of service and re-routes only the demands whose path crossed them;
+every other demand keeps its path and its reservation. A scenario is a single
+link or a shared-risk group of links that fail together.
+
+Scenarios are independent, so with processes > 1 they are spread over a
+process pool. The topology and demands are published once through
+SharedTopology and each worker only receives the residual capacities and the
+current paths when it starts.
+"""
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Optional, Sequence, Tuple
+import numpy as np
+
+from Allocation.shared_topology import SharedTopology, attach_worker_topology, worker_topology
+
+Link = Tuple[int, int]
+
+
+def network_links(allocator) -> List[Link]:
+    """
+    Every link of the original topology as an (u, v) pair with u < v
+    """
+    sources, destinations = allocator._link_endpoints()
+    sources = np.asarray(sources, dtype=np.int64)
+    destinations = np.asarray(destinations, dtype=np.int64)
+    pairs = np.unique(np.stack([np.minimum(sources, destinations),
+                                np.maximum(sources, destinations)], axis=1).reshape(-1, 2), axis=0)
+    return [(int(u), int(v)) for u, v in pairs]
+
+
+def _fail_links(allocator, links: Sequence[Link]) -> None:
+    """
+    Set the residual capacity of both directions of every link to zero
+    """
+    capacity = allocator._writable_capacity_matrix()
+    for u, v in links:
+        for node_from, node_to in ((u, v), (v, u)):
+            if capacity.ndim == 1:
+                edge_id = allocator.edge_id(node_from, node_to)
+                if edge_id >= 0:
+                    capacity[edge_id] = 0
+            else:
+                capacity[node_from, node_to] = 0
+
+
+def evaluate_failure(allocator, allocation_paths: Dict[int, List[int]], links: Sequence[Link]) -> Dict:
+    """
+    Apply one failure scenario to allocator (modified in place) and re-route
+    the affected demands, most valuable first
+
+    Returns the impact of the scenario: affected, re-routed and lost demands,
+    lost revenue and extra hops of the new paths.
+    """
+    failed = set()
+    for u, v in links:
+        failed.update(((u, v), (v, u)))
+    affected = [demand_idx for demand_idx, path in allocation_paths.items()
+                if any((path[i], path[i + 1]) in failed for i in range(len(path) - 1))]
+
+    demands = allocator.demands
+    for demand_idx in affected:
+        allocator.deallocate_path(allocation_paths[demand_idx], demands[demand_idx].bandwidth)
+    _fail_links(allocator, links)
+
+    rerouted = 0
+    revenue_lost = 0.0
+    extra_hops = 0
+    for demand_idx in sorted(affected, key=lambda k: -allocator.calculate_revenue(demands[k])):
+        demand = demands[demand_idx]
+        path = allocator.find_shortest_path(demand.source, demand.destination, demand.bandwidth)
+        if path is None:
+            revenue_lost += allocator.calculate_revenue(demand)
+            continue
+        allocator.allocate_path(path, demand.bandwidth)
+        rerouted += 1
+        extra_hops += len(path) - len(allocation_paths[demand_idx])
+
+    lost = len(affected) - rerouted
+    num_demands = len(demands)
+    return {
+        'links': [tuple(link) for link in links],
+        'affected_demands': len(affected),
+        'rerouted_demands': rerouted,
+        'lost_demands': lost,
+        'acceptance_ratio': (len(allocation_paths) - lost) / num_demands if num_demands else 0,
+        'revenue_lost': revenue_lost,
+        'extra_hops': extra_hops
+    }
+
+
+# Per-worker state set by _init_worker
+_worker_state = None
+
+
+def _init_worker(descriptor: Dict, residual: np.ndarray, allocation_paths: Dict[int, List[int]]) -> None:
+    global _worker_state
+    attach_worker_topology(descriptor)
+    _worker_state = (residual, allocation_paths)
+
+
+def _failure_task(links: Sequence[Link]) -> Dict:
+    residual, allocation_paths = _worker_state
+    allocator = worker_topology().allocator(residual.copy())
+    return evaluate_failure(allocator, allocation_paths, links)
+
+
+def failure_sweep(allocator, scenarios: Optional[Sequence[Sequence[Link]]] = None,
+                  processes: Optional[int] = None, chunksize: int = 4) -> Dict:
+    """
+    Evaluate every failure scenario against the current allocation
+
+    Args:
+        scenarios: list of link groups that fail together, e.g. [[(0, 1)], [(2, 3), (2, 4)]];
+            by default every link of the topology fails on its own
+        processes: worker processes (None = one per CPU, 1 = run in this process)
+        chunksize: scenarios sent to a worker at a time
+
+    The allocator is left unchanged. Returns the baseline acceptance and the
+    per-scenario impact table, worst scenarios (most demands lost) first.
+    """
+    if scenarios is None:
+        scenarios = [[link] for link in network_links(allocator)]
+    scenarios = [[(int(u), int(v)) for u, v in group] for group in scenarios]
+    allocation_paths = dict(allocator.allocation_paths)
+    residual = np.array(allocator.capacity_matrix)
+
+    if processes == 1 or len(scenarios) < 2:
+        impacts = []
+        saved = allocator.capacity_matrix
+        try:
+            for links in scenarios:
+                allocator.capacity_matrix = residual.copy()
+                impacts.append(evaluate_failure(allocator, allocation_paths, links))
+        finally:
+            allocator.capacity_matrix = saved
+    else:
+        # Only the topology and demands are shared; candidate paths are not needed
+        with SharedTopology.create(allocator) as topology:
+            with ProcessPoolExecutor(max_workers=processes, initializer=_init_worker,
+                                     initargs=(topology.descriptor, residual, allocation_paths)) as pool:
+                impacts = list(pool.map(_failure_task, scenarios, chunksize=chunksize))
+
+    impacts.sort(key=lambda row: (-row['lost_demands'], -row['revenue_lost'], -row['affected_demands']))
+    num_demands = len(allocator.demands)
+    critical = sum(1 for row in impacts if row['lost_demands'] > 0)
+    print(f"Análisis de fallos: {len(impacts)} escenarios, {critical} con demandas perdidas")
+    return {
+        'baseline_acceptance_ratio': len(allocation_paths) / num_demands if num_demands else 0,
+        'impacts': impacts
+    }
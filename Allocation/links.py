@@ -0,0 +1,148 @@
+"""
+Directed link arcs with residual capacity, shared by the optimization modules
+
+Allocating bandwidth on u -> v also reduces v -> u when that direction has
+capacity, so both directions of a bidirectional link draw from a single
+resource. residual_links() groups every usable arc into such resources, whose
+capacity is the smallest residual capacity among their arcs: any allocation
+that keeps the load of a resource within it fits, in whatever order.
+
+The allocator only checks the arc a path uses, so with different residual
+capacities per direction more than that can fit. With relaxation=True the
+capacity of a resource is the largest of its arcs, and every arc below it gets
+a capacity row of its own (bounded_arcs). Any allocation the allocator accepts
+meets both limits: the last allocation on a link checked the arc it used
+after every earlier load on either direction had been subtracted. This is the
+model for upper bounds; it does not guarantee that an LP solution fits.
+"""
+import heapq
+import math
+from typing import List, NamedTuple, Optional, Tuple
+import numpy as np
+
+
+class LinkArcs(NamedTuple):
+    sources: np.ndarray            # (A,) source node of each arc
+    destinations: np.ndarray       # (A,) destination node of each arc
+    capacities: np.ndarray         # (A,) residual capacity of each arc
+    resources: np.ndarray          # (A,) resource id of each arc
+    resource_capacity: np.ndarray  # (R,) capacity shared by the arcs of a resource
+    num_nodes: int
+    bounded_arcs: np.ndarray = np.zeros(0, dtype=np.int64)  # arcs with their own capacity row
+
+    @property
+    def num_arcs(self) -> int:
+        return len(self.sources)
+
+    @property
+    def num_resources(self) -> int:
+        return len(self.resource_capacity)
+
+    def arc_prices(self, duals: np.ndarray) -> np.ndarray:
+        """
+        Dual price of every arc: its resource row plus its own row, if any
+        duals holds the R resource rows followed by the bounded_arcs rows
+        """
+        prices = duals[self.resources].copy()
+        prices[self.bounded_arcs] += duals[self.num_resources:self.num_resources + len(self.bounded_arcs)]
+        return prices
+
+
+def residual_links(allocator, capacity_matrix: np.ndarray = None, relaxation: bool = False) -> LinkArcs:
+    """
+    Collect the arcs that still have residual capacity
+    Works on dense (n x n) and sparse (per-edge) capacity storage
+    With relaxation=True the resources are sized for upper bounds (see above)
+    """
+    capacity = allocator.capacity_matrix if capacity_matrix is None else capacity_matrix
+    sources, destinations = allocator._link_endpoints()
+    sources = np.asarray(sources, dtype=np.int64)
+    destinations = np.asarray(destinations, dtype=np.int64)
+    if capacity.ndim == 1:
+        capacities = np.asarray(capacity, dtype=float)
+    else:
+        capacities = np.asarray(capacity[sources, destinations], dtype=float)
+
+    usable = capacities > 0
+    sources, destinations, capacities = sources[usable], destinations[usable], capacities[usable]
+
+    # Pair every arc with its reverse, if it is also usable, through sorted keys
+    n = allocator.num_nodes
+    keys = sources * n + destinations
+    order = np.argsort(keys)
+    reverse_keys = destinations * n + sources
+    position = np.minimum(np.searchsorted(keys[order], reverse_keys), max(len(keys) - 1, 0))
+    has_reverse = (keys[order][position] == reverse_keys) if len(keys) else np.zeros(0, dtype=bool)
+    reverse = np.where(has_reverse, order[position] if len(keys) else position, -1)
+
+    arc_ids = np.arange(len(keys))
+    pair_ids = np.where(reverse >= 0, np.minimum(arc_ids, reverse), arc_ids)
+    _, resources = np.unique(pair_ids, return_inverse=True)
+    resources = resources.reshape(-1)
+    num_resources = resources.max(initial=-1) + 1
+    if relaxation:
+        resource_capacity = np.zeros(num_resources)
+        np.maximum.at(resource_capacity, resources, capacities)
+        bounded_arcs = np.flatnonzero(capacities < resource_capacity[resources])
+    else:
+        resource_capacity = np.full(num_resources, np.inf)
+        np.minimum.at(resource_capacity, resources, capacities)
+        bounded_arcs = np.zeros(0, dtype=np.int64)
+    return LinkArcs(sources, destinations, capacities, resources, resource_capacity, n, bounded_arcs)
+
+
+class ArcIndex:
+    """
+    Arcs grouped by source node (CSR order) for repeated shortest-path searches
+    """
+
+    def __init__(self, links: LinkArcs):
+        self.links = links
+        order = np.argsort(links.sources, kind='stable')
+        offsets = np.searchsorted(links.sources[order], np.arange(links.num_nodes + 1))
+        # Plain lists are faster than numpy scalars inside the Dijkstra loop
+        self._order = order.tolist()
+        self._offsets = offsets.tolist()
+        self._destinations = links.destinations.tolist()
+
+    def shortest_path(self, source: int, destination: int, weights: np.ndarray,
+                      usable: Optional[np.ndarray] = None) -> Optional[Tuple[List[int], List[int], float]]:
+        """
+        Dijkstra over non-negative arc weights, restricted to usable arcs
+        Returns (nodes, arcs, length) or None if the destination is unreachable
+        """
+        weights = weights.tolist()
+        usable = None if usable is None else usable.tolist()
+        distance = {source: 0.0}
+        previous_arc = {}
+        done = set()
+        heap = [(0.0, source)]
+        while heap:
+            dist, node = heapq.heappop(heap)
+            if node in done:
+                continue
+            if node == destination:
+                break
+            done.add(node)
+            for position in range(self._offsets[node], self._offsets[node + 1]):
+                arc = self._order[position]
+                if usable is not None and not usable[arc]:
+                    continue
+                neighbor = self._destinations[arc]
+                candidate = dist + weights[arc]
+                if neighbor not in done and candidate < distance.get(neighbor, math.inf):
+                    distance[neighbor] = candidate
+                    previous_arc[neighbor] = arc
+                    heapq.heappush(heap, (candidate, neighbor))
+
+        if destination not in distance:
+            return None
+        arcs = []
+        node = destination
+        while node != source:
+            arc = previous_arc[node]
+            arcs.append(arc)
+            node = int(self.links.sources[arc])
+        arcs.reverse()
+        nodes = [source] + [self._destinations[arc] for arc in arcs]
+        return nodes, arcs, distance[destination]
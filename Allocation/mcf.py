@@ -0,0 +1,376 @@
+"""
+Fractional multi-commodity-flow (MCF) linear program
+
+Every demand k is a commodity that may be split over many paths. The LP is
+written over paths, with y_kp the fraction of demand k routed on path p:
+
+    maximize    sum_{k,p} (w_k - eps * b_k * hops_p) y_kp
+    subject to  sum_p y_kp <= 1                               for every demand k   (dual sigma_k)
+                sum_{k,p uses r} b_k y_kp <= capacity_r       for every link resource r (dual pi_r)
+                sum_{k,p uses a} b_k y_kp <= capacity_a       for every bounded arc a   (dual pi_a)
+
+The arc rows only exist for links built with residual_links(relaxation=True),
+whose two directions have different residual capacities.
+
+Paths are generated on demand: after each LP solve a Dijkstra pricing step
+looks for a path of demand k whose length under arc weights (pi_r + pi_a + eps) is
+below (w_k - sigma_k) / b_k, i.e. a column with negative reduced cost in
+minimization form. When none exists the LP is optimal over all paths, which
+is the same optimum as the arc-flow formulation at a fraction of its size.
+
+With w_k = 1 the optimum bounds the number of demands any unsplittable
+allocation can accept; with w_k = revenue it bounds the achievable revenue.
+The small eps term only discourages needless detours. The LPs are solved by
+SciPy's HiGHS backend on sparse constraint matrices.
+"""
+from typing import Dict, List, Optional
+import numpy as np
+
+from Allocation.links import ArcIndex, LinkArcs, residual_links
+from Allocation.result import AllocationResult
+
+OBJECTIVES = ('acceptance', 'revenue')
+FLOW_TOLERANCE = 1e-9
+REDUCED_COST_TOLERANCE = 1e-9
+
+
+def _require_scipy():
+    try:
+        from scipy import sparse
+        from scipy.optimize import linprog
+    except ImportError as e:
+        raise ImportError("El modelo de flujo multi-producto requiere SciPy (pip install scipy)") from e
+    return sparse, linprog
+
+
+def demand_weights(allocator, objective: str) -> np.ndarray:
+    """
+    Objective weight of each demand: 1 for acceptance, revenue otherwise
+    """
+    if objective not in OBJECTIVES:
+        raise ValueError(f"Objetivo no soportado: {objective} (usar {', '.join(OBJECTIVES)})")
+    records = allocator.demands.records
+    if objective == 'acceptance':
+        return np.ones(len(records))
+    return records['bandwidth'] * records['duration'] * records['price_per_unit']
+
+
+def detour_penalty(weights: np.ndarray, bandwidths: np.ndarray, num_nodes: int) -> float:
+    """
+    eps small enough that the flow cost of a path never outweighs the value
+    of the fraction of demand it carries
+    """
+    positive = bandwidths > 0
+    unit_value = (weights[positive] / bandwidths[positive]).min() if positive.any() else 1.0
+    return 1e-3 * unit_value / max(num_nodes - 1, 1)
+
+
+class PathColumns:
+    """
+    Generated paths stored as flat lists, one entry per column
+    """
+
+    def __init__(self):
+        self.demand = []
+        self.nodes = []
+        self.arcs = []
+        self._known = {}
+
+    def add(self, k: int, nodes: List[int], arcs: List[int]) -> bool:
+        """
+        Append a path of demand k; returns False if it was already a column
+        """
+        key = (k, tuple(arcs))
+        if key in self._known:
+            return False
+        self._known[key] = len(self.demand)
+        self.demand.append(k)
+        self.nodes.append(nodes)
+        self.arcs.append(arcs)
+        return True
+
+    def index_of(self, k: int, arcs: List[int]) -> int:
+        return self._known[(k, tuple(arcs))]
+
+    def __len__(self) -> int:
+        return len(self.demand)
+
+
+def master_problem(sparse, columns: PathColumns, links: LinkArcs, weights: np.ndarray,
+                   bandwidths: np.ndarray, eps: float):
+    """
+    Objective, constraint matrix and right-hand side of the path LP
+    Rows 0..K-1 allow one unit per demand; rows K..K+R-1 are resource capacities
+    and the last rows the capacities of the bounded arcs
+    """
+    K, R, B = len(bandwidths), links.num_resources, len(links.bounded_arcs)
+    count = len(columns)
+    lengths = np.fromiter((len(arcs) for arcs in columns.arcs), dtype=np.int64, count=count)
+    column_ids = np.arange(count)
+    demand = np.asarray(columns.demand, dtype=np.int64)
+    flat_arcs = np.fromiter((a for arcs in columns.arcs for a in arcs), dtype=np.int64, count=int(lengths.sum()))
+    arc_columns = np.repeat(column_ids, lengths)
+    arc_rows = np.full(links.num_arcs, -1, dtype=np.int64)
+    arc_rows[links.bounded_arcs] = np.arange(B)
+    bounded = arc_rows[flat_arcs] >= 0
+    rows = np.concatenate([demand, K + links.resources[flat_arcs], K + R + arc_rows[flat_arcs][bounded]])
+    cols = np.concatenate([column_ids, arc_columns, arc_columns[bounded]])
+    values = np.concatenate([np.ones(count), bandwidths[demand[arc_columns]],
+                             bandwidths[demand[arc_columns[bounded]]]])
+    # Duplicate (row, column) entries are summed by the sparse constructor
+    matrix = sparse.csr_matrix((values, (rows, cols)), shape=(K + R + B, count))
+    c = -(weights[demand] - eps * bandwidths[demand] * lengths)
+    rhs = np.concatenate([np.ones(K), links.resource_capacity, links.capacities[links.bounded_arcs]])
+    return c, matrix, rhs
+
+
+def generate_columns(allocator, links: LinkArcs, weights: np.ndarray, initial_paths: int = 1,
+                     fit_bandwidth: bool = False, max_iterations: int = 200,
+                     initial_columns: Optional[PathColumns] = None) -> Dict:
+    """
+    Solve the path LP by column generation
+
+    With fit_bandwidth=True paths may only use arcs whose capacity can carry
+    the whole demand, as required by unsplittable allocations. initial_columns
+    (e.g. the columns of a previous solve on the same arcs) warm-starts the LP
+    instead of seeding shortest paths; they are copied, not modified. Returns the
+    'columns', the LP 'values' of each column, the 'duals' of the demand and
+    resource rows, 'eps', 'iterations' and the number of 'priced' columns.
+
+    'converged' is False when max_iterations stopped the loop while pricing
+    still found improving columns. The restricted LP value is then no bound on
+    the full LP, so 'bound' holds the Lagrangian bound instead: the dual value
+    of the restricted LP plus the positive reduced profit of every demand.
+    Otherwise 'bound' is the weighted acceptance of the LP solution.
+    """
+    sparse, linprog = _require_scipy()
+    index = ArcIndex(links)
+    demands = allocator.demands
+    bandwidths = demands.bandwidths.astype(float)
+    K, n = len(demands), allocator.num_nodes
+    eps = detour_penalty(weights, bandwidths, n)
+    arc_capacity = links.resource_capacity[links.resources] if links.num_arcs else np.zeros(0)
+    arc_capacity[links.bounded_arcs] = links.capacities[links.bounded_arcs]
+
+    # Initial columns: shortest paths by hops, then detours that avoid arcs already used
+    columns = PathColumns()
+    if initial_columns is not None:
+        for k, nodes, arcs in zip(initial_columns.demand, initial_columns.nodes, initial_columns.arcs):
+            columns.add(k, nodes, arcs)
+    candidates = []
+    for k, demand in enumerate(demands):
+        source, destination = demand.source, demand.destination
+        if not allocator.is_reachable(source, destination):
+            continue
+        usable = arc_capacity >= bandwidths[k] if fit_bandwidth else None
+        candidates.append((k, source, destination, usable))
+        if initial_columns is not None:
+            continue
+        penalty = np.ones(links.num_arcs)
+        for _ in range(initial_paths):
+            found = index.shortest_path(source, destination, penalty, usable)
+            if found is None:
+                break
+            nodes, arcs, _ = found
+            if not columns.add(k, nodes, arcs):
+                break
+            penalty[arcs] += n
+
+    num_rows = K + links.num_resources + len(links.bounded_arcs)
+    solution = {'columns': columns, 'values': np.zeros(len(columns)), 'eps': eps,
+                'duals': np.zeros(num_rows), 'iterations': 0, 'priced': 0,
+                'status': 0, 'message': 'Sin caminos candidatos', 'converged': not candidates}
+    while columns and solution['iterations'] < max_iterations:
+        c, matrix, rhs = master_problem(sparse, columns, links, weights, bandwidths, eps)
+        result = linprog(c, A_ub=matrix, b_ub=rhs, bounds=(0, None), method='highs')
+        solution['iterations'] += 1
+        solution['status'], solution['message'] = result.status, result.message
+        if result.status != 0:
+            break
+        solution['values'] = result.x
+        solution['duals'] = -np.asarray(result.ineqlin.marginals)
+
+        # Pricing: one Dijkstra per demand on the reduced arc costs
+        sigma = solution['duals'][:K]
+        arc_weights = links.arc_prices(solution['duals'][K:]) + eps
+        added = 0
+        for k, source, destination, usable in candidates:
+            if bandwidths[k] <= 0:
+                continue
+            found = index.shortest_path(source, destination, arc_weights, usable)
+            if found is None:
+                continue
+            nodes, arcs, length = found
+            if (weights[k] - sigma[k] - bandwidths[k] * length > REDUCED_COST_TOLERANCE
+                    and columns.add(k, nodes, arcs)):
+                added += 1
+        if added == 0:
+            solution['converged'] = True
+            break
+        solution['priced'] += added
+
+    # Columns priced after the last LP solve carry no flow yet
+    solution['values'] = np.concatenate([solution['values'], np.zeros(len(columns) - len(solution['values']))])
+    if solution['converged']:
+        demand = np.asarray(columns.demand, dtype=np.int64)
+        solution['bound'] = float(weights[demand] @ solution['values']) if len(columns) else 0.0
+    else:
+        solution['bound'] = _lagrangian_bound(index, links, weights, bandwidths, solution['duals'], candidates)
+    return solution
+
+
+def _lagrangian_bound(index: ArcIndex, links: LinkArcs, weights: np.ndarray, bandwidths: np.ndarray,
+                      duals: np.ndarray, candidates: List) -> float:
+    """
+    Upper bound on the full path LP (without the eps term) from any dual values
+
+    Raising each sigma_k by the best reduced profit of demand k under arc
+    prices pi makes the duals feasible for every path, so their objective
+    bounds the LP whether or not column generation has finished.
+    """
+    K = len(bandwidths)
+    rhs = np.concatenate([np.ones(K), links.resource_capacity, links.capacities[links.bounded_arcs]])
+    bound = float(duals @ rhs)
+    sigma = duals[:K]
+    arc_weights = links.arc_prices(duals[K:])
+    for k, source, destination, usable in candidates:
+        found = index.shortest_path(source, destination, arc_weights, usable)
+        if found is not None:
+            bound += max(0.0, weights[k] - sigma[k] - bandwidths[k] * found[2])
+    return float(bound)
+
+
+def solve_mcf(allocator, objective: str = 'revenue', links: Optional[LinkArcs] = None,
+              max_iterations: int = 200) -> Dict:
+    """
+    Solve the fractional MCF LP on the allocator's residual capacities
+
+    Returns a dict with 'fractions' (K,), 'path_flows' as a list of
+    (demand_index, path, bandwidth), 'objective' (the weighted acceptance
+    without the eps term), 'duals' (R,) shadow price of each link resource,
+    and the 'links' the LP was built on. 'converged' and 'bound' are those of
+    generate_columns: if max_iterations stopped pricing early, 'objective' is
+    only what the restricted LP achieved and 'bound' an upper bound on the LP.
+    """
+    links = residual_links(allocator) if links is None else links
+    weights = demand_weights(allocator, objective)
+    bandwidths = allocator.demands.bandwidths.astype(float)
+    K = len(bandwidths)
+    solution = generate_columns(allocator, links, weights, max_iterations=max_iterations)
+    if solution['status'] != 0:
+        return {'status': solution['status'], 'message': solution['message'], 'fractions': np.zeros(K),
+                'path_flows': [], 'objective': 0.0, 'duals': np.zeros(links.num_resources), 'links': links,
+                'converged': False, 'bound': np.inf}
+
+    columns, values = solution['columns'], solution['values']
+    demand = np.asarray(columns.demand, dtype=np.int64)
+    fractions = np.clip(np.bincount(demand, weights=values, minlength=K), 0.0, 1.0) if len(columns) else np.zeros(K)
+    path_flows = [(int(demand[j]), columns.nodes[j], float(values[j] * bandwidths[demand[j]]))
+                  for j in np.flatnonzero(values > FLOW_TOLERANCE)]
+    return {
+        'status': 0,
+        'message': solution['message'],
+        'fractions': fractions,
+        'path_flows': path_flows,
+        'objective': float(weights @ fractions),
+        'duals': solution['duals'][K:K + links.num_resources],
+        'iterations': solution['iterations'],
+        'converged': solution['converged'],
+        'bound': solution['bound'] if not solution['converged'] else float(weights @ fractions),
+        'links': links,
+    }
+
+
+def upper_bounds(allocator, max_iterations: int = 200) -> Dict:
+    """
+    LP relaxation bounds for any unsplittable allocation on the residual network
+
+    'max_accepted' is the largest number of demands that can be accepted,
+    'acceptance_ratio' the matching ratio and 'revenue' the largest revenue.
+    If pricing did not converge within max_iterations ('converged' False) the
+    bounds are the looser Lagrangian ones, which are still valid.
+    """
+    links = residual_links(allocator, relaxation=True)
+    acceptance = solve_mcf(allocator, 'acceptance', links, max_iterations)
+    revenue = solve_mcf(allocator, 'revenue', links, max_iterations)
+    num_demands = len(allocator.demands)
+    max_accepted = int(min(num_demands, np.floor(acceptance['bound'] + 1e-6)))
+    return {
+        'max_accepted': max_accepted,
+        'acceptance_ratio': max_accepted / num_demands if num_demands else 0,
+        'revenue': revenue['bound'],
+        'converged': acceptance['converged'] and revenue['converged'],
+    }
+
+
+def splittable_allocation(allocator, objective: str = 'revenue', commit: bool = True) -> AllocationResult:
+    """
+    Allocate demands as splittable traffic using the MCF LP
+
+    Each accepted demand may be carried over several paths; a demand counts
+    as allocated if any fraction of it is routed. With commit=True the path
+    pieces are reserved on the allocator's residual capacities.
+    """
+    solution = solve_mcf(allocator, objective)
+    if solution['status'] != 0:
+        return AllocationResult({
+            'success': False,
+            'message': f"El modelo de flujo no encontró solución: {solution['message']}",
+            'acceptance_ratio': 0,
+            'allocated_demands': [],
+            'rejected_demands': list(range(len(allocator.demands)))
+        })
+
+    demands = allocator.demands
+    pieces_by_demand = {}
+    for k, path, bandwidth in solution['path_flows']:
+        pieces_by_demand.setdefault(k, []).append((path, bandwidth))
+
+    allocated, rejected, details = [], [], []
+    total_revenue = total_cost = 0.0
+    for k, fraction in enumerate(solution['fractions']):
+        demand = demands[k]
+        pieces = pieces_by_demand.get(k)
+        if fraction <= 1e-6 or not pieces:
+            rejected.append(k)
+            continue
+        allocated.append((k, pieces))
+        cost = sum(allocator.calculate_path_cost(path, bandwidth) for path, bandwidth in pieces)
+        revenue = float(allocator.calculate_revenue(demand) * fraction)
+        total_revenue += revenue
+        total_cost += cost
+        details.append({
+            'demand_index': k,
+            'source': demand.source,
+            'destination': demand.destination,
+            'bandwidth': float(fraction * demand.bandwidth),
+            'fraction': float(fraction),
+            'paths': pieces,
+            'path': max(pieces, key=lambda piece: piece[1])[0],
+            'path_length': max(len(path) - 1 for path, _ in pieces),
+            'cost': cost,
+            'revenue': revenue
+        })
+
+    if commit:
+        for k, pieces in allocated:
+            for path, bandwidth in pieces:
+                allocator.allocate_path(path, bandwidth)
+        allocator.allocated_demands = [demands[k] for k, _ in allocated]
+        allocator.rejected_demands = [demands[k] for k in rejected]
+        allocator.current_revenue = total_revenue
+        allocator.current_cost = total_cost
+
+    num_demands = len(demands)
+    return AllocationResult({
+        'success': True,
+        'mode': 'splittable',
+        'acceptance_ratio': float(solution['fractions'].sum() / num_demands) if num_demands else 0,
+        'revenue_cost_ratio': total_revenue / total_cost if total_cost > 0 else 0,
+        'allocated_demands': allocated,
+        'rejected_demands': rejected,
+        'fractions': solution['fractions'],
+        'total_revenue': total_revenue,
+        'total_cost': total_cost,
+        'allocation_details': details
+    })
@@ -0,0 +1,353 @@
+"""
+Import and export of the network_data dict consumed by VirtualNetworkAllocation
+
+Supported formats (chosen from the file extension unless fmt is given):
+
+    json     {"num_nodes": n, "edges": [[u, v, capacity], ...], "demands": [[s, d, bw], ...]}
+             a "capacity_matrix" entry is accepted instead of "edges"
+    csv      edge list "source,destination,capacity", with demands in a second
+             file "source,destination,bandwidth" (default: <name>_demands.csv)
+    graphml  nodes and edges with a "capacity" edge attribute; demands are kept
+             in a graph-level "demands" attribute
+
+Node ids are 0-based integers, except in GraphML where nodes are numbered in
+document order. Files are parsed as streams straight into numpy arrays, and
+the returned dict holds 'edges' (E x 3), 'num_nodes' and 'demands' (K x 3).
+"""
+import csv
+import json
+import os
+import xml.etree.ElementTree as ET
+from typing import Dict, Iterable, Iterator, Optional
+import numpy as np
+
+from Allocation.allocation import _cell_to_float, _clean_capacity_array
+
+GRAPHML_NS = 'http://graphml.graphdrawing.org/xmlns'
+
+
+def _format_from_path(path: str, fmt: Optional[str]) -> str:
+    fmt = (fmt or os.path.splitext(path)[1].lstrip('.')).lower()
+    if fmt not in ('json', 'csv', 'graphml'):
+        raise ValueError(f"Formato de red no soportado: {fmt}")
+    return fmt
+
+
+def _default_demands_path(path: str) -> str:
+    return os.path.splitext(path)[0] + '_demands.csv'
+
+
+def _numeric_rows(reader: Iterable[list]) -> Iterator[float]:
+    """
+    Yield the first three fields of every numeric CSV row, skipping headers,
+    comments and blank lines, without keeping the rows in memory
+    """
+    for row in reader:
+        if not row or row[0].lstrip().startswith('#'):
+            continue
+        try:
+            values = [float(row[0]), float(row[1]), float(row[2])]
+        except (ValueError, IndexError):
+            continue
+        yield from values
+
+
+def _read_csv_triples(path: str) -> np.ndarray:
+    with open(path, newline='', encoding='utf-8') as f:
+        return np.fromiter(_numeric_rows(csv.reader(f)), dtype=float).reshape(-1, 3)
+
+
+def _mirror_edges(edges: np.ndarray) -> np.ndarray:
+    """
+    Add the reverse direction of every edge that does not already have it
+    """
+    reverse = edges[:, [1, 0, 2]]
+    existing = set(map(tuple, edges[:, :2].astype(np.int64).tolist()))
+    missing = np.array([(int(u), int(v)) not in existing for u, v in reverse[:, :2]], dtype=bool)
+    return np.concatenate([edges, reverse[missing]]) if len(edges) else edges
+
+
+def _finish(edges: np.ndarray, demands: np.ndarray, num_nodes: Optional[int]) -> Dict:
+    edges = edges.reshape(-1, 3)
+    demands = demands.reshape(-1, 3)
+    if num_nodes is None:
+        endpoints = np.concatenate([edges[:, :2].ravel(), demands[:, :2].ravel()])
+        num_nodes = int(endpoints.max()) + 1 if len(endpoints) else 0
+    endpoints = np.concatenate([edges[:, :2].ravel(), demands[:, :2].ravel()])
+    if len(endpoints) and (endpoints.min() < 0 or endpoints.max() >= num_nodes):
+        raise ValueError(f"Hay enlaces o demandas con nodos fuera del rango 0..{int(num_nodes) - 1}")
+    return {'num_nodes': int(num_nodes), 'edges': edges, 'demands': demands}
+
+
+class _JsonStream:
+    """
+    Minimal incremental reader for a top-level JSON object
+    The file is read in chunks and arrays of rows are consumed one row at a
+    time, so an edge list never has to be held in memory as Python objects
+    """
+    CHUNK_SIZE = 1 << 16
+
+    def __init__(self, f):
+        self._file = f
+        self._buffer = ''
+        self._pos = 0
+        self._eof = False
+        self._decoder = json.JSONDecoder()
+
+    def _fill(self) -> bool:
+        if self._eof:
+            return False
+        chunk = self._file.read(self.CHUNK_SIZE)
+        if not chunk:
+            self._eof = True
+            return False
+        self._buffer = self._buffer[self._pos:] + chunk
+        self._pos = 0
+        return True
+
+    def _peek(self) -> str:
+        while True:
+            while self._pos < len(self._buffer) and self._buffer[self._pos].isspace():
+                self._pos += 1
+            if self._pos < len(self._buffer):
+                return self._buffer[self._pos]
+            if not self._fill():
+                raise ValueError("Fichero JSON incompleto")
+
+    def _expect(self, char: str) -> None:
+        if self._peek() != char:
+            raise ValueError(f"JSON no válido: se esperaba '{char}' en lugar de '{self._buffer[self._pos]}'")
+        self._pos += 1
+
+    def value(self):
+        """
+        Decode the next complete JSON value
+        """
+        self._peek()
+        while True:
+            try:
+                value, end = self._decoder.raw_decode(self._buffer, self._pos)
+            except json.JSONDecodeError:
+                if not self._fill():
+                    raise
+                continue
+            # A number that ends with the buffer may continue in the next chunk
+            if end == len(self._buffer) and self._fill():
+                continue
+            self._pos = end
+            return value
+
+    def _separator(self, closing: str) -> bool:
+        """
+        Consume a ',' or the closing bracket; True while items follow
+        """
+        char = self._peek()
+        self._pos += 1
+        if char == ',':
+            return True
+        if char != closing:
+            raise ValueError(f"JSON no válido: carácter inesperado '{char}'")
+        return False
+
+    def items(self) -> Iterator:
+        """
+        Yield the (key, self) pairs of the top-level object; the caller reads
+        each value with value() or rows() before asking for the next key
+        """
+        self._expect('{')
+        if self._peek() == '}':
+            self._pos += 1
+            return
+        while True:
+            key = self.value()
+            self._expect(':')
+            yield key, self
+            if not self._separator('}'):
+                return
+
+    def rows(self) -> Iterator:
+        """
+        Yield the elements of the next array one at a time
+        """
+        self._expect('[')
+        if self._peek() == ']':
+            self._pos += 1
+            return
+        while True:
+            yield self.value()
+            if not self._separator(']'):
+                return
+
+
+def _triples(rows: Iterable) -> Iterator[float]:
+    for row in rows:
+        yield from (float(row[0]), float(row[1]), float(row[2]))
+
+
+def _load_json(path: str) -> Dict:
+    num_nodes = None
+    edges = np.zeros((0, 3))
+    demands = np.zeros((0, 3))
+    with open(path, encoding='utf-8') as f:
+        for key, stream in _JsonStream(f).items():
+            if key == 'edges':
+                edges = np.fromiter(_triples(stream.rows()), dtype=float).reshape(-1, 3)
+            elif key == 'demands':
+                demands = np.fromiter(_triples(stream.rows()), dtype=float).reshape(-1, 3)
+            elif key == 'capacity_matrix':
+                # A dense matrix is n x n whatever the format; keep only its links row by row
+                forward = []
+                widths = set()
+                num_nodes = 0
+                for u, row in enumerate(stream.rows()):
+                    capacities = np.array([_cell_to_float(cell) for cell in row], dtype=float)
+                    for v in np.flatnonzero(capacities > 0):
+                        forward.extend((u, v, capacities[v]))
+                    widths.add(len(capacities))
+                    num_nodes = u + 1
+                if widths - {num_nodes}:
+                    raise ValueError(f"La matriz de capacidad debe ser cuadrada, recibida con "
+                                     f"{num_nodes} filas de longitudes {sorted(widths)}")
+                edges = np.array(forward, dtype=float).reshape(-1, 3)
+            elif key == 'num_nodes':
+                if num_nodes is None:
+                    num_nodes = stream.value()
+            else:
+                stream.value()
+    return _finish(edges, demands, num_nodes)
+
+
+def _load_csv(path: str, demands_path: Optional[str], bidirectional: bool) -> Dict:
+    edges = _read_csv_triples(path)
+    if bidirectional:
+        edges = _mirror_edges(edges)
+    demands_path = demands_path or _default_demands_path(path)
+    demands = _read_csv_triples(demands_path) if os.path.exists(demands_path) else np.zeros((0, 3))
+    return _finish(edges, demands, None)
+
+
+def _load_graphml(path: str) -> Dict:
+    """
+    Stream a GraphML file with iterparse
+    Consumed nodes and edges are dropped from the graph element, so the
+    partially built tree stays small whatever the file size
+    """
+    node_index = {}
+    capacity_key = None
+    demands_key = None
+    undirected = False
+    demands = np.zeros((0, 3))
+
+    def edge_values():
+        nonlocal capacity_key, demands_key, undirected, demands
+        graph = None
+        for event, element in ET.iterparse(path, events=('start', 'end')):
+            tag = element.tag.rsplit('}', 1)[-1]
+            if event == 'start':
+                if tag == 'graph' and graph is None:
+                    graph = element
+                    undirected = element.get('edgedefault', 'directed') == 'undirected'
+                continue
+            if tag == 'key':
+                if element.get('attr.name') == 'capacity' and element.get('for') in ('edge', 'all'):
+                    capacity_key = element.get('id')
+                elif element.get('attr.name') == 'demands':
+                    demands_key = element.get('id')
+            elif tag == 'node':
+                node_index.setdefault(element.get('id'), len(node_index))
+            elif tag == 'edge':
+                capacity = 0.0
+                for data in element:
+                    if data.get('key') == capacity_key and data.text:
+                        capacity = float(data.text)
+                source = node_index.setdefault(element.get('source'), len(node_index))
+                target = node_index.setdefault(element.get('target'), len(node_index))
+                directed = element.get('directed')
+                yield source, target, capacity, (undirected if directed is None else directed == 'false')
+            elif tag == 'data' and element.get('key') == demands_key and element.text:
+                demands = np.asarray(json.loads(element.text), dtype=float)
+            # Children of the graph end in document order, so the one just
+            # consumed is the first left; iterparse may have built later ones
+            if graph is not None and len(graph) and graph[0] is element:
+                element.clear()
+                del graph[0]
+
+    forward = []
+    for source, target, capacity, mirror in edge_values():
+        forward.extend((source, target, capacity))
+        if mirror:
+            forward.extend((target, source, capacity))
+    edges = np.array(forward, dtype=float).reshape(-1, 3)
+    return _finish(edges, demands, len(node_index))
+
+
+def load_network(path: str, fmt: Optional[str] = None, demands_path: Optional[str] = None,
+                 bidirectional: bool = False) -> Dict:
+    """
+    Load a network_data dict from a JSON, CSV or GraphML file
+    For CSV edge lists, bidirectional=True adds the reverse of every edge
+    """
+    fmt = _format_from_path(path, fmt)
+    if fmt == 'json':
+        return _load_json(path)
+    if fmt == 'csv':
+        return _load_csv(path, demands_path, bidirectional)
+    return _load_graphml(path)
+
+
+def _network_edges(network_data: Dict) -> np.ndarray:
+    if 'edges' in network_data:
+        edges = np.asarray(network_data['edges'], dtype=float).reshape(-1, 3)
+        return edges[edges[:, 2] > 0]
+    matrix = _clean_capacity_array(network_data['capacity_matrix'])
+    sources, destinations = np.nonzero(matrix > 0)
+    return np.column_stack([sources, destinations, matrix[sources, destinations]]).astype(float)
+
+
+def _network_size(network_data: Dict, edges: np.ndarray, demands: np.ndarray) -> int:
+    if network_data.get('num_nodes') is not None:
+        return int(network_data['num_nodes'])
+    if 'capacity_matrix' in network_data:
+        return len(network_data['capacity_matrix'])
+    return _finish(edges, demands, None)['num_nodes']
+
+
+def save_network(network_data: Dict, path: str, fmt: Optional[str] = None,
+                 demands_path: Optional[str] = None) -> None:
+    """
+    Save a network_data dict as JSON, CSV (edge list plus demand list) or GraphML
+    """
+    fmt = _format_from_path(path, fmt)
+    edges = _network_edges(network_data)
+    demands = np.asarray(network_data.get('demands', []), dtype=float).reshape(-1, 3)
+    num_nodes = _network_size(network_data, edges, demands)
+
+    if fmt == 'json':
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump({'num_nodes': num_nodes,
+                       'edges': [[int(u), int(v), float(c)] for u, v, c in edges],
+                       'demands': [[int(s), int(d), float(b)] for s, d, b in demands]}, f)
+    elif fmt == 'csv':
+        with open(path, 'w', newline='', encoding='utf-8') as f:
+            writer = csv.writer(f)
+            writer.writerow(['source', 'destination', 'capacity'])
+            writer.writerows((int(u), int(v), float(c)) for u, v, c in edges)
+        with open(demands_path or _default_demands_path(path), 'w', newline='', encoding='utf-8') as f:
+            writer = csv.writer(f)
+            writer.writerow(['source', 'destination', 'bandwidth'])
+            writer.writerows((int(s), int(d), float(b)) for s, d, b in demands)
+    else:
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write('<?xml version="1.0" encoding="UTF-8"?>\n')
+            f.write(f'<graphml xmlns="{GRAPHML_NS}">\n')
+            f.write('  <key id="capacity" for="edge" attr.name="capacity" attr.type="double"/>\n')
+            f.write('  <key id="demands" for="graph" attr.name="demands" attr.type="string"/>\n')
+            f.write('  <graph id="network" edgedefault="directed">\n')
+            demands_json = json.dumps([[int(s), int(d), float(b)] for s, d, b in demands])
+            f.write(f'    <data key="demands">{demands_json}</data>\n')
+            for node in range(num_nodes):
+                f.write(f'    <node id="n{node}"/>\n')
+            for u, v, c in edges:
+                f.write(f'    <edge source="n{int(u)}" target="n{int(v)}">'
+                        f'<data key="capacity">{float(c)!r}</data></edge>\n')
+            f.write('  </graph>\n</graphml>\n')
@@ -0,0 +1,277 @@
+"""
+Protected allocation with link-disjoint primary and backup paths
+
+Every accepted demand reserves a primary path and a backup path that shares
+no link with it, so any single link failure leaves one of them intact. The
+pair is found with Suurballe's algorithm: one Dijkstra from the source, a
+second Dijkstra on reduced costs in which the links of the first path can
+only be crossed backwards, and the overlapping links are cancelled. That is
+two shortest-path searches, O(E log V), instead of checking every pair of
+paths from find_all_paths.
+
+Backup capacity is either dedicated (every backup reserves its full bandwidth)
+or shared: backups of demands whose primaries have no link in common cannot be
+needed at the same time under a single link failure, so on every link only the
+largest bandwidth needed for any one failed link is reserved.
+"""
+import heapq
+import math
+from typing import Dict, List, Optional, Tuple
+import numpy as np
+
+from Allocation.links import LinkArcs, residual_links
+from Allocation.result import AllocationResult
+
+PROTECTION_MODES = ('dedicated', 'shared')
+
+
+def _dijkstra(adjacency: List[List[Tuple[int, object, float]]], source: int,
+              destination: Optional[int] = None) -> Tuple[Dict[int, float], Dict[int, Tuple[int, object]]]:
+    """
+    Distances from source and the (previous node, edge) that reached each node
+    Stops early once destination is settled
+    """
+    distance = {source: 0.0}
+    previous = {}
+    done = set()
+    heap = [(0.0, source)]
+    while heap:
+        dist, node = heapq.heappop(heap)
+        if node in done:
+            continue
+        done.add(node)
+        if node == destination:
+            break
+        for neighbor, edge, weight in adjacency[node]:
+            candidate = dist + weight
+            if neighbor not in done and candidate < distance.get(neighbor, math.inf):
+                distance[neighbor] = candidate
+                previous[neighbor] = (node, edge)
+                heapq.heappush(heap, (candidate, neighbor))
+    return distance, previous
+
+
+def _trace(previous: Dict[int, Tuple[int, object]], source: int, destination: int) -> List[object]:
+    edges = []
+    node = destination
+    while node != source:
+        node, edge = previous[node]
+        edges.append(edge)
+    return edges[::-1]
+
+
+def disjoint_pair(links: LinkArcs, source: int, destination: int, usable: np.ndarray,
+                  weights: Optional[np.ndarray] = None) -> Optional[Tuple[Tuple[List[int], List[int]],
+                                                                            Tuple[List[int], List[int]]]]:
+    """
+    Two link-disjoint paths of minimum total weight (Suurballe)
+
+    Arcs of the same resource (both directions of a link) count as one link.
+    Returns ((nodes, arcs), (nodes, arcs)) with the shorter path first, or
+    None if the network has no two link-disjoint paths over usable arcs.
+    """
+    weights = np.ones(links.num_arcs) if weights is None else weights
+    arcs = np.flatnonzero(usable)
+    sources = links.sources[arcs].tolist()
+    destinations = links.destinations[arcs].tolist()
+    arc_weights = weights[arcs].tolist()
+
+    adjacency = [[] for _ in range(links.num_nodes)]
+    for arc, u, v, w in zip(arcs.tolist(), sources, destinations, arc_weights):
+        adjacency[u].append((v, arc, w))
+    distance, previous = _dijkstra(adjacency, source)
+    if destination not in distance:
+        return None
+    first = _trace(previous, source, destination)
+
+    # Residual graph: links of the first path may only be crossed backwards,
+    # at zero reduced cost; every other arc gets w(u, v) + d(u) - d(v) >= 0
+    first_resources = {int(links.resources[arc]) for arc in first}
+    residual = [[] for _ in range(links.num_nodes)]
+    for arc, u, v, w in zip(arcs.tolist(), sources, destinations, arc_weights):
+        if int(links.resources[arc]) in first_resources or u not in distance or v not in distance:
+            continue
+        residual[u].append((v, arc, max(w + distance[u] - distance[v], 0.0)))
+    for arc in first:
+        u, v = int(links.sources[arc]), int(links.destinations[arc])
+        residual[v].append((u, ('reverse', arc), 0.0))
+    _, previous = _dijkstra(residual, source, destination)
+    if destination not in previous:
+        return None
+    second = _trace(previous, source, destination)
+
+    # Cancel the links used in both directions and split the rest into two paths
+    cancelled = {edge[1] for edge in second if isinstance(edge, tuple)}
+    successors: Dict[int, List[int]] = {}
+    for arc in first + [edge for edge in second if not isinstance(edge, tuple)]:
+        if arc not in cancelled:
+            successors.setdefault(int(links.sources[arc]), []).append(arc)
+
+    paths = []
+    for _ in range(2):
+        nodes, path_arcs = [source], []
+        while nodes[-1] != destination:
+            arc = successors[nodes[-1]].pop()
+            node = int(links.destinations[arc])
+            if node in nodes:
+                # Zero-weight cycle left by the cancellation: drop it
+                position = nodes.index(node)
+                del nodes[position + 1:], path_arcs[position:]
+                continue
+            path_arcs.append(arc)
+            nodes.append(node)
+        paths.append((nodes, path_arcs))
+    paths.sort(key=lambda path: sum(weights[arc] for arc in path[1]))
+    return paths[0], paths[1]
+
+
+class _BackupLedger:
+    """
+    Capacity bookkeeping per link resource for primary and backup reservations
+    """
+
+    def __init__(self, links: LinkArcs, mode: str):
+        self.links = links
+        self.mode = mode
+        self.free = links.resource_capacity.astype(float).copy()
+        self.reserved = np.zeros(links.num_resources)
+        # Shared mode: backup resource -> {primary resource that fails: bandwidth needed}
+        self.need: Dict[int, Dict[int, float]] = {}
+
+    def backup_increase(self, primary: np.ndarray, backup: np.ndarray, bandwidth: float) -> np.ndarray:
+        """
+        Extra reservation each backup resource needs to protect this primary
+        """
+        if self.mode == 'dedicated':
+            return np.full(len(backup), float(bandwidth))
+        increase = np.empty(len(backup))
+        for position, r in enumerate(backup.tolist()):
+            need = self.need.get(r, {})
+            worst = max((need.get(f, 0.0) for f in primary.tolist()), default=0.0) + bandwidth
+            increase[position] = max(worst - self.reserved[r], 0.0)
+        return increase
+
+    def fits(self, primary: np.ndarray, backup: np.ndarray, bandwidth: float) -> Optional[np.ndarray]:
+        if np.any(self.free[primary] < bandwidth):
+            return None
+        increase = self.backup_increase(primary, backup, bandwidth)
+        if np.any(self.free[backup] < increase):
+            return None
+        return increase
+
+    def reserve(self, primary: np.ndarray, backup: np.ndarray, bandwidth: float, increase: np.ndarray) -> None:
+        self.free[primary] -= bandwidth
+        self.free[backup] -= increase
+        self.reserved[backup] += increase
+        if self.mode == 'shared':
+            for r in backup.tolist():
+                need = self.need.setdefault(r, {})
+                for f in primary.tolist():
+                    need[f] = need.get(f, 0.0) + bandwidth
+
+
+def protected_allocation(allocator, mode: str = 'dedicated', commit: bool = True) -> AllocationResult:
+    """
+    Allocate every demand on a primary path protected by a link-disjoint backup
+
+    Args:
+        mode: 'dedicated' or 'shared' backup capacity
+        commit: reserve primary paths and backup capacity on the allocator
+
+    Demands without two link-disjoint paths with enough capacity are rejected.
+    The result reports the capacity (bandwidth x hops) reserved for primaries
+    and for backups; their ratio is the protection overhead (see KPIs.kpi).
+    """
+    if mode not in PROTECTION_MODES:
+        raise ValueError(f"Modo de protección desconocido: {mode} (usa {', '.join(PROTECTION_MODES)})")
+    links = residual_links(allocator)
+    ledger = _BackupLedger(links, mode)
+    demands = allocator.demands
+
+    accepted = []
+    rejected = []
+    for demand in demands:
+        bandwidth = demand.bandwidth
+        pair = None
+        increase = None
+        if demand.source != demand.destination:
+            # Shared mode first looks through links whose reserved backup could be reused
+            masks = [ledger.free[links.resources] >= bandwidth]
+            if mode == 'shared':
+                masks.insert(0, (ledger.free + ledger.reserved)[links.resources] >= bandwidth)
+            for usable in masks:
+                found = disjoint_pair(links, demand.source, demand.destination, usable)
+                if found is None:
+                    continue
+                for primary, backup in (found, found[::-1]):
+                    increase = ledger.fits(links.resources[primary[1]], links.resources[backup[1]], bandwidth)
+                    if increase is not None:
+                        pair = (primary, backup)
+                        break
+                if pair is not None:
+                    break
+        if pair is None:
+            rejected.append(demand.index)
+            continue
+        (primary_nodes, primary_arcs), (backup_nodes, backup_arcs) = pair
+        ledger.reserve(links.resources[primary_arcs], links.resources[backup_arcs], bandwidth, increase)
+        reservations = [([int(links.sources[arc]), int(links.destinations[arc])], float(amount))
+                        for arc, amount in zip(backup_arcs, increase) if amount > 0]
+        accepted.append((demand.index, primary_nodes, backup_nodes, reservations))
+
+    details = []
+    total_revenue = total_cost = 0.0
+    primary_capacity = backup_capacity = 0.0
+    for k, primary, backup, reservations in accepted:
+        demand = demands[k]
+        bandwidth = demand.bandwidth
+        backup_cost = sum(allocator.calculate_path_cost(hop, amount) for hop, amount in reservations)
+        cost = allocator.calculate_path_cost(primary, bandwidth) + backup_cost
+        revenue = allocator.calculate_revenue(demand)
+        total_revenue += revenue
+        total_cost += cost
+        primary_capacity += bandwidth * (len(primary) - 1)
+        backup_capacity += sum(amount for _, amount in reservations)
+        details.append({
+            'demand_index': k,
+            'source': demand.source,
+            'destination': demand.destination,
+            'bandwidth': bandwidth,
+            'path': primary,
+            'backup_path': backup,
+            'path_length': len(primary) - 1,
+            'cost': cost,
+            'revenue': revenue
+        })
+
+    scenario = [(k, primary) for k, primary, _, _ in accepted]
+    if commit:
+        for k, primary, _, reservations in accepted:
+            allocator.allocate_path(primary, demands[k].bandwidth)
+            for hop, amount in reservations:
+                allocator.allocate_path(hop, amount)
+        allocator.allocated_demands = [demands[k] for k, _ in scenario]
+        allocator.rejected_demands = [demands[k] for k in rejected]
+        allocator.allocation_paths = {k: primary for k, primary in scenario}
+        allocator.current_revenue = total_revenue
+        allocator.current_cost = total_cost
+
+    num_demands = len(demands)
+    print(f"Asignación protegida ({mode}): {len(accepted)} de {num_demands} demandas, "
+          f"sobrecoste de protección {backup_capacity / primary_capacity if primary_capacity else 0:.2f}")
+    return AllocationResult({
+        'success': bool(accepted),
+        'mode': f'protected_{mode}',
+        'acceptance_ratio': len(accepted) / num_demands if num_demands else 0,
+        'revenue_cost_ratio': total_revenue / total_cost if total_cost > 0 else 0,
+        'allocated_demands': scenario,
+        'rejected_demands': rejected,
+        'backup_paths': {k: backup for k, _, backup, _ in accepted},
+        # Per demand, the (hop, bandwidth) backup reservations to undo with deallocate_path
+        'backup_reservations': {k: reservations for k, _, _, reservations in accepted},
+        'total_revenue': total_revenue,
+        'total_cost': total_cost,
+        'primary_capacity': primary_capacity,
+        'backup_capacity': backup_capacity,
+        'allocation_details': details
+    })
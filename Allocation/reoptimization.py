@@ -0,0 +1,156 @@
+"""
+Incremental reoptimization (defragmentation) of existing allocations
+
+Under churn, demands keep the long paths that were the only option when they
+arrived. reoptimize() picks a bounded subset of current allocations, the ones
+holding the most bandwidth x hops, and migrates each one to a shorter path
+on the residual network. Every migration runs as a transaction on top of
+deallocate_path / allocate_path and is rolled back if it cannot complete, so
+the network is never left half-migrated. Rejected demands can then be
+re-admitted on the freed capacity.
+"""
+from typing import Dict, List
+import numpy as np
+
+
+class PathTransaction:
+    """
+    Groups path reservations and releases so they can be undone together
+
+        with PathTransaction(allocator) as transaction:
+            transaction.deallocate(old_path, bandwidth)
+            transaction.allocate(new_path, bandwidth)   # raises -> everything is undone
+
+    deallocate_path is not an exact inverse of allocate_path on links whose
+    two directions hold different residual capacities, so a rollback restores
+    the residual capacities saved before the first operation.
+    """
+
+    def __init__(self, allocator):
+        self.allocator = allocator
+        self._saved = None
+
+    def _save(self) -> None:
+        if self._saved is None:
+            capacity = self.allocator.capacity_matrix
+            # The original capacities are read-only and can be kept as they are
+            self._saved = capacity if capacity is self.allocator.original_capacity_matrix else capacity.copy()
+
+    def allocate(self, path: List[int], bandwidth: float) -> None:
+        if not self.allocator.can_allocate_path(path, bandwidth):
+            raise ValueError(f"Capacidad insuficiente en el camino {path}")
+        self._save()
+        self.allocator.allocate_path(path, bandwidth)
+
+    def deallocate(self, path: List[int], bandwidth: float) -> None:
+        self._save()
+        self.allocator.deallocate_path(path, bandwidth)
+
+    def rollback(self) -> None:
+        if self._saved is not None:
+            self.allocator.capacity_matrix = self._saved
+        self._saved = None
+
+    def commit(self) -> None:
+        self._saved = None
+
+    def __enter__(self) -> 'PathTransaction':
+        return self
+
+    def __exit__(self, exc_type, exc, traceback) -> bool:
+        if exc_type is None:
+            self.commit()
+        else:
+            self.rollback()
+        return False
+
+
+def _residual_total(allocator) -> float:
+    return float(np.sum(allocator.capacity_matrix))
+
+
+def reoptimize(allocator, migration_budget: int = 10, candidate_factor: int = 4,
+               min_hops_saved: int = 1, readmit: bool = True) -> Dict:
+    """
+    Migrate up to migration_budget allocations to shorter paths
+
+    Args:
+        migration_budget: maximum number of demands moved
+        candidate_factor: only the candidate_factor * budget allocations with
+            the largest bandwidth x hops footprint are examined
+        min_hops_saved: a migration must shorten the path by at least this much
+        readmit: afterwards, try to admit previously rejected demands
+
+    Returns the migrations done (with the cost of each new path and the revenue
+    of the demand), the capacity freed, and the acceptance ratio before and
+    after. A migration changes the cost of a demand but not its revenue.
+    """
+    demands = allocator.demands
+    num_demands = len(demands)
+    acceptance_before = len(allocator.allocated_demands) / num_demands if num_demands else 0
+    residual_before = _residual_total(allocator)
+
+    footprint = sorted(allocator.allocation_paths.items(),
+                       key=lambda item: demands.bandwidths[item[0]] * (len(item[1]) - 1), reverse=True)
+    candidates = footprint[:max(migration_budget * candidate_factor, 0)]
+
+    migrations = []
+    failed = 0
+    for demand_idx, old_path in candidates:
+        if len(migrations) >= migration_budget:
+            break
+        if len(old_path) - 1 <= min_hops_saved:
+            continue
+        demand = demands[demand_idx]
+        bandwidth = demand.bandwidth
+        try:
+            with PathTransaction(allocator) as transaction:
+                transaction.deallocate(old_path, bandwidth)
+                new_path = allocator.find_shortest_path(demand.source, demand.destination, bandwidth)
+                if new_path is None or len(old_path) - len(new_path) < min_hops_saved:
+                    # Nothing better: undo the release
+                    raise LookupError
+                transaction.allocate(new_path, bandwidth)
+        except LookupError:
+            continue
+        except ValueError:
+            failed += 1
+            continue
+
+        allocator.allocation_paths[demand_idx] = new_path
+        cost = allocator.calculate_path_cost(new_path, bandwidth)
+        allocator.current_cost += cost - allocator.calculate_path_cost(old_path, bandwidth)
+        migrations.append({'demand_index': demand_idx, 'old_path': old_path, 'new_path': new_path,
+                           'hops_saved': len(old_path) - len(new_path), 'cost': cost,
+                           'revenue': allocator.calculate_revenue(demand)})
+
+    residual_after_migration = _residual_total(allocator)
+
+    readmitted = []
+    if readmit:
+        still_rejected = []
+        for demand in allocator.rejected_demands:
+            path = allocator.find_shortest_path(demand.source, demand.destination, demand.bandwidth)
+            if path is None:
+                still_rejected.append(demand)
+                continue
+            allocator.allocate_path(path, demand.bandwidth)
+            allocator.allocation_paths[demand.index] = path
+            allocator.allocated_demands.append(demand)
+            allocator.current_revenue += allocator.calculate_revenue(demand)
+            allocator.current_cost += allocator.calculate_path_cost(path, demand.bandwidth)
+            readmitted.append(demand.index)
+        allocator.rejected_demands = still_rejected
+
+    acceptance_after = len(allocator.allocated_demands) / num_demands if num_demands else 0
+    print(f"Reoptimización: {len(migrations)} migraciones, "
+          f"{residual_after_migration - residual_before:.2f} Mbps liberados, "
+          f"{len(readmitted)} demandas readmitidas")
+    return {
+        'migrations': migrations,
+        'failed_migrations': failed,
+        'capacity_freed': residual_after_migration - residual_before,
+        'readmitted_demands': readmitted,
+        'acceptance_ratio_before': acceptance_before,
+        'acceptance_ratio_after': acceptance_after,
+    }
@@ -0,0 +1,70 @@
+"""
+Lightweight allocation result
+
+AllocationResult keeps the summary fields of an allocation and the chosen
+(demand_index, path) scenario. The per-demand 'allocation_details' list is
+only built the first time it is read, and the object behaves as a read-only
+dict so existing code can keep using result['...'] and result.get(...).
+"""
+from collections.abc import Mapping
+from typing import Dict, Iterator, List, Tuple
+
+DETAILS_KEY = 'allocation_details'
+
+
+class AllocationResult(Mapping):
+    __slots__ = ('_fields', '_allocator', '_scenario', '_details')
+
+    def __init__(self, fields: Dict, allocator=None, scenario: List[Tuple[int, List[int]]] = ()):
+        # Callers that already hold the details (e.g. split allocations) pass them in fields
+        self._details = fields.pop(DETAILS_KEY, None)
+        self._fields = fields
+        self._allocator = allocator
+        self._scenario = scenario
+
+    @property
+    def allocation_details(self) -> List[Dict]:
+        if self._details is None:
+            self._details = self._build_details()
+            # The allocator is no longer needed once the details exist
+            self._allocator = None
+        return self._details
+
+    def _build_details(self) -> List[Dict]:
+        allocator = self._allocator
+        details = []
+        for demand_idx, path in self._scenario:
+            demand = allocator.demands[demand_idx]
+            bandwidth = demand.bandwidth
+            details.append({
+                'demand_index': demand_idx,
+                'source': demand.source,
+                'destination': demand.destination,
+                'bandwidth': bandwidth,
+                'path': path,
+                'path_length': len(path) - 1,
+                'cost': allocator.calculate_path_cost(path, bandwidth),
+                'revenue': allocator.calculate_revenue(demand)
+            })
+        return details
+
+    def __getitem__(self, key: str):
+        if key == DETAILS_KEY:
+            return self.allocation_details
+        return self._fields[key]
+
+    def __iter__(self) -> Iterator[str]:
+        yield from self._fields
+        yield DETAILS_KEY
+
+    def __len__(self) -> int:
+        return len(self._fields) + 1
+
+    def to_dict(self) -> Dict:
+        """
+        Plain dict copy with the details materialized
+        """
+        return dict(self.items())
+
+    def __repr__(self) -> str:
+        return f"AllocationResult({self._fields!r})"
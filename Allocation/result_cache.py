@@ -0,0 +1,151 @@
+"""
+Disk-backed cache of allocation results
+
+Results are stored in a SQLite database keyed by a canonical hash of the
+capacity matrix, the demand list and the solver settings, so re-running an
+identical instance returns the stored result instead of redoing the search.
+The database is bounded in size: the least recently used entries are evicted
+first. The same file can be shared by the GUI and batch runs (WAL mode).
+
+Entries are pickled; the cache is meant for a local, trusted directory.
+"""
+import hashlib
+import json
+import os
+import pickle
+import sqlite3
+import time
+from typing import Dict, Optional
+import numpy as np
+
+from Allocation.allocation import _clean_capacity_array
+from Allocation.demands import DemandTable
+from Allocation.result import AllocationResult
+
+DEFAULT_CACHE_PATH = os.path.join(os.path.expanduser('~'), '.cache', 'network_virtualization', 'results.sqlite')
+DEFAULT_MAX_BYTES = 64 * 1024 * 1024
+# Bump when the stored result layout or the solvers' semantics change
+CACHE_FORMAT_VERSION = 2
+
+
+def canonical_key(network_data: Dict, solver: str = 'brute_force', settings: Optional[Dict] = None) -> str:
+    """
+    SHA-256 of the topology, the demands and the solver settings
+    Equal inputs give the same key whatever their container type (lists, arrays)
+    """
+    digest = hashlib.sha256()
+    digest.update(f"v{CACHE_FORMAT_VERSION}:{solver}:".encode())
+    digest.update(json.dumps(settings or {}, sort_keys=True, default=str).encode())
+
+    if 'capacity_matrix' in network_data:
+        matrix = np.ascontiguousarray(_clean_capacity_array(network_data['capacity_matrix']), dtype=np.float64)
+        digest.update(b'matrix' + str(matrix.shape).encode())
+        digest.update(matrix.tobytes())
+    else:
+        edges = np.asarray(network_data['edges'], dtype=np.float64).reshape(-1, 3)
+        edges = np.ascontiguousarray(edges[np.lexsort((edges[:, 1], edges[:, 0]))])
+        digest.update(f"edges:{network_data.get('num_nodes')}".encode())
+        digest.update(edges.tobytes())
+
+    # Every column the allocator reads, with the defaults it fills in for short rows
+    demands = DemandTable.from_rows(network_data.get('demands', [])).as_array().astype(np.float64)
+    digest.update(b'demands')
+    digest.update(np.ascontiguousarray(demands).tobytes())
+    return digest.hexdigest()
+
+
+class ResultCache:
+    def __init__(self, path: str = DEFAULT_CACHE_PATH, max_bytes: int = DEFAULT_MAX_BYTES):
+        self.path = path
+        self.max_bytes = max_bytes
+        if path != ':memory:':
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._connection = sqlite3.connect(path, timeout=30)
+        self._connection.execute('PRAGMA journal_mode=WAL')
+        self._connection.execute(
+            'CREATE TABLE IF NOT EXISTS results ('
+            ' key TEXT PRIMARY KEY, value BLOB NOT NULL, size INTEGER NOT NULL,'
+            ' created REAL NOT NULL, last_access REAL NOT NULL)')
+        self._connection.execute('CREATE INDEX IF NOT EXISTS results_lru ON results (last_access)')
+        self._connection.commit()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: str) -> Optional[Dict]:
+        row = self._connection.execute('SELECT value FROM results WHERE key = ?', (key,)).fetchone()
+        if row is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        with self._connection:
+            self._connection.execute('UPDATE results SET last_access = ? WHERE key = ?', (time.time(), key))
+        return pickle.loads(row[0])
+
+    def put(self, key: str, result) -> None:
+        value = pickle.dumps(dict(result), protocol=pickle.HIGHEST_PROTOCOL)
+        if len(value) > self.max_bytes:
+            return
+        now = time.time()
+        with self._connection:
+            self._connection.execute('INSERT OR REPLACE INTO results VALUES (?, ?, ?, ?, ?)',
+                                     (key, value, len(value), now, now))
+            self._evict()
+
+    def _evict(self) -> None:
+        """
+        Drop least recently used entries until the cache fits in max_bytes
+        """
+        total = self._connection.execute('SELECT COALESCE(SUM(size), 0) FROM results').fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        for key, size in self._connection.execute(
+                'SELECT key, size FROM results ORDER BY last_access').fetchall():
+            self._connection.execute('DELETE FROM results WHERE key = ?', (key,))
+            total -= size
+            if total <= self.max_bytes:
+                break
+
+    def clear(self) -> None:
+        with self._connection:
+            self._connection.execute('DELETE FROM results')
+
+    def stats(self) -> Dict:
+        entries, size = self._connection.execute(
+            'SELECT COUNT(*), COALESCE(SUM(size), 0) FROM results').fetchone()
+        return {'entries': entries, 'bytes': size, 'max_bytes': self.max_bytes,
+                'hits': self.hits, 'misses': self.misses}
+
+    def close(self) -> None:
+        self._connection.close()
+
+    def allocate(self, allocator, network_data: Dict, **settings) -> AllocationResult:
+        """
+        Run offline_brute_force_allocation through the cache
+
+        On a hit the stored allocation is applied to the allocator (paths
+        reserved, allocated/rejected lists and totals restored) so it ends in
+        the same state as after a real search.
+        """
+        key = canonical_key(network_data, 'brute_force', settings)
+        stored = self.get(key)
+        if stored is not None:
+            apply_result(allocator, stored)
+            return AllocationResult(stored)
+        result = allocator.offline_brute_force_allocation(**settings)
+        self.put(key, result)
+        return result
+
+
+def apply_result(allocator, result: Dict) -> None:
+    """
+    Reserve the paths of a stored single-path result on a fresh allocator
+    """
+    scenario = result.get('allocated_demands', []) if result.get('success') else []
+    for demand_idx, path in scenario:
+        allocator.allocate_path(path, allocator.demands[demand_idx].bandwidth)
+    allocated = {demand_idx for demand_idx, _ in scenario}
+    allocator.allocated_demands = [allocator.demands[i] for i in sorted(allocated)]
+    allocator.rejected_demands = [d for d in allocator.demands if d.index not in allocated]
+    allocator.allocation_paths = {demand_idx: path for demand_idx, path in scenario}
+    allocator.current_revenue = result.get('total_revenue', 0)
+    allocator.current_cost = result.get('total_cost', 0)
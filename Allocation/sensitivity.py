@@ -0,0 +1,172 @@
+"""
+Capacity-upgrade sensitivity analysis from LP shadow prices
+
+The path LP of Allocation.mcf is solved for all demands on the original link
+capacities. The dual value of a link's capacity constraint is the gain of the
+LP objective per Mbps added to that link, so solving it once with acceptance
+weights and once with revenue weights ranks every link by marginal value.
+
+Duals are only exact for small upgrades, so the best candidates are then
+re-solved with their capacity raised by `delta` Mbps. The LP re-solves start
+from the columns of the base solve and only price the new paths the extra
+capacity makes worthwhile; their gains are still fractional bounds. The
+figures the ranking ends on come from running an integer allocator (the
+brute force by default) on a fresh copy of the network with and without the
+upgrade, which gives the demands and revenue actually gained.
+"""
+from typing import Callable, Dict, Optional, Tuple
+import numpy as np
+
+from Allocation.links import residual_links
+from Allocation.mcf import _require_scipy, demand_weights, generate_columns
+from Allocation.snapshot import _export_state, _restore_state
+
+SENSITIVITY_OBJECTIVES = ('revenue', 'acceptance')
+
+
+def _objective(solution: Dict, weights: np.ndarray) -> float:
+    """
+    Weighted accepted fraction of the LP solution, without the detour term
+    """
+    columns = solution['columns']
+    if not len(columns):
+        return 0.0
+    demand = np.asarray(columns.demand, dtype=np.int64)
+    fractions = np.clip(np.bincount(demand, weights=solution['values'], minlength=len(weights)), 0.0, 1.0)
+    return float(weights @ fractions)
+
+
+def _fresh_allocator(allocator, link: Optional[Tuple[int, int]] = None, delta: float = 0.0):
+    """
+    Unallocated copy of allocator on its original capacities, with both
+    directions of link (if given) raised by delta
+    """
+    arrays, meta = _export_state(allocator)
+    original = np.array(arrays['original_capacity'], dtype=float)
+    if link is not None:
+        for u, v in (link, link[::-1]):
+            if original.ndim == 1:
+                edge_id = allocator.edge_id(u, v)
+                if edge_id >= 0:
+                    original[edge_id] += delta
+            elif original[u, v] > 0:
+                original[u, v] += delta
+    arrays = {name: array for name, array in arrays.items()
+              if name == 'demands' or name in allocator._snapshot_arrays}
+    arrays['original_capacity'] = original
+    meta = dict(meta, residual_shared=True, allocated_demands=[], rejected_demands=[],
+                current_revenue=0, current_cost=0)
+    return _restore_state(arrays, meta)
+
+
+def _allocated_value(result, revenue_weights: np.ndarray) -> Tuple[int, float]:
+    """
+    Accepted demands and their revenue in an allocation result
+    """
+    accepted = [entry[0] for entry in result.get('allocated_demands', [])] if result.get('success') else []
+    return len(accepted), float(revenue_weights[accepted].sum()) if accepted else 0.0
+
+
+def _brute_force(allocator):
+    return allocator.offline_brute_force_allocation()
+
+
+def capacity_sensitivity(allocator, objective: str = 'revenue', top: int = 5,
+                         delta: Optional[float] = None, max_iterations: int = 200,
+                         allocate: Optional[Callable] = None) -> Dict:
+    """
+    Rank links by the value of adding capacity to them
+
+    Args:
+        objective: 'revenue' or 'acceptance', the dual used for the ranking
+        top: number of best-ranked links checked by re-solving
+        delta: Mbps added in the check (default: the largest demand)
+        allocate: integer allocator run on each upgraded network, called as
+            allocate(allocator) and returning an allocation result (default:
+            offline_brute_force_allocation; pass e.g.
+            Allocation.column_generation.column_generation_allocation for large networks)
+
+    Returns 'links', one row per link sorted by marginal value, with the
+    acceptance-ratio and revenue gains per Mbps from the duals. The checked
+    links are listed first, ordered by what the allocator gained, with the
+    LP bound gains per Mbps ('lp_*') and the 'accepted_gain' and
+    'revenue_gain' of the allocation after the upgrade. The base figures of
+    the LP ('lp_*') and of the allocator ('base_*') are reported as well.
+    """
+    if objective not in SENSITIVITY_OBJECTIVES:
+        raise ValueError(f"Objetivo no soportado: {objective} (usar {', '.join(SENSITIVITY_OBJECTIVES)})")
+    _require_scipy()
+    demands = allocator.demands
+    num_demands = len(demands)
+    bandwidths = demands.bandwidths.astype(float)
+    if delta is None:
+        delta = float(bandwidths.max()) if num_demands else 1.0
+
+    links = residual_links(allocator, allocator.original_capacity_matrix)
+    weights = {name: demand_weights(allocator, name) for name in SENSITIVITY_OBJECTIVES}
+    base = {name: generate_columns(allocator, links, weights[name], max_iterations=max_iterations)
+            for name in SENSITIVITY_OBJECTIVES}
+    for name, solution in base.items():
+        if solution['status'] != 0:
+            raise RuntimeError(f"El modelo de flujo no encontró solución: {solution['message']}")
+    base_value = {name: _objective(base[name], weights[name]) for name in base}
+    duals = {name: np.maximum(base[name]['duals'][num_demands:num_demands + links.num_resources], 0.0)
+             for name in base}
+
+    # One row per link resource, named by its lowest-numbered arc
+    first_arc = np.full(links.num_resources, -1)
+    for arc in range(links.num_arcs - 1, -1, -1):
+        first_arc[links.resources[arc]] = arc
+    rows = []
+    for resource in range(links.num_resources):
+        arc = first_arc[resource]
+        u, v = int(links.sources[arc]), int(links.destinations[arc])
+        rows.append({
+            'link': (min(u, v), max(u, v)),
+            'resource': resource,
+            'capacity': float(links.resource_capacity[resource]),
+            'acceptance_gain_per_mbps': float(duals['acceptance'][resource] / num_demands) if num_demands else 0.0,
+            'revenue_gain_per_mbps': float(duals['revenue'][resource]),
+        })
+    key = 'revenue_gain_per_mbps' if objective == 'revenue' else 'acceptance_gain_per_mbps'
+    rows.sort(key=lambda row: (-row[key], -row['acceptance_gain_per_mbps' if objective == 'revenue'
+                                                else 'revenue_gain_per_mbps']))
+
+    allocate = _brute_force if allocate is None else allocate
+    base_accepted, base_revenue = _allocated_value(allocate(_fresh_allocator(allocator)), weights['revenue'])
+    for row in rows[:top]:
+        upgraded_capacity = links.resource_capacity.copy()
+        upgraded_capacity[row['resource']] += delta
+        upgraded = links._replace(resource_capacity=upgraded_capacity)
+        gains = {}
+        for name in SENSITIVITY_OBJECTIVES:
+            solution = generate_columns(allocator, upgraded, weights[name], max_iterations=max_iterations,
+                                        initial_columns=base[name]['columns'])
+            gains[name] = (_objective(solution, weights[name]) - base_value[name]) / delta
+        row['lp_acceptance_gain_per_mbps'] = gains['acceptance'] / num_demands if num_demands else 0.0
+        row['lp_revenue_gain_per_mbps'] = gains['revenue']
+
+        accepted, revenue = _allocated_value(allocate(_fresh_allocator(allocator, row['link'], delta)),
+                                             weights['revenue'])
+        row['accepted_gain'] = accepted - base_accepted
+        row['revenue_gain'] = revenue - base_revenue
+    # Duals overstate the gain once an upgrade changes the binding links and
+    # the LP overstates what whole demands can use, so the checked candidates
+    # are ordered by what the allocator gained, then by the LP bound
+    gain, other_gain = (('revenue_gain', 'accepted_gain') if objective == 'revenue'
+                        else ('accepted_gain', 'revenue_gain'))
+    rows[:top] = sorted(rows[:top], key=lambda row: (-row[gain], -row[other_gain], -row['lp_' + key]))
+
+    if rows[:top]:
+        best = rows[0]
+        print(f"Sensibilidad: mejor enlace {best['link']} con {best['accepted_gain']} demandas y "
+              f"{best['revenue_gain']:.3f} de ingresos más al añadir {delta:g} Mbps")
+    return {
+        'objective': objective,
+        'delta': delta,
+        'lp_acceptance_ratio': base_value['acceptance'] / num_demands if num_demands else 0,
+        'lp_revenue': base_value['revenue'],
+        'base_accepted': base_accepted,
+        'base_allocated_revenue': base_revenue,
+        'links': rows,
+    }
@@ -0,0 +1,376 @@
+"""
+Admission-control server over a local TCP socket
+
+AdmissionServer owns a single allocator and answers one JSON object per line:
+
+    {"op": "allocate", "source": 0, "destination": 3, "bandwidth": 5}
+        -> {"ok": true, "session": 7, "path": [0, 1, 3]}
+        -> {"ok": false, "error": "..."}                  (rejected)
+    {"op": "release", "session": 7}  -> {"ok": true}
+    {"op": "status"}                 -> {"ok": true, "status": {...}}
+
+An optional "id" field is echoed back so clients can pipeline requests.
+
+With max_batch > 1 the writer collects mutations for up to batch_window_ms
+(or until max_batch arrive) and admits the allocations of each batch jointly
+with Allocation.batching: a wider window costs latency but lets a burst be
+packed for more revenue. Releases in a batch are applied first.
+
+Every mutation goes through one writer task that applies allocate/release in
+arrival order on a single worker thread, so the allocator is never touched
+concurrently. Status requests never wait for the writer: they read the last
+published status, an immutable snapshot replaced after each mutation. If
+applying a batch raises halfway, its changes are undone and its requests are
+applied again one at a time, so only the failing ones get an error.
+
+Run with:
+    python -m Allocation.server red.json [--port 8765] [--sparse]
+"""
+import argparse
+import asyncio
+import json
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional, Tuple
+
+from Allocation.batching import commit_batch, solve_batch
+
+DEFAULT_HOST = '127.0.0.1'
+DEFAULT_PORT = 8765
+# Pending connections accepted by the listening socket
+DEFAULT_BACKLOG = 4096
+
+
+async def _discard_line(reader: asyncio.StreamReader, buffered: int) -> None:
+    """
+    Drop the rest of a line longer than the reader limit, its newline included
+    """
+    while True:
+        await reader.readexactly(buffered)
+        try:
+            await reader.readuntil(b'\n')
+            return
+        except asyncio.LimitOverrunError as e:
+            buffered = e.consumed
+
+
+class AdmissionServer:
+    def __init__(self, allocator, duration: int = 1, price_per_unit: float = 1.0,
+                 batch_window_ms: float = 0.0, max_batch: int = 1, batch_paths: int = 3,
+                 batch_nodes: int = 20000):
+        """
+        Args:
+            allocator: VirtualNetworkAllocation (or sparse backend) owned by the server
+            duration, price_per_unit: revenue parameters of online requests
+            batch_window_ms: time the writer waits to fill a batch
+            max_batch: largest batch; 1 admits requests one at a time
+            batch_paths, batch_nodes: candidate paths per request and search
+                budget of Allocation.batching.solve_batch
+        """
+        self.allocator = allocator
+        self.duration = duration
+        self.price_per_unit = price_per_unit
+        self.batch_window_ms = batch_window_ms
+        self.max_batch = max(1, max_batch)
+        self.batch_paths = batch_paths
+        self.batch_nodes = batch_nodes
+        self.batches = 0
+        self.batched_requests = 0
+        self.solve_time = 0.0
+        # Admitted online requests keyed by session id
+        self.sessions: Dict[int, Dict] = {}
+        self.admitted = 0
+        self.rejected = 0
+        self._next_session = 0
+        self._queue: Optional[asyncio.Queue] = None
+        self._writer_task: Optional[asyncio.Task] = None
+        self._executor = ThreadPoolExecutor(max_workers=1)
+        self._server = None
+        self._publish()
+
+    # --- State (writer thread only) ---------------------------------------
+
+    def _publish(self) -> None:
+        status = self.allocator.get_network_status()
+        # Online requests never reach the allocator's demand lists
+        requests = self.admitted + self.rejected
+        status.update({
+            'total_demands': requests,
+            'allocated_demands': self.admitted,
+            'rejected_demands': self.rejected,
+            'acceptance_ratio': self.admitted / requests if requests else 0,
+            'num_nodes': self.allocator.num_nodes,
+            'active_sessions': len(self.sessions),
+            'admitted_requests': self.admitted,
+            'rejected_requests': self.rejected,
+            'batches': self.batches,
+            'mean_batch_size': self.batched_requests / self.batches if self.batches else 0,
+            'mean_solve_ms': 1000 * self.solve_time / self.batches if self.batches else 0,
+        })
+        # Rebinding the attribute is atomic: readers see the old or the new snapshot
+        self.status = {key: (value.item() if hasattr(value, 'item') else value)
+                       for key, value in status.items()}
+
+    def _snapshot(self) -> Tuple:
+        allocator = self.allocator
+        capacity = allocator.capacity_matrix
+        # The original capacities are read-only and can be kept as they are
+        if capacity is not allocator.original_capacity_matrix:
+            capacity = capacity.copy()
+        return (capacity, allocator.current_revenue, allocator.current_cost, dict(self.sessions),
+                self._next_session, self.admitted, self.rejected, self.solve_time)
+
+    def _restore(self, snapshot: Tuple) -> None:
+        allocator = self.allocator
+        (allocator.capacity_matrix, allocator.current_revenue, allocator.current_cost, self.sessions,
+         self._next_session, self.admitted, self.rejected, self.solve_time) = snapshot
+
+    def _check_request(self, message: Dict):
+        try:
+            source = int(message['source'])
+            destination = int(message['destination'])
+            bandwidth = float(message['bandwidth'])
+        except (KeyError, TypeError, ValueError):
+            raise ValueError("La petición necesita 'source', 'destination' y 'bandwidth' numéricos")
+        num_nodes = self.allocator.num_nodes
+        if not (0 <= source < num_nodes and 0 <= destination < num_nodes):
+            raise ValueError(f"Nodos fuera de rango: la red tiene {num_nodes} nodos")
+        if bandwidth <= 0:
+            raise ValueError("El ancho de banda debe ser positivo")
+        return source, destination, bandwidth
+
+    def _revenue(self, bandwidth: float) -> float:
+        return self.allocator.calculate_revenue({'bandwidth': bandwidth, 'duration': self.duration,
+                                                 'price_per_unit': self.price_per_unit})
+
+    def _admit(self, message: Dict, path: Optional[List[int]]) -> Dict:
+        """
+        Record a validated request whose path is already reserved (None = rejected)
+        """
+        if path is None:
+            self.rejected += 1
+            return {'ok': False, 'error': 'Capacidad insuficiente'}
+        bandwidth = float(message['bandwidth'])
+        allocator = self.allocator
+        revenue = self._revenue(bandwidth)
+        cost = allocator.calculate_path_cost(path, bandwidth)
+        allocator.current_revenue += revenue
+        allocator.current_cost += cost
+        session = self._next_session
+        self._next_session += 1
+        self.sessions[session] = {'path': path, 'bandwidth': bandwidth, 'revenue': revenue, 'cost': cost}
+        self.admitted += 1
+        return {'ok': True, 'session': session, 'path': path}
+
+    def _allocate(self, message: Dict) -> Dict:
+        try:
+            source, destination, bandwidth = self._check_request(message)
+        except ValueError as e:
+            return {'ok': False, 'error': str(e)}
+        path = self.allocator.find_shortest_path(source, destination, bandwidth)
+        if path is not None:
+            self.allocator.allocate_path(path, bandwidth)
+        return self._admit(message, path)
+
+    def _release(self, message: Dict) -> Dict:
+        try:
+            session = self.sessions.pop(int(message['session']))
+        except (KeyError, TypeError, ValueError):
+            return {'ok': False, 'error': f"Sesión desconocida: {message.get('session')}"}
+        allocator = self.allocator
+        allocator.deallocate_path(session['path'], session['bandwidth'])
+        allocator.current_revenue -= session['revenue']
+        allocator.current_cost -= session['cost']
+        return {'ok': True}
+
+    def _apply_one(self, operation: str, message: Dict) -> Dict:
+        """
+        Apply a single request, undoing whatever it changed if it raises
+        """
+        saved = self._snapshot()
+        try:
+            return self._release(message) if operation == 'release' else self._allocate(message)
+        except Exception as e:
+            self._restore(saved)
+            return {'ok': False, 'error': f"Error interno: {e}"}
+
+    def _apply_batch(self, batch: List[Tuple[str, Dict]]) -> List[Dict]:
+        """
+        Apply the releases of a batch, then admit its allocations jointly
+        """
+        if len(batch) == 1:
+            responses = [self._apply_one(*batch[0])]
+        else:
+            saved = self._snapshot()
+            try:
+                responses = self._apply_jointly(batch)
+            except Exception:
+                self._restore(saved)
+                responses = [self._apply_one(operation, message) for operation, message in batch]
+
+        self.batches += 1
+        self.batched_requests += len(batch)
+        self._publish()
+        return responses
+
+    def _apply_jointly(self, batch: List[Tuple[str, Dict]]) -> List[Dict]:
+        responses: List[Optional[Dict]] = [None] * len(batch)
+        pending = []
+        for position, (operation, message) in enumerate(batch):
+            if operation == 'release':
+                responses[position] = self._release(message)
+                continue
+            try:
+                source, destination, bandwidth = self._check_request(message)
+            except ValueError as e:
+                responses[position] = {'ok': False, 'error': str(e)}
+                continue
+            pending.append((position, (source, destination, bandwidth, self._revenue(bandwidth))))
+
+        if len(pending) == 1:
+            position, _ = pending[0]
+            responses[position] = self._allocate(batch[position][1])
+        elif pending:
+            requests = [request for _, request in pending]
+            solution = solve_batch(self.allocator, requests, self.batch_paths, self.batch_nodes)
+            self.solve_time += solution['solve_time']
+            bandwidths = [bandwidth for _, _, bandwidth, _ in requests]
+            if commit_batch(self.allocator, bandwidths, solution['paths']):
+                for (position, _), path in zip(pending, solution['paths']):
+                    responses[position] = self._admit(batch[position][1], path)
+            else:
+                # The residual changed under the solution: fall back to one at a time
+                for position, _ in pending:
+                    responses[position] = self._allocate(batch[position][1])
+        return responses
+
+    # --- Event loop -------------------------------------------------------
+
+    async def _next_batch(self) -> List[Tuple[str, Dict, asyncio.Future]]:
+        loop = asyncio.get_running_loop()
+        batch = [await self._queue.get()]
+        deadline = loop.time() + self.batch_window_ms / 1000
+        while len(batch) < self.max_batch:
+            if not self._queue.empty():
+                batch.append(self._queue.get_nowait())
+                continue
+            timeout = deadline - loop.time()
+            if timeout <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(self._queue.get(), timeout))
+            except asyncio.TimeoutError:
+                break
+        return batch
+
+    async def _writer(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = await self._next_batch()
+            operations = [(operation, message) for operation, message, _ in batch]
+            try:
+                responses = await loop.run_in_executor(self._executor, self._apply_batch, operations)
+            except Exception as e:
+                responses = [{'ok': False, 'error': f"Error interno: {e}"}] * len(batch)
+            for (_, _, future), response in zip(batch, responses):
+                if not future.done():
+                    future.set_result(response)
+
+    async def submit(self, operation: str, message: Dict) -> Dict:
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put((operation, message, future))
+        return await future
+
+    async def dispatch(self, message: Dict) -> Dict:
+        operation = message.get('op') if isinstance(message, dict) else None
+        if operation == 'status':
+            return {'ok': True, 'status': self.status}
+        if operation in ('allocate', 'release'):
+            return await self.submit(operation, message)
+        return {'ok': False, 'error': f"Operación desconocida: {operation}"}
+
+    async def _respond(self, line: bytes) -> Dict:
+        try:
+            message = json.loads(line)
+        except ValueError:
+            return {'ok': False, 'error': 'JSON no válido'}
+        response = await self.dispatch(message)
+        if isinstance(message, dict) and 'id' in message:
+            response = {**response, 'id': message['id']}
+        return response
+
+    async def handle_client(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        try:
+            while True:
+                try:
+                    line = await reader.readuntil(b'\n')
+                except asyncio.IncompleteReadError as e:
+                    line = e.partial
+                except asyncio.LimitOverrunError as e:
+                    # Longer than the stream limit: skip it whole so its tail is not read as requests
+                    await _discard_line(reader, e.consumed)
+                    line = None
+                if line is None:
+                    response = {'ok': False, 'error': 'Línea demasiado larga'}
+                elif not line:
+                    break
+                else:
+                    response = await self._respond(line)
+                writer.write(json.dumps(response).encode() + b'\n')
+                await writer.drain()
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    async def start(self, host: str = DEFAULT_HOST, port: int = DEFAULT_PORT,
+                    backlog: int = DEFAULT_BACKLOG):
+        self._queue = asyncio.Queue()
+        self._writer_task = asyncio.create_task(self._writer())
+        self._server = await asyncio.start_server(self.handle_client, host, port, backlog=backlog)
+        return self._server
+
+    async def close(self) -> None:
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+        if self._writer_task is not None:
+            self._writer_task.cancel()
+        self._executor.shutdown(wait=False)
+
+
+async def serve(allocator, host: str = DEFAULT_HOST, port: int = DEFAULT_PORT, **kwargs) -> None:
+    server = AdmissionServer(allocator, **kwargs)
+    listener = await server.start(host, port)
+    addresses = ', '.join(str(sock.getsockname()) for sock in listener.sockets)
+    print(f"Servidor de admisión escuchando en {addresses}")
+    try:
+        await listener.serve_forever()
+    finally:
+        await server.close()
+
+
+def main():
+    from Allocation.allocation import VirtualNetworkAllocation
+    from Allocation.network_io import load_network
+    from Allocation.sparse_allocation import SparseVirtualNetworkAllocation
+
+    parser = argparse.ArgumentParser(description='Servidor de control de admisión')
+    parser.add_argument('network', help='Red en JSON, CSV o GraphML')
+    parser.add_argument('--host', default=DEFAULT_HOST)
+    parser.add_argument('--port', type=int, default=DEFAULT_PORT)
+    parser.add_argument('--sparse', action='store_true', help='Usar el backend disperso')
+    parser.add_argument('--window-ms', type=float, default=0.0, help='Ventana de agrupación de peticiones')
+    parser.add_argument('--max-batch', type=int, default=1, help='Tamaño máximo de lote')
+    args = parser.parse_args()
+
+    network_data = load_network(args.network)
+    backend = SparseVirtualNetworkAllocation if args.sparse else VirtualNetworkAllocation
+    try:
+        asyncio.run(serve(backend(network_data), args.host, args.port,
+                          batch_window_ms=args.window_ms, max_batch=args.max_batch))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == '__main__':
+    main()
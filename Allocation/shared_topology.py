@@ -0,0 +1,220 @@
+"""
+Read-only topology and path store in multiprocessing shared memory
+
+The parent process publishes the original capacities, the backend topology
+index, the demands and, if it has them, the candidate paths of the demands
+once. Workers attach by name and get numpy views over the same memory, so
+only the small descriptor and the per-task residual capacities are pickled
+between processes. Without published paths, paths() enumerates the paths of
+a demand in the calling process the first time they are asked for.
+
+Typical use with a process pool:
+
+    with SharedTopology.create(allocator) as topology:
+        with ProcessPoolExecutor(initializer=attach_worker_topology,
+                                 initargs=(topology.descriptor,)) as pool:
+            ...
+
+and inside the task function:
+
+    topology = worker_topology()
+    allocator = topology.allocator(residual)
+    paths = topology.paths(demand_idx)
+
+Allocators built by allocator() that are still alive when the topology is
+closed get private copies of the shared arrays, so they keep working after
+the blocks are gone. Arrays taken directly from topology.arrays must not be
+used after close().
+"""
+import multiprocessing
+import os
+import weakref
+from multiprocessing import resource_tracker, shared_memory
+from typing import Dict, List, Optional
+import numpy as np
+
+from Allocation.allocation import VirtualNetworkAllocation
+from Allocation.snapshot import _export_state, _restore_state
+
+
+def _attach_block(name: str) -> shared_memory.SharedMemory:
+    """
+    Attach to an existing block without leaving it registered with a resource
+    tracker of this process, which would unlink it when the process exits
+    """
+    try:
+        return shared_memory.SharedMemory(name=name, track=False)
+    except TypeError:
+        pass
+    # Python < 3.13 registers every attached block. Processes started by
+    # multiprocessing share their parent's tracker, which already holds the
+    # creator's registration: registering again is a no-op there, while
+    # unregistering would drop the creator's entry. A process with a tracker
+    # of its own has its registration undone.
+    block = shared_memory.SharedMemory(name=name)
+    if os.name == 'posix' and multiprocessing.parent_process() is None:
+        resource_tracker.unregister(block._name, 'shared_memory')
+    return block
+
+
+class SharedTopology:
+    """
+    Read-only network topology and candidate path store backed by shared memory
+    """
+
+    def __init__(self, blocks: Dict[str, shared_memory.SharedMemory], descriptor: Dict, owner: bool):
+        self._blocks = blocks
+        self.descriptor = descriptor
+        self.owner = owner
+        self._path_cache: Dict[int, List[List[int]]] = {}
+        self._path_allocator = None
+        self._allocators = weakref.WeakSet()
+        self.arrays = {}
+        for name, (_, shape, dtype) in descriptor['arrays'].items():
+            array = np.ndarray(tuple(shape), dtype=np.dtype(dtype), buffer=blocks[name].buf)
+            array.flags.writeable = False
+            self.arrays[name] = array
+
+    @classmethod
+    def create(cls, allocator: VirtualNetworkAllocation,
+               demand_paths: Optional[Dict[int, List[List[int]]]] = None) -> 'SharedTopology':
+        """
+        Copy the allocator topology and, if given, the candidate paths into shared memory
+        """
+        arrays, meta = _export_state(allocator)
+        # Only the read-only topology is shared; residual state stays per worker
+        arrays = {name: array for name, array in arrays.items()
+                  if name == 'original_capacity' or name == 'demands' or name in allocator._snapshot_arrays}
+
+        if demand_paths is not None:
+            path_list = []
+            demand_offsets = np.zeros(len(allocator.demands) + 1, dtype=np.int64)
+            for i in range(len(allocator.demands)):
+                paths = demand_paths.get(i, [])
+                path_list.extend(paths)
+                demand_offsets[i + 1] = len(path_list)
+            path_offsets = np.zeros(len(path_list) + 1, dtype=np.int64)
+            np.cumsum([len(p) for p in path_list], out=path_offsets[1:])
+            arrays['path_demand_offsets'] = demand_offsets
+            arrays['path_offsets'] = path_offsets
+            arrays['path_nodes'] = np.array([node for p in path_list for node in p], dtype=np.int32)
+
+        blocks = {}
+        descriptor = {'meta': {key: meta[key] for key in
+                               ('backend', 'num_nodes', 'total_links', 'total_capacity',
+                                'total_demand', 'network_connected')},
+                      'arrays': {}}
+        try:
+            for name, array in arrays.items():
+                array = np.ascontiguousarray(array)
+                block = shared_memory.SharedMemory(create=True, size=max(array.nbytes, 1))
+                blocks[name] = block
+                np.ndarray(array.shape, dtype=array.dtype, buffer=block.buf)[...] = array
+                descriptor['arrays'][name] = (block.name, array.shape, array.dtype.str)
+        except BaseException:
+            for block in blocks.values():
+                block.close()
+                block.unlink()
+            raise
+        return cls(blocks, descriptor, owner=True)
+
+    @classmethod
+    def attach(cls, descriptor: Dict) -> 'SharedTopology':
+        """
+        Attach to a topology published by SharedTopology.create, without copying it
+        """
+        blocks = {name: _attach_block(block_name)
+                  for name, (block_name, _, _) in descriptor['arrays'].items()}
+        return cls(blocks, descriptor, owner=False)
+
+    def allocator(self, residual: Optional[np.ndarray] = None) -> VirtualNetworkAllocation:
+        """
+        Build an allocator over the shared topology
+        The residual capacities default to the shared originals and are copied
+        on the first allocation; pass a residual array to start from another state
+        """
+        meta = dict(self.descriptor['meta'], residual_shared=residual is None)
+        arrays = dict(self.arrays)
+        if residual is not None:
+            arrays['capacity'] = residual
+        allocator = _restore_state(arrays, meta)
+        self._allocators.add(allocator)
+        return allocator
+
+    def _detach(self, allocator: VirtualNetworkAllocation) -> None:
+        """
+        Replace the shared arrays an allocator still holds with private copies
+        """
+        copies = {}
+        for name in ('original_capacity_matrix', '_capacity_matrix') + tuple(allocator._snapshot_arrays):
+            array = getattr(allocator, name)
+            if not any(np.shares_memory(array, shared) for shared in self.arrays.values()):
+                continue
+            # The residual matrix may be the original itself (copy-on-write)
+            if id(array) not in copies:
+                copy = array.copy()
+                copy.flags.writeable = array.flags.writeable
+                copies[id(array)] = copy
+            setattr(allocator, name, copies[id(array)])
+
+    def paths(self, demand_idx: int) -> List[List[int]]:
+        """
+        Return the candidate paths of a demand from the shared path store
+        If none was published, every simple path on the original capacities
+        is enumerated here on first use and kept for later calls
+        """
+        if 'path_nodes' not in self.arrays:
+            if demand_idx not in self._path_cache:
+                if self._path_allocator is None:
+                    self._path_allocator = self.allocator()
+                demand = self._path_allocator.demands[demand_idx]
+                self._path_cache[demand_idx] = self._path_allocator.find_all_paths(demand.source,
+                                                                                   demand.destination)
+            return [list(path) for path in self._path_cache[demand_idx]]
+        demand_offsets = self.arrays['path_demand_offsets']
+        path_offsets = self.arrays['path_offsets']
+        nodes = self.arrays['path_nodes']
+        return [nodes[path_offsets[p]:path_offsets[p + 1]].tolist()
+                for p in range(demand_offsets[demand_idx], demand_offsets[demand_idx + 1])]
+
+    def close(self) -> None:
+        """
+        Release this process' views; the owner also frees the shared blocks
+        Allocators handed out by allocator() are detached onto private copies first
+        """
+        for allocator in list(self._allocators):
+            self._detach(allocator)
+        self._allocators = weakref.WeakSet()
+        self.arrays = {}
+        self._path_allocator = None
+        for block in self._blocks.values():
+            block.close()
+            if self.owner:
+                block.unlink()
+        self._blocks = {}
+
+    def __enter__(self) -> 'SharedTopology':
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.close()
+
+
+_worker_topology: Optional[SharedTopology] = None
+
+
+def attach_worker_topology(descriptor: Dict) -> None:
+    """
+    Process pool initializer: attach the worker to the shared topology once
+    """
+    global _worker_topology
+    _worker_topology = SharedTopology.attach(descriptor)
+
+
+def worker_topology() -> SharedTopology:
+    """
+    Return the topology attached by attach_worker_topology in this worker
+    """
+    if _worker_topology is None:
+        raise RuntimeError("El proceso no está asociado a ninguna topología compartida")
+    return _worker_topology
@@ -0,0 +1,206 @@
+"""
+Binary snapshots of a VirtualNetworkAllocation state
+
+A snapshot is a directory of .npy files plus a small meta.json:
+
+    meta.json                  backend, statistics and allocation counters
+    original_capacity.npy      original capacities (matrix or edge array)
+    capacity.npy               residual capacities, only if they differ
+    <topology array>.npy       adjacency matrix or CSR edge index of the backend
+    demands.npy                (K, 5) source, destination, bandwidth, duration, price
+    allocation_demands.npy     demand index of every allocated demand
+    allocation_offsets.npy     CSR offsets into allocation_nodes
+    allocation_nodes.npy       concatenated allocated paths
+
+Every array can be opened with numpy's mmap_mode, so large topologies are
+restored without parsing and several processes can map the same read-only files.
+"""
+import json
+import os
+import shutil
+import tempfile
+from typing import Dict, Optional, Tuple
+import numpy as np
+
+from Allocation.allocation import VirtualNetworkAllocation
+from Allocation.demands import DemandTable
+from Allocation.sparse_allocation import SparseVirtualNetworkAllocation
+
+SNAPSHOT_FORMAT_VERSION = 2
+
+_BACKENDS = {
+    'dense': VirtualNetworkAllocation,
+    'sparse': SparseVirtualNetworkAllocation,
+}
+
+
+def _backend_name(allocator: VirtualNetworkAllocation) -> str:
+    for name, cls in _BACKENDS.items():
+        if type(allocator) is cls:
+            return name
+    raise TypeError(f"Backend no soportado para snapshots: {type(allocator).__name__}")
+
+
+def _export_state(allocator: VirtualNetworkAllocation) -> Tuple[Dict[str, np.ndarray], Dict]:
+    """
+    Split an allocator into its numpy arrays and a JSON-serializable meta dict
+    """
+    arrays = {'original_capacity': np.asarray(allocator.original_capacity_matrix)}
+    residual_shared = allocator.capacity_matrix is allocator.original_capacity_matrix
+    if not residual_shared:
+        arrays['capacity'] = np.asarray(allocator.capacity_matrix)
+    for name in allocator._snapshot_arrays:
+        arrays[name] = np.asarray(getattr(allocator, name))
+
+    arrays['demands'] = allocator.demands.as_array()
+
+    allocated = sorted(allocator.allocation_paths)
+    paths = [allocator.allocation_paths[i] for i in allocated]
+    offsets = np.zeros(len(paths) + 1, dtype=np.int64)
+    np.cumsum([len(p) for p in paths], out=offsets[1:])
+    arrays['allocation_demands'] = np.array(allocated, dtype=np.int64)
+    arrays['allocation_offsets'] = offsets
+    arrays['allocation_nodes'] = np.array([node for p in paths for node in p], dtype=np.int64)
+
+    meta = {
+        'format_version': SNAPSHOT_FORMAT_VERSION,
+        'backend': _backend_name(allocator),
+        'num_nodes': int(allocator.num_nodes),
+        'total_links': int(allocator.total_links),
+        'total_capacity': float(allocator.total_capacity),
+        'total_demand': float(allocator.total_demand),
+        'network_connected': bool(allocator.network_connected),
+        'residual_shared': residual_shared,
+        'allocated_demands': [d.index for d in allocator.allocated_demands],
+        'rejected_demands': [d.index for d in allocator.rejected_demands],
+        'current_revenue': float(allocator.current_revenue),
+        'current_cost': float(allocator.current_cost),
+    }
+    return arrays, meta
+
+
+def _restore_state(arrays: Dict[str, np.ndarray], meta: Dict) -> VirtualNetworkAllocation:
+    """
+    Rebuild an allocator around existing arrays without copying them
+    Missing residual or allocation arrays mean a fresh, unallocated state
+    """
+    cls = _BACKENDS[meta['backend']]
+    allocator = cls.__new__(cls)
+
+    original = arrays['original_capacity']
+    original.flags.writeable = False
+    allocator.original_capacity_matrix = original
+    if meta.get('residual_shared', True) or 'capacity' not in arrays:
+        allocator._capacity_matrix = original
+    else:
+        allocator._capacity_matrix = arrays['capacity']
+    for name in cls._snapshot_arrays:
+        setattr(allocator, name, arrays[name])
+    if hasattr(allocator, '_rebuild_edge_lookup'):
+        allocator._rebuild_edge_lookup()
+
+    allocator.num_nodes = meta['num_nodes']
+    allocator.total_links = meta['total_links']
+    allocator.total_capacity = meta['total_capacity']
+    allocator.total_demand = meta['total_demand']
+    allocator.network_connected = meta['network_connected']
+
+    allocator.demands = DemandTable.from_columns(arrays['demands'])
+
+    allocator.allocation_paths = {}
+    if 'allocation_demands' in arrays:
+        offsets = arrays['allocation_offsets']
+        nodes = arrays['allocation_nodes']
+        allocator.allocation_paths = {int(d): nodes[offsets[k]:offsets[k + 1]].tolist()
+                                      for k, d in enumerate(arrays['allocation_demands'])}
+    allocator.allocated_demands = [allocator.demands[i] for i in meta.get('allocated_demands', [])]
+    allocator.rejected_demands = [allocator.demands[i] for i in meta.get('rejected_demands', [])]
+    allocator.current_revenue = meta.get('current_revenue', 0)
+    allocator.current_cost = meta.get('current_cost', 0)
+    return allocator
+
+
+def _is_snapshot(directory: str) -> bool:
+    """
+    True if directory holds a snapshot, judged by its meta.json
+    """
+    try:
+        with open(os.path.join(directory, 'meta.json'), encoding='utf-8') as f:
+            meta = json.load(f)
+    except (OSError, ValueError):
+        return False
+    return isinstance(meta, dict) and 'format_version' in meta and meta.get('backend') in _BACKENDS
+
+
+def save_snapshot(allocator: VirtualNetworkAllocation, directory: str) -> None:
+    """
+    Save the allocator state to a snapshot directory
+    The directory is written next to its final location and moved in place at
+    the end, so an interrupted save never leaves a half-written snapshot. Only
+    an existing snapshot is replaced: it is renamed aside first and removed
+    once the new one is in place, so a crash keeps one of them on disk.
+    """
+    directory = os.path.abspath(directory)
+    if os.path.lexists(directory) and not _is_snapshot(directory):
+        raise FileExistsError(f"{directory} ya existe y no es un snapshot; no se sobrescribe")
+    parent = os.path.dirname(directory)
+    os.makedirs(parent, exist_ok=True)
+    staging = tempfile.mkdtemp(prefix='.snapshot-', dir=parent)
+
+    try:
+        arrays, meta = _export_state(allocator)
+        for name, array in arrays.items():
+            np.save(os.path.join(staging, f'{name}.npy'), array, allow_pickle=False)
+        with open(os.path.join(staging, 'meta.json'), 'w', encoding='utf-8') as f:
+            json.dump(meta, f)
+
+        if not os.path.exists(directory):
+            os.replace(staging, directory)
+            return
+        previous = staging + '.old'
+        os.replace(directory, previous)
+        try:
+            os.replace(staging, directory)
+        except BaseException:
+            os.replace(previous, directory)
+            raise
+    except BaseException:
+        shutil.rmtree(staging, ignore_errors=True)
+        raise
+    shutil.rmtree(previous, ignore_errors=True)
+
+
+def load_snapshot(directory: str, mmap_mode: Optional[str] = 'r') -> VirtualNetworkAllocation:
+    """
+    Restore an allocator from a snapshot directory
+
+    With mmap_mode='r' the topology and original capacities are mapped
+    read-only and shared between processes; the residual capacities are
+    mapped copy-on-write ('c'), so allocations never modify the files.
+    Pass mmap_mode=None to load everything into memory.
+    """
+    with open(os.path.join(directory, 'meta.json'), encoding='utf-8') as f:
+        meta = json.load(f)
+    if meta.get('format_version') != SNAPSHOT_FORMAT_VERSION:
+        raise ValueError(f"Versión de snapshot no soportada: {meta.get('format_version')}")
+
+    def load(name, mode=mmap_mode):
+        path = os.path.join(directory, f'{name}.npy')
+        try:
+            return np.load(path, mmap_mode=mode, allow_pickle=False)
+        except ValueError:
+            # Empty arrays cannot be memory-mapped
+            return np.load(path, allow_pickle=False)
+
+    arrays = {}
+    for filename in os.listdir(directory):
+        name, extension = os.path.splitext(filename)
+        if extension != '.npy':
+            continue
+        if name == 'capacity':
+            arrays[name] = load(name, 'c' if mmap_mode else None)
+        elif name == 'original_capacity' or name in _BACKENDS[meta['backend']]._snapshot_arrays:
+            arrays[name] = load(name)
+        else:
+            arrays[name] = load(name, None)
+    return _restore_state(arrays, meta)
@@ -0,0 +1,164 @@
+from typing import List, Dict, Tuple, Optional
+import numpy as np
+
+from Allocation.allocation import VirtualNetworkAllocation, _clean_capacity_array
+
+
+def _capacity_edges(network_data: Dict) -> Tuple[np.ndarray, np.ndarray, np.ndarray, int]:
+    """
+    Extract the directed links of network_data as (sources, destinations, capacities, num_nodes)
+    Only links with positive capacity are kept; no dense matrix is built for
+    edge lists or SciPy sparse inputs
+    """
+    if 'capacity_matrix' not in network_data:
+        edge_array = np.asarray(network_data['edges'], dtype=float).reshape(-1, 3)
+        sources = edge_array[:, 0].astype(np.intp)
+        destinations = edge_array[:, 1].astype(np.intp)
+        capacities = np.nan_to_num(edge_array[:, 2], nan=0.0)
+        num_nodes = network_data.get('num_nodes')
+        if num_nodes is None:
+            num_nodes = int(max(sources.max(initial=-1), destinations.max(initial=-1))) + 1
+    elif hasattr(network_data['capacity_matrix'], 'tocoo'):
+        coo = network_data['capacity_matrix'].tocoo()
+        sources = np.asarray(coo.row, dtype=np.intp)
+        destinations = np.asarray(coo.col, dtype=np.intp)
+        capacities = np.nan_to_num(np.asarray(coo.data, dtype=float), nan=0.0)
+        num_nodes = coo.shape[0]
+    else:
+        matrix = _clean_capacity_array(network_data['capacity_matrix'])
+        sources, destinations = np.nonzero(matrix > 0)
+        capacities = matrix[sources, destinations]
+        num_nodes = len(matrix)
+
+    keep = (capacities > 0) & (sources != destinations)
+    return sources[keep], destinations[keep], capacities[keep], int(num_nodes)
+
+
+class SparseVirtualNetworkAllocation(VirtualNetworkAllocation):
+    """
+    Virtual Network Allocation with per-edge capacity storage
+
+    Capacities are kept in arrays indexed by edge id instead of n x n matrices,
+    so memory is O(E) instead of O(n^2). In this backend `capacity_matrix` and
+    `original_capacity_matrix` hold the residual and original capacity of each
+    directed edge, and every *_on_matrix method takes such an edge array.
+    """
+
+    _snapshot_arrays = ('edge_sources', 'edge_destinations', 'node_edge_offsets', 'reverse_edge',
+                        'component_labels')
+
+    def _load_topology(self, network_data: Dict) -> None:
+        """
+        Build the edge arrays, the CSR neighbor index and the node-pair lookup
+        """
+        sources, destinations, capacities, num_nodes = _capacity_edges(network_data)
+
+        # Sort edges by (source, destination) so each node owns a contiguous
+        # slice of the edge arrays (CSR layout); duplicated pairs keep the last value
+        order = np.lexsort((destinations, sources))
+        sources, destinations, capacities = sources[order], destinations[order], capacities[order]
+        if len(sources) > 1:
+            last = np.ones(len(sources), dtype=bool)
+            last[:-1] = (sources[1:] != sources[:-1]) | (destinations[1:] != destinations[:-1])
+            sources, destinations, capacities = sources[last], destinations[last], capacities[last]
+
+        self.num_nodes = num_nodes
+        self.edge_sources = sources.astype(np.int32)
+        self.edge_destinations = destinations.astype(np.int32)
+        self.node_edge_offsets = np.zeros(num_nodes + 1, dtype=np.int64)
+        np.cumsum(np.bincount(sources, minlength=num_nodes), out=self.node_edge_offsets[1:])
+
+        self._rebuild_edge_lookup()
+        # Edge keys are sorted after the lexsort, so reverse edges are found by binary search
+        keys = sources.astype(np.int64) * num_nodes + destinations
+        reverse_keys = destinations.astype(np.int64) * num_nodes + sources
+        positions = np.minimum(np.searchsorted(keys, reverse_keys), max(len(keys) - 1, 0))
+        found = keys[positions] == reverse_keys if len(keys) else np.zeros(0, dtype=bool)
+        self.reverse_edge = np.where(found, positions, -1)
+
+        capacities.flags.writeable = False
+        self.original_capacity_matrix = capacities
+        self._capacity_matrix = capacities
+
+        self.total_links = len(capacities) // 2  # Divide by 2 if undirected
+        self.total_capacity = np.sum(capacities)
+
+    def _rebuild_edge_lookup(self) -> None:
+        self._edge_lookup = {(int(u), int(v)): edge_id
+                             for edge_id, (u, v) in enumerate(zip(self.edge_sources, self.edge_destinations))}
+
+    @property
+    def num_edges(self) -> int:
+        return len(self.edge_sources)
+
+    def edge_id(self, node_from: int, node_to: int) -> int:
+        """
+        Return the id of the directed edge node_from -> node_to, or -1 if it does not exist
+        """
+        return self._edge_lookup.get((node_from, node_to), -1)
+
+    def _path_edge_ids(self, path: List[int]) -> Optional[List[int]]:
+        """
+        Translate a node path into edge ids, or None if some hop is not a link
+        """
+        edge_ids = []
+        for i in range(len(path) - 1):
+            edge_id = self._edge_lookup.get((path[i], path[i + 1]), -1)
+            if edge_id < 0:
+                return None
+            edge_ids.append(edge_id)
+        return edge_ids
+
+    def _existing_path_edge_ids(self, path: List[int]) -> List[int]:
+        """
+        Translate a node path into edge ids, raising ValueError if some hop is not a link
+        """
+        edge_ids = self._path_edge_ids(path)
+        if edge_ids is None:
+            node_from, node_to = next((u, v) for u, v in zip(path[:-1], path[1:]) if self.edge_id(u, v) < 0)
+            raise ValueError(f"El enlace {node_from} -> {node_to} no existe en la red")
+        return edge_ids
+
+    def _link_endpoints(self) -> Tuple[np.ndarray, np.ndarray]:
+        return self.edge_sources, self.edge_destinations
+
+    def _neighbors(self, node: int) -> np.ndarray:
+        start, end = self.node_edge_offsets[node], self.node_edge_offsets[node + 1]
+        return self.edge_destinations[start:end][self.capacity_matrix[start:end] > 0]
+
+    def can_allocate_path_on_matrix(self, path: List[int], bandwidth: float, capacity_matrix: np.ndarray) -> bool:
+        """
+        Check if a path has enough capacity on a given edge capacity array
+        Used for evaluating hypothetical allocation scenarios
+        """
+        edge_ids = self._path_edge_ids(path)
+        if edge_ids is None:
+            return False
+        for edge_id in edge_ids:
+            if capacity_matrix[edge_id] < bandwidth:
+                return False
+        return True
+
+    def allocate_path_on_matrix(self, path: List[int], bandwidth: float, capacity_matrix: np.ndarray) -> None:
+        """
+        Allocate bandwidth on a path on a given edge capacity array
+        If the reverse edge exists and has capacity, it is reduced as well
+        """
+        for edge_id in self._existing_path_edge_ids(path):
+            capacity_matrix[edge_id] -= bandwidth
+            reverse_id = self.reverse_edge[edge_id]
+            if reverse_id >= 0 and capacity_matrix[reverse_id] > 0:
+                capacity_matrix[reverse_id] -= bandwidth
+
+    def deallocate_path(self, path: List[int], bandwidth: float) -> None:
+        """
+        Deallocate bandwidth from a path by restoring capacity on each edge
+        If the network is undirected, also restore the reverse direction
+        """
+        capacity_matrix = self._writable_capacity_matrix()
+        for edge_id in self._existing_path_edge_ids(path):
+            capacity_matrix[edge_id] += bandwidth
+            reverse_id = self.reverse_edge[edge_id]
+            if reverse_id >= 0 and self.original_capacity_matrix[reverse_id] > 0:
+                capacity_matrix[reverse_id] += bandwidth
+
@@ -0,0 +1,276 @@
+"""
+Exact allocation for tree and chain topologies by dynamic programming
+
+When the links with residual capacity form a forest (a chain is a special
+case), every demand has at most one path, so the allocation problem is a
+multi-dimensional 0/1 knapsack: accept or reject each demand subject to the
+capacity of every link on its path. Instead of the 2^K (or larger) product of
+the brute force, demands are swept in the order they appear along the tree
+and the DP state is only the residual capacity of the links shared by demands
+already decided and demands still to come. Links leave the state after their
+last demand, so on chains and trees with local traffic the number of states
+stays small and the run time grows almost linearly with the number of demands.
+
+The objective and the tie-break are the brute force's: the most accepted
+demands and, among equally large allocations, the one the enumeration meets
+first (rejecting the lowest demand indices first, or accepting them first when
+an upper bound is given). Capacities are checked exactly as in
+can_allocate_path_on_matrix / allocate_path_on_matrix, per directed link,
+including the reduction of the reverse direction while it has capacity.
+"""
+from typing import Dict, List, Optional, Tuple
+import numpy as np
+
+from Allocation.result import AllocationResult
+
+# DP states kept per step before giving up and letting the brute force run
+DEFAULT_MAX_STATES = 200000
+
+
+class _Forest:
+    """
+    Rooted forest over the links with residual capacity, with directed arc lookups
+    """
+
+    def __init__(self, parent: np.ndarray, depth: np.ndarray, root: np.ndarray, preorder: np.ndarray,
+                 usable: Dict[Tuple[int, int], int], arcs: Dict[Tuple[int, int], int]):
+        self.parent = parent
+        self.depth = depth
+        self.root = root
+        self.preorder = preorder
+        self.usable = usable
+        self.arcs = arcs
+
+    def path(self, source: int, destination: int) -> Optional[List[int]]:
+        """
+        The only path from source to destination, or None if a hop lacks capacity
+        """
+        if self.root[source] != self.root[destination]:
+            return None
+        up, down = [source], [destination]
+        while self.depth[up[-1]] > self.depth[down[-1]]:
+            up.append(int(self.parent[up[-1]]))
+        while self.depth[down[-1]] > self.depth[up[-1]]:
+            down.append(int(self.parent[down[-1]]))
+        while up[-1] != down[-1]:
+            up.append(int(self.parent[up[-1]]))
+            down.append(int(self.parent[down[-1]]))
+        path = up + down[-2::-1]
+        if any((path[i], path[i + 1]) not in self.usable for i in range(len(path) - 1)):
+            return None
+        return path
+
+
+def _arc_capacities(allocator) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    """
+    (sources, destinations, original, residual) of every link of the topology
+    """
+    sources, destinations = allocator._link_endpoints()
+    sources = np.asarray(sources, dtype=np.int64)
+    destinations = np.asarray(destinations, dtype=np.int64)
+    original, residual = allocator.original_capacity_matrix, allocator.capacity_matrix
+    if residual.ndim == 2:
+        original, residual = original[sources, destinations], residual[sources, destinations]
+    keep = np.asarray(original, dtype=float) > 0
+    return (sources[keep], destinations[keep], np.asarray(original, dtype=float)[keep],
+            np.asarray(residual, dtype=float)[keep])
+
+
+def residual_forest(allocator) -> Optional[_Forest]:
+    """
+    Root the residual network if its undirected links form a forest, else None
+    """
+    sources, destinations, _, residual = _arc_capacities(allocator)
+    usable = residual > 0
+    arcs = {(int(u), int(v)): arc for arc, (u, v) in enumerate(zip(sources, destinations))}
+    usable_arcs = {(int(u), int(v)): arc for arc, (u, v) in enumerate(zip(sources, destinations)) if usable[arc]}
+
+    n = allocator.num_nodes
+    neighbors = [set() for _ in range(n)]
+    for u, v in usable_arcs:
+        if u != v:
+            neighbors[u].add(v)
+            neighbors[v].add(u)
+    if sum(len(adjacent) for adjacent in neighbors) // 2 > n - 1:
+        return None
+
+    parent = np.full(n, -1, dtype=np.int64)
+    depth = np.zeros(n, dtype=np.int64)
+    root = np.full(n, -1, dtype=np.int64)
+    preorder = np.zeros(n, dtype=np.int64)
+    position = 0
+    # Root every tree at a leaf, so a chain is numbered from one end to the other
+    for start in sorted(range(n), key=lambda node: (len(neighbors[node]) != 1, node)):
+        if root[start] >= 0:
+            continue
+        root[start] = start
+        stack = [start]
+        while stack:
+            node = stack.pop()
+            preorder[node] = position
+            position += 1
+            for neighbor in sorted(neighbors[node], reverse=True):
+                if neighbor == parent[node]:
+                    continue
+                if root[neighbor] >= 0:
+                    return None  # cycle
+                root[neighbor] = start
+                parent[neighbor] = node
+                depth[neighbor] = depth[node] + 1
+                stack.append(neighbor)
+    return _Forest(parent, depth, root, preorder, usable_arcs, arcs)
+
+
+def _knapsack(items: List[Tuple[List[int], List[int], float, int]], capacity: Dict[int, float],
+              max_states: int) -> Optional[Tuple[List[bool], int]]:
+    """
+    0/1 knapsack over link capacities, one item per demand
+
+    items are (checked links, reverse links, bandwidth, weight): the checked
+    links are reduced, the reverse ones only while they have capacity. The most
+    items are accepted, and among those the largest sum of weights. Returns the
+    accept flag of every item and the number of states visited, or None if a
+    step exceeds max_states.
+    """
+    last_use = {}
+    for position, (checked, reverse, _, _) in enumerate(items):
+        for unit in set(checked) | set(reverse):
+            last_use[unit] = position
+
+    active: List[int] = []
+    layer = {(): ((0, 0), None, False)}
+    history = []
+    states = 1
+    for position, (checked, reverse, bandwidth, weight) in enumerate(items):
+        units = set(checked) | set(reverse)
+        new_units = sorted(units - set(active))
+        extended = active + new_units
+        extension = tuple(capacity[unit] for unit in new_units)
+        index = {unit: i for i, unit in enumerate(extended)}
+        checked_positions = [index[unit] for unit in checked]
+        reverse_positions = [index[unit] for unit in reverse]
+        keep = [i for i, unit in enumerate(extended) if last_use[unit] > position]
+
+        following = {}
+
+        def offer(key, value, parent, accepted):
+            projected = tuple(key[i] for i in keep)
+            current = following.get(projected)
+            if current is None or value > current[0]:
+                following[projected] = (value, parent, accepted)
+
+        for key, (value, _, _) in layer.items():
+            full = key + extension
+            offer(full, value, key, False)
+            if all(full[i] >= bandwidth for i in checked_positions):
+                updated = list(full)
+                for i in checked_positions:
+                    updated[i] -= bandwidth
+                for i in reverse_positions:
+                    if updated[i] > 0:
+                        updated[i] -= bandwidth
+                offer(updated, (value[0] + 1, value[1] + weight), key, True)
+
+        if len(following) > max_states:
+            return None
+        history.append(following)
+        states += len(following)
+        layer = following
+        active = [extended[i] for i in keep]
+
+    key = max(layer, key=lambda state: layer[state][0])
+    accepted = [False] * len(items)
+    for position in range(len(items) - 1, -1, -1):
+        _, parent, accepted[position] = history[position][key]
+        key = parent
+    return accepted, states
+
+
+def tree_allocation(allocator, max_states: int = DEFAULT_MAX_STATES,
+                    upper_bound: Optional[int] = None) -> Optional[AllocationResult]:
+    """
+    Solve the allocation exactly if the residual network is a forest
+
+    Returns None when the topology has cycles or the DP would need more than
+    max_states states in one step, so the caller can fall back to enumeration.
+    On success the allocator state is updated as offline_brute_force_allocation
+    does, with the scenario it would return for the same upper_bound.
+    """
+    forest = residual_forest(allocator)
+    if forest is None:
+        return None
+    sources, destinations, _, residual = _arc_capacities(allocator)
+    demands = allocator.demands
+
+    routed = []
+    for demand in demands:
+        path = forest.path(demand.source, demand.destination)
+        if path is not None:
+            routed.append((demand.index, path))
+    if not routed:
+        return AllocationResult({
+            'success': False,
+            'message': 'No se encontraron caminos válidos para ninguna demanda',
+            'acceptance_ratio': 0,
+            'allocated_demands': [],
+            'rejected_demands': list(range(len(demands)))
+        })
+
+    # The enumeration tries not assigning first (assigning first with a bound)
+    # in demand order, so it keeps the equally large scenario whose accept flags
+    # come first read as a binary number with the lowest demand as top bit
+    sign = -1 if upper_bound is None else 1
+    items = []
+    for rank, (demand_idx, path) in enumerate(routed):
+        hops = list(zip(path[:-1], path[1:]))
+        checked = [forest.usable[hop] for hop in hops]
+        # Like allocate_path_on_matrix: the reverse direction is reduced while it has capacity
+        reverse = [forest.arcs[(v, u)] for u, v in hops if (v, u) in forest.arcs]
+        bandwidth = float(demands.bandwidths[demand_idx])
+        items.append((checked, reverse, bandwidth, sign * (1 << (len(routed) - 1 - rank))))
+
+    # When the two directions of a link hold different residual capacities the
+    # result depends on the order of the allocations, so keep the demand order
+    paired = [(arc, forest.arcs[(int(v), int(u))]) for arc, (u, v) in enumerate(zip(sources, destinations))
+              if (int(v), int(u)) in forest.arcs]
+    symmetric = all(residual[a] == residual[b] for a, b in paired)
+    order = list(range(len(routed)))
+    if symmetric:
+        # Sweep demands along the tree so links leave the DP state early
+        order.sort(key=lambda i: (min(forest.preorder[node] for node in routed[i][1]),
+                                  max(forest.preorder[node] for node in routed[i][1])))
+
+    solution = _knapsack([items[i] for i in order], {arc: float(c) for arc, c in enumerate(residual)},
+                         max_states)
+    if solution is None:
+        print("Programación dinámica descartada: demasiados estados, se usa la fuerza bruta")
+        return None
+    accepted, states = solution
+    chosen = [routed[i] for i, take in zip(order, accepted) if take]
+    print(f"Topología en árbol: solución exacta por programación dinámica ({states} estados)")
+
+    # Evaluated in the DP order, in which every allocation was checked
+    metrics = allocator.evaluate_allocation_scenario(chosen)
+    scenario = sorted(chosen)
+    allocated_indices = {i for i, _ in scenario}
+    allocator.capacity_matrix = metrics['temp_capacity_matrix'].copy()
+    allocator.allocated_demands = [demands[i] for i, _ in scenario]
+    allocator.rejected_demands = [demands[i] for i in range(len(demands)) if i not in allocated_indices]
+    allocator.current_revenue = metrics['total_revenue']
+    allocator.current_cost = metrics['total_cost']
+    allocator.allocation_paths = {i: path for i, path in scenario}
+
+    return AllocationResult({
+        'success': True,
+        'solver': 'tree_dp',
+        'acceptance_ratio': metrics['acceptance_ratio'],
+        'revenue_cost_ratio': metrics['revenue_cost_ratio'],
+        'allocated_demands': scenario,
+        'rejected_demands': [i for i in range(len(demands)) if i not in allocated_indices],
+        'total_revenue': metrics['total_revenue'],
+        'total_cost': metrics['total_cost'],
+        # Every DP state is a feasible partial allocation
+        'total_combinations_evaluated': states,
+        'valid_combinations': states,
+        'dp_states': states
+    }, allocator, scenario)
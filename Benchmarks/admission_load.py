@@ -0,0 +1,124 @@
+"""
+Generador de carga para el servidor de admisión (Allocation.server).
+
+Abre muchas conexiones concurrentes; cada cliente envía peticiones de asignación
+entre pares de nodos aleatorios y libera con cierta probabilidad una de sus
+sesiones anteriores. Se mide la latencia de cada petición y se muestran p50/p99
+por operación y el rendimiento total.
+
+Sin --port se arranca un servidor en el mismo proceso sobre un anillo con
+cuerdas aleatorias de --nodes nodos; --window-ms y --max-batch configuran su
+agrupación de peticiones para comparar latencia e ingresos.
+
+Uso:
+    python Benchmarks/admission_load.py [--clients 1000] [--requests 20] [--port 8765]
+
+Con miles de clientes puede ser necesario subir el límite de descriptores (ulimit -n).
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import sys
+import time
+import numpy as np
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from Allocation.server import AdmissionServer, DEFAULT_HOST
+
+
+def ring_network(n, rng):
+    nodes = np.arange(n)
+    chords = rng.integers(0, n, size=(n // 2, 2))
+    sources = np.concatenate([nodes, chords[:, 0]])
+    destinations = np.concatenate([(nodes + 1) % n, chords[:, 1]])
+    capacity = np.zeros((n, n))
+    capacity[sources, destinations] = rng.integers(50, 200, size=len(sources))
+    capacity = np.maximum(capacity, capacity.T)
+    np.fill_diagonal(capacity, 0)
+    return {'capacity_matrix': capacity, 'demands': []}
+
+
+async def client(host, port, num_requests, num_nodes, release_probability, latencies, seed):
+    rng = random.Random(seed)
+    reader, writer = await asyncio.open_connection(host, port)
+    sessions = []
+
+    async def request(message):
+        start = time.perf_counter()
+        writer.write(json.dumps(message).encode() + b'\n')
+        await writer.drain()
+        response = json.loads(await reader.readline())
+        latencies[message['op']].append(time.perf_counter() - start)
+        return response
+
+    try:
+        for _ in range(num_requests):
+            if sessions and rng.random() < release_probability:
+                await request({'op': 'release', 'session': sessions.pop(rng.randrange(len(sessions)))})
+                continue
+            source, destination = rng.sample(range(num_nodes), 2)
+            response = await request({'op': 'allocate', 'source': source, 'destination': destination,
+                                      'bandwidth': rng.randint(1, 10)})
+            if response['ok']:
+                sessions.append(response['session'])
+        await request({'op': 'status'})
+    finally:
+        writer.close()
+
+
+async def run(args):
+    server = None
+    host, port = args.host, args.port
+    if port is None:
+        from Allocation.allocation import VirtualNetworkAllocation
+        network_data = ring_network(args.nodes, np.random.default_rng(args.seed))
+        server = AdmissionServer(VirtualNetworkAllocation(network_data),
+                                 batch_window_ms=args.window_ms, max_batch=args.max_batch)
+        listener = await server.start(host, 0)
+        port = listener.sockets[0].getsockname()[1]
+
+    probe_reader, probe_writer = await asyncio.open_connection(host, port)
+    probe_writer.write(b'{"op": "status"}\n')
+    num_nodes = int(json.loads(await probe_reader.readline())['status']['num_nodes'])
+    probe_writer.close()
+
+    latencies = {'allocate': [], 'release': [], 'status': []}
+    start = time.perf_counter()
+    await asyncio.gather(*(client(host, port, args.requests, num_nodes, args.release, latencies, args.seed + i)
+                           for i in range(args.clients)))
+    elapsed = time.perf_counter() - start
+
+    total = sum(len(values) for values in latencies.values())
+    print(f"{args.clients} clientes, {total} peticiones en {elapsed:.2f} s ({total / elapsed:.0f} pet/s)")
+    print(f"{'operación':<10} {'n':>8} {'p50 ms':>10} {'p99 ms':>10}")
+    for operation, values in latencies.items():
+        if values:
+            p50, p99 = np.percentile(np.asarray(values) * 1000, [50, 99])
+            print(f"{operation:<10} {len(values):>8} {p50:>10.2f} {p99:>10.2f}")
+    if server is not None:
+        status = server.status
+        print(f"Sesiones activas: {status['active_sessions']}, admitidas: {status['admitted_requests']}, "
+              f"rechazadas: {status['rejected_requests']}, utilización: {status['network_utilization']:.1%}")
+        print(f"Ingresos: {status['total_revenue']:.0f}, lotes: {status['batches']} "
+              f"(tamaño medio {status['mean_batch_size']:.1f}, resolución media {status['mean_solve_ms']:.2f} ms)")
+        await server.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Generador de carga del servidor de admisión')
+    parser.add_argument('--host', default=DEFAULT_HOST)
+    parser.add_argument('--port', type=int, default=None, help='Servidor existente (por defecto, uno local)')
+    parser.add_argument('--clients', type=int, default=1000)
+    parser.add_argument('--requests', type=int, default=20, help='Peticiones por cliente')
+    parser.add_argument('--release', type=float, default=0.3, help='Probabilidad de liberar una sesión')
+    parser.add_argument('--nodes', type=int, default=50, help='Nodos de la red generada')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--window-ms', type=float, default=0.0, help='Ventana de agrupación del servidor local')
+    parser.add_argument('--max-batch', type=int, default=1, help='Tamaño máximo de lote del servidor local')
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == '__main__':
+    main()
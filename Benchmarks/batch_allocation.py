@@ -0,0 +1,52 @@
+"""
+Ejecuta la asignación óptima sobre un lote de redes usando la caché de resultados.
+
+Cada fichero (JSON, CSV o GraphML, ver Allocation.network_io) se resuelve con
+offline_brute_force_allocation a través de ResultCache, la misma caché en disco
+que usa la interfaz gráfica: las instancias ya resueltas se devuelven sin repetir
+la búsqueda. Se muestra el tiempo de cada instancia y si fue un acierto de caché.
+
+Uso:
+    python Benchmarks/batch_allocation.py red1.json red2.graphml ... [--cache ruta] [--repeat N]
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from Allocation.allocation import VirtualNetworkAllocation
+from Allocation.network_io import load_network
+from Allocation.result_cache import DEFAULT_CACHE_PATH, ResultCache
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('networks', nargs='+')
+    parser.add_argument('--cache', default=DEFAULT_CACHE_PATH)
+    parser.add_argument('--max-mb', type=float, default=64)
+    parser.add_argument('--repeat', type=int, default=1)
+    args = parser.parse_args()
+
+    cache = ResultCache(args.cache, max_bytes=int(args.max_mb * 1024 * 1024))
+    print(f"{'red':<30} {'ms':>10} {'caché':>6} {'aceptación':>11}")
+    for _ in range(args.repeat):
+        for path in args.networks:
+            network_data = load_network(path)
+            hits = cache.hits
+            start = time.perf_counter()
+            allocator = VirtualNetworkAllocation(network_data)
+            result = cache.allocate(allocator, network_data)
+            elapsed = (time.perf_counter() - start) * 1000
+            hit = 'sí' if cache.hits > hits else 'no'
+            print(f"{os.path.basename(path):<30} {elapsed:>10.2f} {hit:>6} "
+                  f"{result.get('acceptance_ratio', 0):>11.2%}")
+
+    stats = cache.stats()
+    print(f"\nCaché: {stats['entries']} entradas, {stats['bytes'] / 1024:.1f} KiB, "
+          f"{stats['hits']} aciertos, {stats['misses']} fallos")
+    cache.close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,86 @@
+"""
+Mide la latencia de redibujado de la vista de topología frente al número de nodos.
+
+Para cada tamaño se genera un anillo con cuerdas aleatorias (grado medio ~3) y se mide:
+    - completo:     primer dibujado tras cambiar la topología (layout + creación)
+    - incremental:  redibujado tras cambiar la capacidad de un solo enlace
+    - sin cambios:  redibujado sin modificaciones
+    - ráfaga:       100 peticiones seguidas agrupadas en un único redibujado
+
+Uso (requiere un display):
+    python Benchmarks/gui_redraw_timing.py [n1 n2 ...]
+"""
+import os
+import sys
+import time
+import tkinter as tk
+import numpy as np
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from GUI.gui import VirtualNetworkUI
+
+
+def build_topology(app, n, rng):
+    app.num_nodes.set(n)
+    app.update_matrices()
+    nodes = np.arange(n)
+    chords = rng.integers(0, n, size=(n // 2, 2))
+    sources = np.concatenate([nodes, chords[:, 0]])
+    destinations = np.concatenate([(nodes + 1) % n, chords[:, 1]])
+    app.adjacency_matrix[sources, destinations] = 1
+    app.adjacency_matrix[destinations, sources] = 1
+    np.fill_diagonal(app.adjacency_matrix, 0)
+    app.capacity_matrix[:] = np.where(app.adjacency_matrix == 1, rng.integers(1, 15, size=(n, n)), 0)
+
+
+def timed(root, action):
+    start = time.perf_counter()
+    action()
+    root.update_idletasks()
+    return (time.perf_counter() - start) * 1000
+
+
+def main(sizes):
+    root = tk.Tk()
+    root.withdraw()
+    app = VirtualNetworkUI(root)
+    rng = np.random.default_rng(0)
+
+    print(f"{'nodos':>6} {'aristas':>8} {'completo ms':>12} {'incremental ms':>15} "
+          f"{'sin cambios ms':>15} {'ráfaga ms':>10} {'redibujados':>12}")
+    for n in sizes:
+        build_topology(app, n, rng)
+        full = timed(root, app.redraw_visualization)
+
+        i, j = map(int, np.argwhere(app.adjacency_matrix == 1)[0])
+        app.capacity_matrix[i, j] += 1
+        incremental = timed(root, app.redraw_visualization)
+        unchanged = timed(root, app.redraw_visualization)
+
+        redraws = 0
+        original = app.redraw_visualization
+
+        def counting_redraw():
+            nonlocal redraws
+            redraws += 1
+            original()
+
+        app.redraw_visualization = counting_redraw
+
+        def burst():
+            for _ in range(100):
+                app.update_visualization()
+            root.update()
+
+        burst_ms = timed(root, burst)
+        app.redraw_visualization = original
+
+        edges = int(np.count_nonzero(app.adjacency_matrix))
+        print(f"{n:>6} {edges:>8} {full:>12.1f} {incremental:>15.1f} "
+              f"{unchanged:>15.1f} {burst_ms:>10.1f} {redraws:>12}")
+
+    root.destroy()
+
+
+if __name__ == "__main__":
+    main([int(arg) for arg in sys.argv[1:]] or [10, 50, 100, 200, 400])
@@ -0,0 +1,80 @@
+"""
+Mide el coste de arranque de los módulos sin interfaz con `python -X importtime`.
+
+Cada módulo se importa en un proceso nuevo (varias repeticiones, se toma la
+mínima) y se muestra el tiempo acumulado de su import y los módulos más caros.
+Además se comprueba que las rutas sin interfaz no importan tkinter ni SciPy, y
+que `import Allocation` no carga NumPy (la API del paquete es perezosa).
+
+Sale con código 1 si alguna comprobación falla o si se supera --max-ms, de modo
+que se puede usar para detectar regresiones.
+
+Uso:
+    python Benchmarks/import_time.py [--repeat 5] [--max-ms 500] [--top 5]
+"""
+import argparse
+import os
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Módulo -> paquetes que no debe importar
+TARGETS = {
+    'Allocation': ('numpy', 'tkinter', 'scipy'),
+    'Allocation.allocation': ('tkinter', 'scipy'),
+    'Allocation.sparse_allocation': ('tkinter', 'scipy'),
+    'Allocation.server': ('tkinter', 'scipy'),
+    'KPIs.kpi': ('tkinter', 'scipy'),
+}
+
+
+def import_times(module):
+    """
+    Devuelve {módulo importado: (propio µs, acumulado µs)} de un proceso nuevo
+    """
+    completed = subprocess.run([sys.executable, '-X', 'importtime', '-c', f'import {module}'],
+                               cwd=ROOT, capture_output=True, text=True)
+    if completed.returncode != 0:
+        raise RuntimeError(f"No se pudo importar {module}:\n{completed.stderr}")
+    times = {}
+    for line in completed.stderr.splitlines():
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        self_us, cumulative_us, name = line[len('import time:'):].split('|')
+        times[name.strip()] = (int(self_us), int(cumulative_us))
+    return times
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Tiempo de import de los módulos sin interfaz')
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--max-ms', type=float, default=None, help='Límite del tiempo acumulado por módulo')
+    parser.add_argument('--top', type=int, default=5, help='Módulos más caros mostrados')
+    args = parser.parse_args()
+
+    failures = []
+    print(f"{'módulo':<32} {'ms':>9}")
+    for module, forbidden in TARGETS.items():
+        runs = [import_times(module) for _ in range(max(1, args.repeat))]
+        best = min(runs, key=lambda times: times[module][1])
+        elapsed_ms = best[module][1] / 1000
+        print(f"{module:<32} {elapsed_ms:>9.2f}")
+        for name, (_, cumulative) in sorted(best.items(), key=lambda item: -item[1][0])[:args.top]:
+            print(f"    {name:<40} propio {best[name][0] / 1000:>7.2f} ms, acumulado {cumulative / 1000:>7.2f} ms")
+
+        loaded = {name.split('.')[0] for name in best}
+        for package in forbidden:
+            if package in loaded:
+                failures.append(f"{module} importa {package}")
+        if args.max_ms is not None and elapsed_ms > args.max_ms:
+            failures.append(f"{module} tarda {elapsed_ms:.2f} ms (límite {args.max_ms} ms)")
+
+    if failures:
+        print("\nREGRESIÓN:\n  " + "\n  ".join(failures))
+        sys.exit(1)
+    print("\nSin regresiones")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,5 @@
+"""
+Interfaz gráfica Tk del panel de control de red virtual
+
+Es el único paquete que importa tkinter; Allocation y KPIs se pueden usar sin display.
+"""
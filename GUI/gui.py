@@ -6,8 +6,14 @@ import math
 from tkinter import Canvas
 import sys
 import os
-sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+if not __package__:
+    # Ejecutado como script (python GUI/gui.py) sin instalar el paquete
+    sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 from Allocation.allocation import VirtualNetworkAllocation
+from Allocation.network_io import load_network, save_network
+from Allocation.result_cache import ResultCache
+from GUI.virtual_grid import VirtualGrid
+from GUI.layout import LayoutCache, force_directed_layout, topology_fingerprint
 from KPIs import kpi
 
 class VirtualNetworkUI:
@@ -19,9 +25,11 @@ class VirtualNetworkUI:
         # Variables principales
         self.num_nodes = tk.IntVar(value=5)
         self.num_demands = tk.IntVar(value=2)
-        self.adjacency_matrix = []
-        self.capacity_matrix = []
-        self.demands = []
+        # Modelos NumPy de los editores: adyacencia (0/1), capacidades y
+        # demandas (origen y destino 1..n, demanda en Mbps)
+        self.adjacency_matrix = np.zeros((0, 0), dtype=np.int8)
+        self.capacity_matrix = np.zeros((0, 0), dtype=float)
+        self.demands = np.zeros((0, 3), dtype=float)
 
         # Variables para visualización
         self.show_capacities = tk.BooleanVar(value=True)
@@ -29,6 +37,21 @@ class VirtualNetworkUI:
         self.show_node_labels = tk.BooleanVar(value=True)
         self.node_positions = {}
 
+        # Estado del renderizado incremental: ids de canvas por nodo/arista
+        self._redraw_pending = None
+        self._layout_key = None
+        self._layout_cache = LayoutCache()
+        self._demands_key = None
+        self._node_items = {}
+        self._edge_items = {}
+        self._demand_items = []
+
+        # Caché en disco de resultados, compartida con las ejecuciones por lotes
+        try:
+            self.result_cache = ResultCache()
+        except Exception:
+            self.result_cache = None
+
         self.setup_dashboard()
         self.update_matrices()
 
@@ -83,13 +106,13 @@ class VirtualNetworkUI:
         # Estilo minimalista para controles
         tk.Label(config_row, text="Nodos:", font=("Segoe UI", 10),
                  bg='#ffffff', fg='#34495e').pack(side=tk.LEFT, padx=(0, 8))
-        nodes_spin = ttk.Spinbox(config_row, from_=2, to=20, textvariable=self.num_nodes,
+        nodes_spin = ttk.Spinbox(config_row, from_=2, to=500, textvariable=self.num_nodes,
                                  command=self.update_matrices, width=6)
         nodes_spin.pack(side=tk.LEFT, padx=(0, 20))
 
         tk.Label(config_row, text="Demandas:", font=("Segoe UI", 10),
                  bg='#ffffff', fg='#34495e').pack(side=tk.LEFT, padx=(0, 8))
-        demands_spin = ttk.Spinbox(config_row, from_=1, to=50, textvariable=self.num_demands,
+        demands_spin = ttk.Spinbox(config_row, from_=1, to=1000, textvariable=self.num_demands,
                                    command=self.update_demands, width=6)
         demands_spin.pack(side=tk.LEFT, padx=(0, 20))
 
@@ -136,6 +159,11 @@ class VirtualNetworkUI:
         file_frame = tk.Frame(config_frame, bg='#ffffff')
         file_frame.pack(fill=tk.X, pady=4)
 
+        ttk.Button(file_frame, text="Importar...", command=self.import_network,
+                   style='Modern.TButton').pack(side=tk.LEFT, padx=3)
+        ttk.Button(file_frame, text="Exportar...", command=self.export_network,
+                   style='Modern.TButton').pack(side=tk.LEFT, padx=3)
+
         # Estado con diseño moderno
         self.status_label = tk.Label(file_frame, text="Ready", font=("Segoe UI", 10),
                                      fg='#27ae60', bg='#ffffff')
@@ -167,45 +195,11 @@ class VirtualNetworkUI:
         adj_container = tk.Frame(adj_frame, bg='#f8f9fa', relief='solid', bd=1)
         adj_container.pack(fill=tk.BOTH, expand=True, padx=8, pady=4)
 
-        # Canvas y scrollbars para matriz de adyacencia
-        adj_canvas = tk.Canvas(adj_container, height=160,
-                            bg='#ffffff', highlightthickness=0)
-        adj_scrollbar_v = ttk.Scrollbar(
-            adj_container, orient="vertical", command=adj_canvas.yview)
-        adj_scrollbar_h = ttk.Scrollbar(
-            adj_container, orient="horizontal", command=adj_canvas.xview)
-        
-        # Frame scrollable para la matriz
-        self.adj_scrollable_frame = tk.Frame(adj_canvas, bg='#ffffff')
-
-        # Función para actualizar la región de scroll
-        def update_adj_scroll_region(event=None):
-            adj_canvas.configure(scrollregion=adj_canvas.bbox("all"))
-
-        self.adj_scrollable_frame.bind("<Configure>", update_adj_scroll_region)
-
-        # Crear ventana en el canvas
-        adj_canvas.create_window((0, 0), window=self.adj_scrollable_frame, anchor="nw")
-        adj_canvas.configure(yscrollcommand=adj_scrollbar_v.set,
-                            xscrollcommand=adj_scrollbar_h.set)
-
-        # Función para scroll con rueda del mouse
-        def on_adj_mousewheel(event):
-            adj_canvas.yview_scroll(int(-1*(event.delta/120)), "units")
-
-        def on_adj_shift_mousewheel(event):
-            adj_canvas.xview_scroll(int(-1*(event.delta/120)), "units")
-
-        # Vincular eventos de scroll
-        adj_canvas.bind("<MouseWheel>", on_adj_mousewheel)
-        adj_canvas.bind("<Shift-MouseWheel>", on_adj_shift_mousewheel)
-        adj_canvas.bind("<Button-4>", lambda e: adj_canvas.yview_scroll(-1, "units"))
-        adj_canvas.bind("<Button-5>", lambda e: adj_canvas.yview_scroll(1, "units"))
-
-        # Pack de elementos
-        adj_scrollbar_h.pack(side="bottom", fill="x")
-        adj_scrollbar_v.pack(side="right", fill="y")
-        adj_canvas.pack(side="left", fill="both", expand=True)
+        # Editor virtualizado: solo se dibujan las celdas visibles
+        self.adj_grid = VirtualGrid(adj_container, model=self.adjacency_matrix, kinds='check',
+                                    disabled=lambda i, j: i == j,
+                                    on_change=lambda i, j, value: self.update_visualization())
+        self.adj_grid.pack(fill=tk.BOTH, expand=True)
 
         # Matriz de capacidades con el mismo estilo
         cap_frame = tk.LabelFrame(matrices_frame, text="• Matriz de Capacidad (Mbps)",
@@ -216,49 +210,10 @@ class VirtualNetworkUI:
         cap_container = tk.Frame(cap_frame, bg='#f8f9fa', relief='solid', bd=1)
         cap_container.pack(fill=tk.BOTH, expand=True, padx=8, pady=4)
 
-        # Canvas y scrollbars para matriz de capacidades
-        cap_canvas = tk.Canvas(cap_container, height=160,
-                            bg='#ffffff', highlightthickness=0)
-        cap_scrollbar_v = ttk.Scrollbar(
-            cap_container, orient="vertical", command=cap_canvas.yview)
-        cap_scrollbar_h = ttk.Scrollbar(
-            cap_container, orient="horizontal", command=cap_canvas.xview)
-        
-        # Frame scrollable para la matriz
-        self.cap_scrollable_frame = tk.Frame(cap_canvas, bg='#ffffff')
-
-        # Función para actualizar la región de scroll
-        def update_cap_scroll_region(event=None):
-            cap_canvas.configure(scrollregion=cap_canvas.bbox("all"))
-
-        self.cap_scrollable_frame.bind("<Configure>", update_cap_scroll_region)
-
-        # Crear ventana en el canvas
-        cap_canvas.create_window((0, 0), window=self.cap_scrollable_frame, anchor="nw")
-        cap_canvas.configure(yscrollcommand=cap_scrollbar_v.set,
-                            xscrollcommand=cap_scrollbar_h.set)
-
-        # Función para scroll con rueda del mouse
-        def on_cap_mousewheel(event):
-            cap_canvas.yview_scroll(int(-1*(event.delta/120)), "units")
-
-        def on_cap_shift_mousewheel(event):
-            cap_canvas.xview_scroll(int(-1*(event.delta/120)), "units")
-
-        # Vincular eventos de scroll
-        cap_canvas.bind("<MouseWheel>", on_cap_mousewheel)
-        cap_canvas.bind("<Shift-MouseWheel>", on_cap_shift_mousewheel)
-        cap_canvas.bind("<Button-4>", lambda e: cap_canvas.yview_scroll(-1, "units"))
-        cap_canvas.bind("<Button-5>", lambda e: cap_canvas.yview_scroll(1, "units"))
-
-        # Pack de elementos
-        cap_scrollbar_h.pack(side="bottom", fill="x")
-        cap_scrollbar_v.pack(side="right", fill="y")
-        cap_canvas.pack(side="left", fill="both", expand=True)
-
-        # Hacer que el canvas tenga foco para recibir eventos de teclado/mouse
-        adj_canvas.focus_set()
-        cap_canvas.focus_set()
+        self.cap_grid = VirtualGrid(cap_container, model=self.capacity_matrix, kinds='entry',
+                                    disabled=lambda i, j: i == j,
+                                    on_change=lambda i, j, value: self.update_visualization())
+        self.cap_grid.pack(fill=tk.BOTH, expand=True)
 
     def setup_visualization_panel(self, parent):
         parent.configure(bg='#ffffff')
@@ -316,22 +271,14 @@ class VirtualNetworkUI:
             demands_frame, bg='#f8f9fa', relief='solid', bd=1)
         demands_container.pack(fill=tk.X, padx=8, pady=4)
 
-        demands_canvas = tk.Canvas(
-            demands_container, height=180, bg='#ffffff', highlightthickness=0)
-        demands_scrollbar = ttk.Scrollbar(
-            demands_container, orient="vertical", command=demands_canvas.yview)
-        self.demand_scrollable_frame = tk.Frame(demands_canvas, bg='#ffffff')
-
-        self.demand_scrollable_frame.bind("<Configure>",
-                                          lambda e: demands_canvas.configure(scrollregion=demands_canvas.bbox("all")))
-
-        demands_canvas.create_window(
-            (0, 0), window=self.demand_scrollable_frame, anchor="nw")
-        demands_canvas.configure(yscrollcommand=demands_scrollbar.set)
-
-        demands_canvas.pack(side="left", fill="both",
-                            expand=True, padx=2, pady=2)
-        demands_scrollbar.pack(side="right", fill="y")
+        # Columnas: origen, destino (nodos 1..n) y demanda en Mbps
+        self.demand_grid = VirtualGrid(demands_container, model=self.demands,
+                                       kinds=['choice', 'choice', 'entry'],
+                                       column_labels=lambda j: ["Origen", "Destino", "Demanda (Mbps)"][j],
+                                       choices=lambda j: list(range(1, self.num_nodes.get() + 1)),
+                                       on_change=lambda i, j, value: self.update_visualization(),
+                                       cell_width=96, height=180, corner_label="#")
+        self.demand_grid.pack(fill=tk.BOTH, expand=True, padx=2, pady=2)
 
         # Panel de resultados con diseño moderno
         results_frame = tk.LabelFrame(main_panel, text="• Resultados del Análisis",
@@ -375,114 +322,52 @@ class VirtualNetworkUI:
 
     def update_matrices(self):
         n = self.num_nodes.get()
-        self.status_label.config(text="Updating matrices...", fg='orange')
-        self.root.update()
-
-        for widget in self.adj_scrollable_frame.winfo_children():
-            widget.destroy()
-        for widget in self.cap_scrollable_frame.winfo_children():
-            widget.destroy()
 
-        self.adjacency_matrix = [[tk.IntVar() for _ in range(n)]
-                                 for _ in range(n)]
-        self.capacity_matrix = [[tk.DoubleVar() for _ in range(n)]
-                                for _ in range(n)]
-
-        # Matriz de adyacencia
-        tk.Label(self.adj_scrollable_frame, text="Node",
-                 font=("Arial", 9, "bold")).grid(row=0, column=0)
-
-        for j in range(n):
-            tk.Label(self.adj_scrollable_frame,
-                     text=f"{j+1}", font=("Arial", 9, "bold")).grid(row=0, column=j+1)
-
-        for i in range(n):
-            tk.Label(self.adj_scrollable_frame,
-                     text=f"{i+1}", font=("Arial", 9, "bold")).grid(row=i+1, column=0)
-            for j in range(n):
-                if i != j:
-                    cb = ttk.Checkbutton(self.adj_scrollable_frame,
-                                         variable=self.adjacency_matrix[i][j],
-                                         command=self.update_visualization)
-                    cb.grid(row=i+1, column=j+1)
-                else:
-                    tk.Label(self.adj_scrollable_frame, text="—").grid(
-                        row=i+1, column=j+1)
-
-        # Matriz de capacidades
-        tk.Label(self.cap_scrollable_frame, text="Node",
-                 font=("Arial", 9, "bold")).grid(row=0, column=0)
-
-        for j in range(n):
-            tk.Label(self.cap_scrollable_frame,
-                     text=f"{j+1}", font=("Arial", 9, "bold")).grid(row=0, column=j+1)
-
-        for i in range(n):
-            tk.Label(self.cap_scrollable_frame,
-                     text=f"{i+1}", font=("Arial", 9, "bold")).grid(row=i+1, column=0)
-            for j in range(n):
-                if i != j:
-                    entry = ttk.Entry(self.cap_scrollable_frame,
-                                      textvariable=self.capacity_matrix[i][j],
-                                      width=6)
-                    entry.grid(row=i+1, column=j+1)
-                else:
-                    tk.Label(self.cap_scrollable_frame, text="—").grid(
-                        row=i+1, column=j+1)
+        # Redimensionar los modelos conservando los valores ya introducidos
+        self.adjacency_matrix = self._resize_model(self.adjacency_matrix, (n, n))
+        self.capacity_matrix = self._resize_model(self.capacity_matrix, (n, n))
+        self.adj_grid.set_model(self.adjacency_matrix)
+        self.cap_grid.set_model(self.capacity_matrix)
 
         self.update_demands()
         self.status_label.config(text="Ready", fg='green')
 
     def update_demands(self):
-        for widget in self.demand_scrollable_frame.winfo_children():
-            widget.destroy()
-
         n_demands = self.num_demands.get()
         n_nodes = self.num_nodes.get()
-        self.demands = []
-
-        headers = ["#", "Origen", "Destino", "Demanda (Mbps)"]
-        for col, header in enumerate(headers):
-            tk.Label(self.demand_scrollable_frame, text=header,
-                     font=("Arial", 9, "bold")).grid(row=0, column=col)
-
-        for i in range(n_demands):
-            demand_info = {
-                'source': tk.IntVar(value=1),
-                'dest': tk.IntVar(value=n_nodes),
-                'demand': tk.DoubleVar(value=0.0)
-            }
-
-            tk.Label(self.demand_scrollable_frame,
-                     text=f"{i+1}").grid(row=i+1, column=0)
-
-            source_cb = ttk.Combobox(self.demand_scrollable_frame,
-                                     textvariable=demand_info['source'],
-                                     values=list(range(1, n_nodes+1)),
-                                     width=6, state="readonly")
-            source_cb.grid(row=i+1, column=1)
-
-            dest_cb = ttk.Combobox(self.demand_scrollable_frame,
-                                   textvariable=demand_info['dest'],
-                                   values=list(range(1, n_nodes+1)),
-                                   width=6, state="readonly")
-            dest_cb.grid(row=i+1, column=2)
 
-            demand_entry = ttk.Entry(self.demand_scrollable_frame,
-                                     textvariable=demand_info['demand'],
-                                     width=8)
-            demand_entry.grid(row=i+1, column=3)
-
-            self.demands.append(demand_info)
+        old_rows = len(self.demands)
+        self.demands = self._resize_model(self.demands, (n_demands, 3))
+        # Las demandas nuevas van por defecto del nodo 1 al último nodo
+        self.demands[old_rows:, 0] = 1
+        self.demands[old_rows:, 1] = n_nodes
+        # Los nodos que ya no existen se recortan al último nodo válido
+        np.clip(self.demands[:, :2], 1, n_nodes, out=self.demands[:, :2])
+        self.demand_grid.set_model(self.demands)
+
+    @staticmethod
+    def _resize_model(model, shape):
+        """Devuelve un array con la nueva forma copiando la parte común del anterior"""
+        resized = np.zeros(shape, dtype=model.dtype)
+        rows = min(shape[0], model.shape[0])
+        cols = min(shape[1], model.shape[1])
+        resized[:rows, :cols] = model[:rows, :cols]
+        return resized
 
     def update_visualization(self):
-        self.status_label.config(text="Updating visualization...", fg='orange')
-        self.root.update()
+        """Programa un redibujado; las ráfagas de cambios se agrupan en uno solo"""
+        if self._redraw_pending is None:
+            self._redraw_pending = self.root.after_idle(self.redraw_visualization)
 
-        self.viz_canvas.delete("all")
+    def redraw_visualization(self):
+        """Redibuja la vista actualizando solo los elementos que han cambiado"""
+        self._redraw_pending = None
 
         n = self.num_nodes.get()
         if n < 2:
+            self.viz_canvas.delete("all")
+            self._node_items, self._edge_items, self._demand_items = {}, {}, []
+            self._layout_key = self._demands_key = None
             self.status_label.config(text="Need at least 2 nodes", fg='red')
             return
 
@@ -490,27 +375,31 @@ class VirtualNetworkUI:
         canvas_height = 400
         margin = 60
 
-        
-        self.node_positions = self.calculate_simple_layout(
-                n, canvas_width, canvas_height, margin)
-
-        
-
-        if hasattr(self, 'adjacency_matrix') and hasattr(self, 'capacity_matrix'):
-            self.draw_edges()
-
-        self.draw_nodes()
-
-        if self.show_demands.get() and hasattr(self, 'demands'):
-            self.draw_demands_text()
+        # El layout solo se recalcula cuando cambia la topología; los ya
+        # calculados se reutilizan desde la caché por huella de topología
+        layout_key = (topology_fingerprint(self.adjacency_matrix[:n, :n]),
+                      canvas_width, canvas_height, margin)
+        if layout_key != self._layout_key:
+            positions = self._layout_cache.get(layout_key)
+            if positions is None:
+                positions = self.calculate_simple_layout(
+                        n, canvas_width, canvas_height, margin)
+                self._layout_cache.put(layout_key, positions)
+            self.node_positions = positions
+            self._layout_key = layout_key
+
+        created = self.draw_edges()
+        created |= self.draw_nodes()
+        self.draw_demands_text()
+
+        # Mantener el orden de apilado: líneas, etiquetas de capacidad y nodos
+        if created:
+            self.viz_canvas.tag_raise("edge_label")
+            self.viz_canvas.tag_raise("node")
 
         self.viz_canvas.configure(scrollregion=self.viz_canvas.bbox("all"))
         self.status_label.config(text="Ready", fg='green')
 
-
-
-    
-
     def calculate_simple_layout(self, n, canvas_width, canvas_height, margin=50):
         """Layout simple que minimiza cruces de conexiones"""
         positions = {}
@@ -531,14 +420,8 @@ class VirtualNetworkUI:
             return self._simple_grid_layout(n, canvas_width, canvas_height, margin)
         
         # Contar conexiones de cada nodo
-        connections = {}
-        for i in range(n):
-            connections[i] = []
-            for j in range(n):
-                if (i < len(self.adjacency_matrix) and 
-                    j < len(self.adjacency_matrix[i]) and
-                    self.adjacency_matrix[i][j].get() == 1):
-                    connections[i].append(j)
+        adjacency = self.adjacency_matrix[:n, :n]
+        connections = {i: np.flatnonzero(adjacency[i]).tolist() for i in range(n)}
         
         # Detectar patrones específicos para evitar cruces
         
@@ -586,8 +469,8 @@ class VirtualNetworkUI:
                 positions[i] = (x, y)
             return positions
         
-        # Para muchos nodos, usar cuadrícula ordenada por conexiones
-        return self._ordered_grid_layout(connections, n, canvas_width, canvas_height, margin)
+        # Para muchos nodos, usar un layout de fuerzas vectorizado
+        return force_directed_layout(adjacency, canvas_width, canvas_height, margin, top=traffic_space)
 
     def _is_chain_pattern(self, connections, n):
         """Detecta si el grafo es una cadena (línea)"""
@@ -642,31 +525,6 @@ class VirtualNetworkUI:
         
         return positions
 
-    def _ordered_grid_layout(self, connections, n, canvas_width, canvas_height, margin):
-        """Layout de cuadrícula ordenado por número de conexiones"""
-        # Ordenar nodos por número de conexiones (más conectados primero)
-        nodes_by_degree = sorted(range(n), key=lambda x: len(connections[x]), reverse=True)
-        
-        cols = int(math.sqrt(n)) + 1
-        rows = (n + cols - 1) // cols
-        
-        spacing_x = (canvas_width - 2 * margin) // max(1, cols - 1) if cols > 1 else 0
-        spacing_y = (canvas_height - 180 - 2 * margin) // max(1, rows - 1) if rows > 1 else 0
-        
-        start_x = margin if cols > 1 else canvas_width // 2
-        start_y = 120 + margin if rows > 1 else canvas_height // 2 + 60
-        
-        positions = {}
-        for i, node in enumerate(nodes_by_degree):
-            row = i // cols
-            col = i % cols
-            
-            x = start_x + col * spacing_x
-            y = start_y + row * spacing_y
-            positions[node] = (x, y)
-        
-        return positions
-
     def _simple_grid_layout(self, n, canvas_width, canvas_height, margin):
         """Layout de cuadrícula simple sin análisis de conexiones"""
         positions = {}
@@ -690,161 +548,203 @@ class VirtualNetworkUI:
         return positions
 
 
+    def _edge_geometry(self, i, j, bidirectional):
+        """Coordenadas de la flecha i->j y del punto medio para su etiqueta"""
+        x1, y1 = self.node_positions[i]
+        x2, y2 = self.node_positions[j]
+
+        # Calcular offset para separar las líneas bidireccionales
+        offset = 8 if bidirectional else 0  # Aumentar offset para mejor visualización
+
+        # Calcular vector perpendicular para el offset
+        dx = x2 - x1
+        dy = y2 - y1
+        length = max(1, (dx*dx + dy*dy)**0.5)
+
+        # Vector perpendicular normalizado; para la arista i->j se desplaza hacia
+        # un lado y la arista j->i queda desplazada hacia el opuesto
+        perp_x = -dy / length * offset
+        perp_y = dx / length * offset
+
+        offset_x1 = x1 + perp_x
+        offset_y1 = y1 + perp_y
+        offset_x2 = x2 + perp_x
+        offset_y2 = y2 + perp_y
+
+        # Acortar la línea para que la flecha no se superponga con el nodo
+        # Calcular el radio del nodo (asumiendo radio de 15 píxeles)
+        node_radius = 15
+
+        # Acortar el final de la línea
+        line_dx = offset_x2 - offset_x1
+        line_dy = offset_y2 - offset_y1
+        line_length = max(1, (line_dx*line_dx + line_dy*line_dy)**0.5)
+
+        # Normalizar y acortar
+        unit_x = line_dx / line_length
+        unit_y = line_dy / line_length
+
+        line = (offset_x1 + unit_x * node_radius, offset_y1 + unit_y * node_radius,
+                offset_x2 - unit_x * node_radius, offset_y2 - unit_y * node_radius)
+        middle = ((offset_x1 + offset_x2) / 2, (offset_y1 + offset_y2) / 2)
+        return line, middle
+
     def draw_edges(self):
+        """
+        Sincroniza las flechas del canvas con la matriz de adyacencia.
+        Cada arista conserva sus ids de canvas y solo se modifica si su
+        geometría, estilo o etiqueta han cambiado. Devuelve True si se crearon elementos.
+        """
         n = self.num_nodes.get()
-
-        for i in range(n):
-            for j in range(n):
-                if i != j and (i < len(self.adjacency_matrix) and
-                            j < len(self.adjacency_matrix[i]) and
-                            self.adjacency_matrix[i][j].get() == 1):
-
-                    x1, y1 = self.node_positions[i]
-                    x2, y2 = self.node_positions[j]
-
-                    capacity = 0
-                    if (i < len(self.capacity_matrix) and
-                            j < len(self.capacity_matrix[i])):
-                        capacity = self.capacity_matrix[i][j].get()
-
-                    if capacity > 0:
-                        width = max(2, min(8, int(capacity / 2)))
-                        color = self.get_capacity_color(capacity)
-                    else:
-                        width = 1
-                        color = "gray"
-
-                    # Verificar si existe conexión bidireccional
-                    bidirectional = (j < len(self.adjacency_matrix) and
-                                i < len(self.adjacency_matrix[j]) and
-                                self.adjacency_matrix[j][i].get() == 1)
-
-                    # Calcular offset para separar las líneas bidireccionales
-                    offset = 8 if bidirectional else 0  # Aumentar offset para mejor visualización
-
-                    # Calcular vector perpendicular para el offset
-                    dx = x2 - x1
-                    dy = y2 - y1
-                    length = max(1, (dx*dx + dy*dy)**0.5)
-
-                    # Vector perpendicular normalizado
-                    perp_x = -dy / length * offset
-                    perp_y = dx / length * offset
-
-                    # Para conexiones bidireccionales, aplicar offset en direcciones opuestas
-                    if bidirectional:
-                        # Para la arista i->j, desplazar hacia un lado
-                        offset_x1 = x1 + perp_x
-                        offset_y1 = y1 + perp_y
-                        offset_x2 = x2 + perp_x
-                        offset_y2 = y2 + perp_y
-                    else:
-                        # Para conexiones unidireccionales, sin offset
-                        offset_x1 = x1
-                        offset_y1 = y1
-                        offset_x2 = x2
-                        offset_y2 = y2
-
-                    # Acortar la línea para que la flecha no se superponga con el nodo
-                    # Calcular el radio del nodo (asumiendo radio de 15 píxeles)
-                    node_radius = 15
-                    
-                    # Acortar el final de la línea
-                    line_dx = offset_x2 - offset_x1
-                    line_dy = offset_y2 - offset_y1
-                    line_length = max(1, (line_dx*line_dx + line_dy*line_dy)**0.5)
-                    
-                    # Normalizar y acortar
-                    unit_x = line_dx / line_length
-                    unit_y = line_dy / line_length
-                    
-                    final_x2 = offset_x2 - unit_x * node_radius
-                    final_y2 = offset_y2 - unit_y * node_radius
-                    final_x1 = offset_x1 + unit_x * node_radius
-
-                    # Dibujar la línea con flecha
-                    self.viz_canvas.create_line(final_x1, offset_y1 + unit_y * node_radius, 
-                                            final_x2, final_y2,
-                                            fill=color, width=width,
-                                            arrow="last", 
-                                            arrowshape=(12, 15, 4))  # Flecha más visible
-
-                    # Mostrar capacidad si está habilitado
-                    if self.show_capacities.get() and capacity > 0:
-                        mid_x = (offset_x1 + offset_x2) / 2
-                        mid_y = (offset_y1 + offset_y2) / 2
-
-                        text_id = self.viz_canvas.create_text(mid_x, mid_y,
-                                                            text=f"{capacity:.0f}",
-                                                            font=("Arial", 8, "bold"),
-                                                            fill="black")
-
-                        bbox = self.viz_canvas.bbox(text_id)
-                        if bbox:
-                            self.viz_canvas.create_rectangle(bbox[0]-2, bbox[1]-1,
-                                                            bbox[2]+2, bbox[3]+1,
-                                                            fill="white", outline="gray")
-
-                        self.viz_canvas.tag_raise(text_id)
+        adjacency = self.adjacency_matrix[:n, :n]
+        show_capacities = self.show_capacities.get()
+        canvas = self.viz_canvas
+        created = False
+
+        wanted = set()
+        for i, j in zip(*np.nonzero(adjacency)):
+            i, j = int(i), int(j)
+            if i == j:
+                continue
+            wanted.add((i, j))
+
+            capacity = float(self.capacity_matrix[i, j])
+            if capacity > 0:
+                width = max(2, min(8, int(capacity / 2)))
+                color = self.get_capacity_color(capacity)
+            else:
+                width = 1
+                color = "gray"
+
+            # Verificar si existe conexión bidireccional
+            bidirectional = adjacency[j, i] == 1
+            line, middle = self._edge_geometry(i, j, bidirectional)
+            show_label = show_capacities and capacity > 0
+            spec = (line, color, width, middle, f"{capacity:.0f}", show_label)
+
+            items = self._edge_items.get((i, j))
+            if items is None:
+                # Dibujar la línea con flecha y su etiqueta (oculta si no aplica)
+                line_id = canvas.create_line(*line, fill=color, width=width,
+                                             arrow="last", arrowshape=(12, 15, 4),  # Flecha más visible
+                                             tags=("edge",))
+                box_id = canvas.create_rectangle(0, 0, 0, 0, fill="white", outline="gray",
+                                                 tags=("edge_label",))
+                text_id = canvas.create_text(*middle, text=spec[4], font=("Arial", 8, "bold"),
+                                             fill="black", tags=("edge_label",))
+                items = self._edge_items[(i, j)] = {'line': line_id, 'box': box_id,
+                                                    'text': text_id, 'spec': None}
+                created = True
+            elif items['spec'] == spec:
+                continue
+
+            canvas.coords(items['line'], *line)
+            canvas.itemconfigure(items['line'], fill=color, width=width)
+            canvas.coords(items['text'], *middle)
+            state = "normal" if show_label else "hidden"
+            canvas.itemconfigure(items['text'], text=spec[4], state=state)
+            bbox = canvas.bbox(items['text'])
+            if bbox:
+                canvas.coords(items['box'], bbox[0]-2, bbox[1]-1, bbox[2]+2, bbox[3]+1)
+            canvas.itemconfigure(items['box'], state=state)
+            items['spec'] = spec
+
+        for key in set(self._edge_items) - wanted:
+            items = self._edge_items.pop(key)
+            canvas.delete(items['line'], items['box'], items['text'])
+
+        return created
 
     def draw_demands_text(self):
-        if not hasattr(self, 'demands'):
+        """Redibuja la lista de demandas solo si su contenido ha cambiado"""
+        show = self.show_demands.get()
+        active = self.demands[self.demands[:, 2] > 0]
+        demands_key = (show, active.tobytes())
+        if demands_key == self._demands_key:
+            return
+        self._demands_key = demands_key
+
+        if self._demand_items:
+            self.viz_canvas.delete(*self._demand_items)
+        self._demand_items = []
+        if not show:
             return
 
         start_x = 50
         start_y = 50
         line_height = 20
 
-        self.viz_canvas.create_text(start_x, start_y,
-                                    text="TRAFFIC DEMANDS:",
-                                    font=("Arial", 12, "bold"),
-                                    anchor="w")
+        title_id = self.viz_canvas.create_text(start_x, start_y,
+                                               text="TRAFFIC DEMANDS:",
+                                               font=("Arial", 12, "bold"),
+                                               anchor="w")
+        self._demand_items.append(title_id)
 
         current_y = start_y + 30
-        demand_count = 0
 
         colors = ["red", "blue", "green", "purple",
                   "orange", "brown", "pink", "cyan"]
 
-        for idx, demand in enumerate(self.demands):
-            if demand['demand'].get() > 0:
-                src = demand['source'].get()
-                dst = demand['dest'].get()
-                dem_value = demand['demand'].get()
+        for demand_count, (src, dst, dem_value) in enumerate(active):
+            src, dst = int(src), int(dst)
 
-                color = colors[demand_count % len(colors)]
+            color = colors[demand_count % len(colors)]
 
-                demand_text = f"D{demand_count + 1}: Node {src} → Node {dst} = {dem_value:.0f} Mbps"
+            demand_text = f"D{demand_count + 1}: Node {src} → Node {dst} = {dem_value:.0f} Mbps"
 
-                self.viz_canvas.create_text(start_x, current_y,
-                                            text=demand_text,
-                                            font=("Arial", 10, "bold"),
-                                            fill=color, anchor="w")
+            text_id = self.viz_canvas.create_text(start_x, current_y,
+                                                  text=demand_text,
+                                                  font=("Arial", 10, "bold"),
+                                                  fill=color, anchor="w")
+            self._demand_items.append(text_id)
 
-                current_y += line_height
-                demand_count += 1
+            current_y += line_height
 
-        if demand_count == 0:
-            self.viz_canvas.create_text(start_x, current_y,
-                                        text="No demands configured",
-                                        font=("Arial", 10, "italic"),
-                                        fill="gray", anchor="w")
+        if len(active) == 0:
+            empty_id = self.viz_canvas.create_text(start_x, current_y,
+                                                   text="No demands configured",
+                                                   font=("Arial", 10, "italic"),
+                                                   fill="gray", anchor="w")
+            self._demand_items.append(empty_id)
 
     def draw_nodes(self):
+        """Mueve, crea o elimina solo los nodos que han cambiado. Devuelve True si se crearon elementos."""
         n = self.num_nodes.get()
         node_radius = 25
+        label_state = "normal" if self.show_node_labels.get() else "hidden"
+        canvas = self.viz_canvas
+        created = False
 
         for i in range(n):
             x, y = self.node_positions[i]
-
-            self.viz_canvas.create_oval(x - node_radius, y - node_radius,
-                                        x + node_radius, y + node_radius,
-                                        fill="lightblue", outline="navy", width=2)
-
-            if self.show_node_labels.get():
-                self.viz_canvas.create_text(x, y, text=str(i + 1),
-                                            font=("Arial", 12, "bold"),
-                                            fill="navy")
+            spec = (x, y, label_state)
+
+            items = self._node_items.get(i)
+            if items is None:
+                oval_id = canvas.create_oval(x - node_radius, y - node_radius,
+                                             x + node_radius, y + node_radius,
+                                             fill="lightblue", outline="navy", width=2,
+                                             tags=("node",))
+                label_id = canvas.create_text(x, y, text=str(i + 1),
+                                              font=("Arial", 12, "bold"),
+                                              fill="navy", state=label_state, tags=("node",))
+                self._node_items[i] = {'oval': oval_id, 'label': label_id, 'spec': spec}
+                created = True
+                continue
+            if items['spec'] == spec:
+                continue
+
+            canvas.coords(items['oval'], x - node_radius, y - node_radius,
+                          x + node_radius, y + node_radius)
+            canvas.coords(items['label'], x, y)
+            canvas.itemconfigure(items['label'], state=label_state)
+            items['spec'] = spec
+
+        for i in [i for i in self._node_items if i >= n]:
+            items = self._node_items.pop(i)
+            canvas.delete(items['oval'], items['label'])
+
+        return created
 
     def get_capacity_color(self, capacity):
         if capacity >= 10:
@@ -857,13 +757,13 @@ class VirtualNetworkUI:
             return "red"
 
     def clear_all(self):
-        for i in range(len(self.adjacency_matrix)):
-            for j in range(len(self.adjacency_matrix[i])):
-                self.adjacency_matrix[i][j].set(0)
-                self.capacity_matrix[i][j].set(0.0)
-
-        for demand in self.demands:
-            demand['demand'].set(0.0)
+        self.adjacency_matrix.fill(0)
+        self.capacity_matrix.fill(0.0)
+        self.demands[:, 2] = 0.0
+        self.adj_grid.refresh()
+        self.cap_grid.refresh()
+        self.demand_grid.refresh()
+        self.update_visualization()
 
         self.result_text.delete(1.0, tk.END)
 
@@ -872,26 +772,94 @@ class VirtualNetworkUI:
         self.num_demands.set(2)
         self.update_matrices()
 
+        self.adjacency_matrix.fill(0)
+        self.capacity_matrix.fill(0.0)
+
         connections = [(0, 1), (1, 2), (1, 3), (2, 4), (3, 4)]
         for i, j in connections:
-            self.adjacency_matrix[i][j].set(1)
-            self.adjacency_matrix[j][i].set(1)
+            self.adjacency_matrix[i, j] = 1
+            self.adjacency_matrix[j, i] = 1
 
         capacities = {(0, 1): 12, (1, 2): 10, (1, 3): 7, (2, 4): 8, (3, 4): 6}
         for (i, j), cap in capacities.items():
-            self.capacity_matrix[i][j].set(cap)
-            self.capacity_matrix[j][i].set(cap)
+            self.capacity_matrix[i, j] = cap
+            self.capacity_matrix[j, i] = cap
 
-        self.demands[0]['source'].set(1)
-        self.demands[0]['dest'].set(5)
-        self.demands[0]['demand'].set(8)
+        self.demands[0] = (1, 5, 8)
+        self.demands[1] = (1, 5, 4)
 
-        self.demands[1]['source'].set(1)
-        self.demands[1]['dest'].set(5)
-        self.demands[1]['demand'].set(4)
+        self.adj_grid.refresh()
+        self.cap_grid.refresh()
+        self.demand_grid.refresh()
 
         self.update_visualization()
 
+    NETWORK_FILETYPES = [("JSON", "*.json"), ("Lista de enlaces CSV", "*.csv"),
+                         ("GraphML", "*.graphml"), ("Todos", "*.*")]
+
+    def import_network(self):
+        """Carga topología y demandas desde JSON, CSV o GraphML rellenando los modelos de una vez"""
+        path = filedialog.askopenfilename(title="Importar red", filetypes=self.NETWORK_FILETYPES)
+        if not path:
+            return
+        try:
+            network_data = load_network(path)
+        except (OSError, ValueError, SyntaxError) as e:
+            messagebox.showerror("Error", f"No se pudo importar la red:\n{e}")
+            return
+
+        n = network_data['num_nodes']
+        edges, demands = network_data['edges'], network_data['demands']
+        if n < 2:
+            messagebox.showerror("Error", "La red importada necesita al menos 2 nodos")
+            return
+
+        # Construir los modelos completos con asignaciones vectorizadas
+        sources = edges[:, 0].astype(np.intp)
+        destinations = edges[:, 1].astype(np.intp)
+        self.adjacency_matrix = np.zeros((n, n), dtype=self.adjacency_matrix.dtype)
+        self.capacity_matrix = np.zeros((n, n), dtype=float)
+        self.adjacency_matrix[sources, destinations] = 1
+        self.capacity_matrix[sources, destinations] = edges[:, 2]
+        np.fill_diagonal(self.adjacency_matrix, 0)
+        np.fill_diagonal(self.capacity_matrix, 0.0)
+
+        # La interfaz numera los nodos desde 1 y requiere al menos una fila de demanda
+        self.demands = np.zeros((max(len(demands), 1), 3), dtype=float)
+        self.demands[:len(demands)] = demands
+        self.demands[:len(demands), :2] += 1
+        if not len(demands):
+            self.demands[0] = (1, n, 0)
+
+        self.num_nodes.set(n)
+        self.num_demands.set(len(self.demands))
+        self.adj_grid.set_model(self.adjacency_matrix)
+        self.cap_grid.set_model(self.capacity_matrix)
+        self.demand_grid.set_model(self.demands)
+        self.update_visualization()
+        self.status_label.config(text=f"Importado: {os.path.basename(path)}", fg='green')
+
+    def export_network(self):
+        """Guarda la topología y las demandas actuales en JSON, CSV o GraphML"""
+        path = filedialog.asksaveasfilename(title="Exportar red", defaultextension=".json",
+                                            filetypes=self.NETWORK_FILETYPES)
+        if not path:
+            return
+        capacity_matrix, demands_list = self._current_network()
+        try:
+            save_network({'capacity_matrix': capacity_matrix, 'demands': demands_list}, path)
+        except (OSError, ValueError) as e:
+            messagebox.showerror("Error", f"No se pudo exportar la red:\n{e}")
+            return
+        self.status_label.config(text=f"Exportado: {os.path.basename(path)}", fg='green')
+
+    def _current_network(self):
+        """Matriz de capacidades efectivas y demandas activas (nodos en base 0)"""
+        capacity_matrix = np.where(self.adjacency_matrix == 1, self.capacity_matrix, 0.0)
+        active = self.demands[self.demands[:, 2] > 0]
+        demands_list = [[int(src) - 1, int(dst) - 1, float(dem)] for src, dst, dem in active]
+        return capacity_matrix, demands_list
+
     def analyze_network(self):
         """
         Analiza la red virtual y ejecuta el algoritmo de asignación óptima de recursos.
@@ -903,25 +871,10 @@ class VirtualNetworkUI:
             
             # Obtener y validar datos de entrada
             n = self.num_nodes.get()
-            adj_matrix = np.array([[self.adjacency_matrix[i][j].get() for j in range(n)] for i in range(n)])
-            cap_matrix = np.array([[self.capacity_matrix[i][j].get() for j in range(n)] for i in range(n)])
-            
-            # Crear matriz de capacidades efectivas (solo enlaces existentes)
-            capacity_matrix = []
-            for i in range(n):
-                row = [cap_matrix[i][j] if adj_matrix[i][j] == 1 else 0 for j in range(n)]
-                capacity_matrix.append(row)
             
-            # Procesar y filtrar demandas activas
-            demands_list = []
-            total_demand_bandwidth = 0
-            for i, demand in enumerate(self.demands):
-                src = demand['source'].get() - 1
-                dst = demand['dest'].get() - 1
-                dem = demand['demand'].get()
-                if dem > 0:
-                    demands_list.append([src, dst, dem])
-                    total_demand_bandwidth += dem
+            # Capacidades efectivas (solo enlaces existentes) y demandas activas
+            capacity_matrix, demands_list = self._current_network()
+            total_demand_bandwidth = sum(demand[2] for demand in demands_list)
             
             if not demands_list:
                 self._show_warning("No hay demandas activas para procesar")
@@ -948,7 +901,10 @@ class VirtualNetworkUI:
             
             # Ejecutar algoritmo de asignación óptima
             self._display_progress("Ejecutando algoritmo de asignación óptima...")
-            result = allocator.offline_brute_force_allocation()
+            if self.result_cache is not None:
+                result = self.result_cache.allocate(allocator, network_data)
+            else:
+                result = allocator.offline_brute_force_allocation()
             
             if result['success']:
                 self._display_detailed_results(result, demands_list, allocator, cost_per_mbps, revenue_per_mbps)
@@ -996,9 +952,17 @@ class VirtualNetworkUI:
             f"Enlaces físicos totales: {allocator.total_links}",
             f"Capacidad total disponible: {allocator.total_capacity:.2f} Mbps",
             f"Demanda total solicitada: {allocator.total_demand:.2f} Mbps",
-            f"Estado de conectividad: {'✅ Conectada' if allocator.network_connected else '❌ Desconectada'}"
+            f"Estado de conectividad: {'✅ Conectada' if allocator.network_connected else '❌ Desconectada'}",
+            f"Componentes conexas: {allocator.num_components}"
         ]
         
+        if allocator.num_components > 1:
+            sizes = sorted(allocator.component_sizes.tolist(), reverse=True)
+            shown = ", ".join(str(size) for size in sizes[:10])
+            if len(sizes) > 10:
+                shown += f", ... (+{len(sizes) - 10})"
+            network_info.append(f"Tamaño de las componentes (nodos): {shown}")
+        
         for line in network_info:
             self.result_text.insert(tk.END, f"{line}\n")
         
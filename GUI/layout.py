@@ -0,0 +1,148 @@
+"""Layout de fuerzas (Fruchterman–Reingold) vectorizado con NumPy para topologías grandes"""
+import hashlib
+from collections import OrderedDict
+import numpy as np
+
+# A partir de este número de nodos la repulsión se aproxima con una rejilla espacial
+GRID_THRESHOLD = 200
+
+
+def topology_fingerprint(adjacency):
+    """Huella de la topología: depende solo de qué enlaces existen, no de sus capacidades"""
+    adjacency = np.asarray(adjacency)
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(str(adjacency.shape).encode())
+    digest.update(np.packbits(adjacency != 0).tobytes())
+    return digest.hexdigest()
+
+
+def _undirected_edges(adjacency):
+    undirected = (adjacency != 0) | (adjacency.T != 0)
+    sources, destinations = np.nonzero(np.triu(undirected, k=1))
+    return sources, destinations
+
+
+def _exact_repulsion(positions, k):
+    """Repulsión k²/d entre todos los pares de nodos, O(n²) en memoria y tiempo"""
+    dx = positions[:, 0, None] - positions[None, :, 0]
+    dy = positions[:, 1, None] - positions[None, :, 1]
+    weight = dx * dx + dy * dy
+    np.fill_diagonal(weight, np.inf)
+    np.maximum(weight, 1e-6, out=weight)
+    np.divide(k * k, weight, out=weight)
+    return np.column_stack([(dx * weight).sum(axis=1), (dy * weight).sum(axis=1)])
+
+
+def _grid_repulsion(positions, k):
+    """
+    Repulsión aproximada: solo entre nodos de celdas vecinas de una rejilla de
+    lado 2k (variante de rejilla de Fruchterman–Reingold), sin construir matrices n x n
+    """
+    n = len(positions)
+    cell_size = 2 * k
+    cells = np.floor((positions - positions.min(axis=0)) / cell_size).astype(np.int64)
+    columns = cells[:, 1].max() + 3
+    keys = (cells[:, 0] + 1) * columns + (cells[:, 1] + 1)
+
+    order = np.argsort(keys, kind='stable')
+    sorted_keys = keys[order]
+    force = np.zeros_like(positions)
+
+    for dx in (-1, 0, 1):
+        for dy in (-1, 0, 1):
+            neighbor_keys = keys + dx * columns + dy
+            starts = np.searchsorted(sorted_keys, neighbor_keys, side='left')
+            ends = np.searchsorted(sorted_keys, neighbor_keys, side='right')
+            counts = ends - starts
+            if counts.sum() == 0:
+                continue
+            # Expandir los rangos [start, end) de cada nodo en pares (nodo, vecino)
+            nodes = np.repeat(np.arange(n), counts)
+            offsets = np.arange(counts.sum()) - np.repeat(np.cumsum(counts) - counts, counts)
+            others = order[np.repeat(starts, counts) + offsets]
+            keep = nodes != others
+            nodes, others = nodes[keep], others[keep]
+
+            delta = positions[nodes] - positions[others]
+            distance2 = np.maximum(np.einsum('ij,ij->i', delta, delta), 1e-6)
+            # Fuera del radio 2k la fuerza se ignora
+            weight = np.where(distance2 < cell_size * cell_size, k * k / distance2, 0.0)
+            force[:, 0] += np.bincount(nodes, weights=delta[:, 0] * weight, minlength=n)
+            force[:, 1] += np.bincount(nodes, weights=delta[:, 1] * weight, minlength=n)
+    return force
+
+
+def force_directed_layout(adjacency, width, height, margin=50, top=0, iterations=None, seed=0):
+    """
+    Calcula posiciones con Fruchterman–Reingold vectorizado.
+
+    Devuelve {nodo: (x, y)} dentro del rectángulo [margin, width - margin] x
+    [top + margin, height - margin]. Por encima de GRID_THRESHOLD nodos la
+    repulsión se limita a celdas vecinas de una rejilla espacial.
+    """
+    adjacency = np.asarray(adjacency)
+    n = len(adjacency)
+    if n == 0:
+        return {}
+    if n == 1:
+        return {0: (width / 2, (top + height) / 2)}
+
+    sources, destinations = _undirected_edges(adjacency)
+    rng = np.random.default_rng(seed)
+
+    # Espacio de trabajo normalizado al cuadrado unidad; posición inicial en círculo
+    k = np.sqrt(1.0 / n)
+    angles = 2 * np.pi * np.arange(n) / n
+    positions = 0.5 + 0.4 * np.column_stack([np.cos(angles), np.sin(angles)])
+    positions += rng.uniform(-0.01, 0.01, size=positions.shape)
+
+    if iterations is None:
+        iterations = 200 if n <= GRID_THRESHOLD else 60
+    repulsion = _exact_repulsion if n <= GRID_THRESHOLD else _grid_repulsion
+    temperature = 0.1
+
+    for step in range(iterations):
+        displacement = repulsion(positions, k)
+
+        # Atracción d²/k a lo largo de cada enlace
+        delta = positions[sources] - positions[destinations]
+        distance = np.sqrt(np.einsum('ij,ij->i', delta, delta)) + 1e-9
+        pull = delta * (distance / k)[:, None]
+        for axis in (0, 1):
+            displacement[:, axis] += (np.bincount(destinations, weights=pull[:, axis], minlength=n)
+                                      - np.bincount(sources, weights=pull[:, axis], minlength=n))
+
+        # Gravedad débil hacia el centro para que las componentes no se dispersen
+        displacement -= (positions - 0.5) * (k * n * 0.01)
+
+        length = np.sqrt(np.einsum('ij,ij->i', displacement, displacement)) + 1e-9
+        positions += displacement * (np.minimum(length, temperature) / length)[:, None]
+        temperature = 0.1 * (1 - (step + 1) / iterations) + 1e-3
+
+    # Escalar al área de dibujo
+    low, high = positions.min(axis=0), positions.max(axis=0)
+    span = np.where(high - low > 1e-9, high - low, 1.0)
+    unit = (positions - low) / span
+    xs = margin + unit[:, 0] * (width - 2 * margin)
+    ys = top + margin + unit[:, 1] * (height - top - 2 * margin)
+    return {i: (float(x), float(y)) for i, (x, y) in enumerate(zip(xs, ys))}
+
+
+class LayoutCache:
+    """Caché LRU de layouts indexada por huella de topología y tamaño del área"""
+
+    def __init__(self, max_entries=32):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+
+    def get(self, key):
+        positions = self._entries.get(key)
+        if positions is not None:
+            self._entries.move_to_end(key)
+        return positions
+
+    def put(self, key, positions):
+        self._entries[key] = positions
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
@@ -0,0 +1,217 @@
+import tkinter as tk
+from tkinter import ttk
+import numpy as np
+
+
+class VirtualGrid(tk.Frame):
+    """
+    Editor de tablas virtualizado respaldado por un array de NumPy.
+
+    Solo se dibujan como elementos del canvas las celdas visibles en el
+    viewport, y un único widget de edición se superpone a la celda activa,
+    de modo que el coste no depende del tamaño de la matriz.
+
+    Tipos de columna ('kinds'):
+        'check'  -> casilla 0/1 que se alterna con un clic
+        'entry'  -> valor numérico editable
+        'choice' -> valor elegido de una lista (choices(col))
+    """
+
+    def __init__(self, parent, model=None, kinds='entry', row_labels=None, column_labels=None,
+                 disabled=None, choices=None, on_change=None, cell_width=48, cell_height=22,
+                 header_width=44, height=160, corner_label="Node"):
+        super().__init__(parent, bg='#ffffff')
+        self.kinds = kinds
+        self.row_labels = row_labels or (lambda i: f"{i+1}")
+        self.column_labels = column_labels or (lambda j: f"{j+1}")
+        self.disabled = disabled or (lambda i, j: False)
+        self.choices = choices or (lambda j: [])
+        self.on_change = on_change
+        self.cell_width = cell_width
+        self.cell_height = cell_height
+        self.header_width = header_width
+        self.corner_label = corner_label
+        self.model = np.zeros((0, 0)) if model is None else model
+
+        self.canvas = tk.Canvas(self, height=height, bg='#ffffff', highlightthickness=0)
+        self.scrollbar_v = ttk.Scrollbar(self, orient="vertical", command=self._yview)
+        self.scrollbar_h = ttk.Scrollbar(self, orient="horizontal", command=self._xview)
+        self.canvas.configure(yscrollcommand=self.scrollbar_v.set,
+                              xscrollcommand=self.scrollbar_h.set)
+
+        self.scrollbar_h.pack(side="bottom", fill="x")
+        self.scrollbar_v.pack(side="right", fill="y")
+        self.canvas.pack(side="left", fill="both", expand=True)
+
+        # Un único editor reutilizable para todas las celdas
+        self._editor = None
+        self._editing = None
+        self._redraw_pending = None
+
+        self.canvas.bind("<Configure>", lambda e: self.refresh())
+        self.canvas.bind("<Button-1>", self._on_click)
+        self.canvas.bind("<MouseWheel>", lambda e: self._yview("scroll", int(-1*(e.delta/120)), "units"))
+        self.canvas.bind("<Shift-MouseWheel>", lambda e: self._xview("scroll", int(-1*(e.delta/120)), "units"))
+        self.canvas.bind("<Button-4>", lambda e: self._yview("scroll", -1, "units"))
+        self.canvas.bind("<Button-5>", lambda e: self._yview("scroll", 1, "units"))
+
+        self.refresh()
+
+    # --- Modelo ---------------------------------------------------------
+
+    def set_model(self, model):
+        """Sustituye el array mostrado y redibuja el viewport"""
+        self._close_editor(commit=False)
+        self.model = model
+        self.refresh()
+
+    def kind(self, col):
+        return self.kinds if isinstance(self.kinds, str) else self.kinds[col]
+
+    def format_value(self, row, col):
+        value = self.model[row, col]
+        kind = self.kind(col)
+        if kind == 'check':
+            return "✓" if value else ""
+        if kind == 'choice':
+            return f"{int(value)}"
+        return f"{value:g}"
+
+    # --- Dibujo ---------------------------------------------------------
+
+    def refresh(self):
+        """Actualiza la región de scroll y redibuja las celdas visibles"""
+        rows, cols = self.model.shape
+        width = self.header_width + cols * self.cell_width
+        height = self.cell_height * (rows + 1)
+        self.canvas.configure(scrollregion=(0, 0, width, height))
+        self._redraw()
+
+    def _schedule_redraw(self):
+        # Agrupa varios eventos de scroll en un solo redibujado
+        if self._redraw_pending is None:
+            self._redraw_pending = self.after_idle(self._redraw)
+
+    def _visible_range(self):
+        rows, cols = self.model.shape
+        x0, y0 = self.canvas.canvasx(0), self.canvas.canvasy(0)
+        x1 = x0 + max(self.canvas.winfo_width(), 1)
+        y1 = y0 + max(self.canvas.winfo_height(), 1)
+        first_row = max(0, int((y0 - self.cell_height) // self.cell_height))
+        last_row = min(rows, int((y1 - self.cell_height) // self.cell_height) + 1)
+        first_col = max(0, int((x0 - self.header_width) // self.cell_width))
+        last_col = min(cols, int((x1 - self.header_width) // self.cell_width) + 1)
+        return x0, y0, range(first_row, last_row), range(first_col, last_col)
+
+    def _redraw(self):
+        self._redraw_pending = None
+        canvas = self.canvas
+        canvas.delete("all")
+        x0, y0, row_range, col_range = self._visible_range()
+        cw, ch, hw = self.cell_width, self.cell_height, self.header_width
+
+        for i in row_range:
+            y = ch * (i + 1)
+            for j in col_range:
+                x = hw + j * cw
+                if self.disabled(i, j):
+                    canvas.create_text(x + cw / 2, y + ch / 2, text="—", fill="gray")
+                    continue
+                canvas.create_rectangle(x + 2, y + 2, x + cw - 2, y + ch - 2,
+                                        outline="#d0d7de", fill="#ffffff")
+                canvas.create_text(x + cw / 2, y + ch / 2, text=self.format_value(i, j),
+                                   font=("Arial", 9), fill="#2c3e50")
+
+        # Cabeceras fijas en la parte superior e izquierda del viewport
+        for j in col_range:
+            x = hw + j * cw
+            canvas.create_rectangle(x, y0, x + cw, y0 + ch, fill="#f8f9fa", outline="")
+            canvas.create_text(x + cw / 2, y0 + ch / 2, text=self.column_labels(j),
+                               font=("Arial", 9, "bold"))
+        for i in row_range:
+            y = ch * (i + 1)
+            canvas.create_rectangle(x0, y, x0 + hw, y + ch, fill="#f8f9fa", outline="")
+            canvas.create_text(x0 + hw / 2, y + ch / 2, text=self.row_labels(i),
+                               font=("Arial", 9, "bold"))
+        canvas.create_rectangle(x0, y0, x0 + hw, y0 + ch, fill="#f8f9fa", outline="")
+        canvas.create_text(x0 + hw / 2, y0 + ch / 2, text=self.corner_label, font=("Arial", 9, "bold"))
+
+    def _xview(self, *args):
+        self._close_editor(commit=True)
+        self.canvas.xview(*args)
+        self._schedule_redraw()
+
+    def _yview(self, *args):
+        self._close_editor(commit=True)
+        self.canvas.yview(*args)
+        self._schedule_redraw()
+
+    # --- Edición --------------------------------------------------------
+
+    def _cell_at(self, event):
+        x, y = self.canvas.canvasx(event.x), self.canvas.canvasy(event.y)
+        x0, y0 = self.canvas.canvasx(0), self.canvas.canvasy(0)
+        if x < x0 + self.header_width or y < y0 + self.cell_height:
+            return None
+        row = int(y // self.cell_height) - 1
+        col = int((x - self.header_width) // self.cell_width)
+        rows, cols = self.model.shape
+        if not (0 <= row < rows and 0 <= col < cols) or self.disabled(row, col):
+            return None
+        return row, col
+
+    def _on_click(self, event):
+        self._close_editor(commit=True)
+        cell = self._cell_at(event)
+        if cell is None:
+            return
+        row, col = cell
+        if self.kind(col) == 'check':
+            self._set_value(row, col, 0 if self.model[row, col] else 1)
+        else:
+            self._open_editor(row, col)
+
+    def _set_value(self, row, col, value):
+        if self.model[row, col] == value:
+            return
+        self.model[row, col] = value
+        self._redraw()
+        if self.on_change:
+            self.on_change(row, col, value)
+
+    def _open_editor(self, row, col):
+        if self.kind(col) == 'choice':
+            editor = ttk.Combobox(self.canvas, values=self.choices(col), state="readonly")
+            editor.set(self.format_value(row, col))
+            editor.bind("<<ComboboxSelected>>", lambda e: self._close_editor(commit=True))
+        else:
+            editor = ttk.Entry(self.canvas)
+            editor.insert(0, self.format_value(row, col))
+            editor.select_range(0, tk.END)
+            editor.bind("<Return>", lambda e: self._close_editor(commit=True))
+            editor.bind("<FocusOut>", lambda e: self._close_editor(commit=True))
+        editor.bind("<Escape>", lambda e: self._close_editor(commit=False))
+
+        x = self.header_width + col * self.cell_width - self.canvas.canvasx(0)
+        y = self.cell_height * (row + 1) - self.canvas.canvasy(0)
+        editor.place(x=x, y=y, width=self.cell_width, height=self.cell_height)
+        editor.focus_set()
+        self._editor = editor
+        self._editing = (row, col)
+
+    def _close_editor(self, commit=True):
+        editor, cell = self._editor, self._editing
+        if editor is None:
+            return
+        self._editor = None
+        self._editing = None
+        text = editor.get().strip()
+        editor.destroy()
+        if not commit:
+            return
+        try:
+            value = float(text) if text else 0.0
+        except ValueError:
+            self.bell()
+            return
+        self._set_value(cell[0], cell[1], value)
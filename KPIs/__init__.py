@@ -0,0 +1,3 @@
+"""
+Indicadores de rendimiento (KPI) de los resultados de asignación
+"""
@@ -1,28 +1,158 @@
 # KPIs para la asignación de red virtual
+import numpy as np
 
 # Constants for cost and revenue per Mbps
 COST_PER_MBPS = 1.0  # Change as needed
 REVENUE_PER_MBPS = 10.0  # Change as needed
 
+# Columnas que produce compute_kpis
+KPI_COLUMNS = ('acceptance_ratio', 'revenue_cost_ratio', 'total_revenue', 'total_cost',
+               'num_assigned', 'num_rejected', 'total_combinations', 'valid_combinations',
+               'protection_overhead')
+
+
+# --- Capa columnar ---------------------------------------------------------
+
+def _safe_ratio(numerator, denominator):
+    """Divide elemento a elemento devolviendo 0.0 donde el denominador es 0."""
+    numerator = np.asarray(numerator, dtype=float)
+    denominator = np.asarray(denominator, dtype=float)
+    out = np.zeros(np.broadcast(numerator, denominator).shape)
+    return np.divide(numerator, denominator, out=out, where=denominator != 0)
+
+
+def _detail_sum(details, key):
+    return np.fromiter((detail.get(key, 0) for detail in details), dtype=float).sum()
+
+
+def results_to_columns(results, total_demands=None):
+    """
+    Convierte una secuencia de resultados de asignación en columnas NumPy.
+
+    total_demands (escalar o array) sustituye al total asignadas + rechazadas.
+    Los contadores de combinaciones ausentes quedan como NaN.
+    """
+    count = len(results)
+    columns = {
+        'num_assigned': np.fromiter((len(r.get('allocated_demands', ())) for r in results), dtype=float, count=count),
+        'num_rejected': np.fromiter((len(r.get('rejected_demands', ())) for r in results), dtype=float, count=count),
+        'revenue': np.fromiter((_detail_sum(r.get('allocation_details', ()), 'revenue') for r in results),
+                               dtype=float, count=count),
+        'cost': np.fromiter((_detail_sum(r.get('allocation_details', ()), 'cost') for r in results),
+                            dtype=float, count=count),
+        'total_combinations': np.fromiter((r.get('total_combinations_evaluated', np.nan) for r in results),
+                                          dtype=float, count=count),
+        'valid_combinations': np.fromiter((r.get('valid_combinations', np.nan) for r in results),
+                                          dtype=float, count=count),
+        'primary_capacity': np.fromiter((r.get('primary_capacity', np.nan) for r in results),
+                                        dtype=float, count=count),
+        'backup_capacity': np.fromiter((r.get('backup_capacity', np.nan) for r in results),
+                                       dtype=float, count=count),
+    }
+    if total_demands is None:
+        columns['total_demands'] = columns['num_assigned'] + columns['num_rejected']
+    else:
+        columns['total_demands'] = np.broadcast_to(np.asarray(total_demands, dtype=float), (count,)).copy()
+    return columns
+
+
+def compute_kpis(columns, revenue_per_mbps=1.0, cost_per_mbps=1.0):
+    """
+    Calcula todos los KPIs de muchas ejecuciones en una sola pasada vectorizada.
+
+    columns es un dict de arrays como el de results_to_columns; revenue_per_mbps y
+    cost_per_mbps pueden ser escalares o arrays por ejecución. Devuelve un dict
+    con las columnas de KPI_COLUMNS, con NaN donde un dato no está disponible.
+    """
+    num_assigned = np.asarray(columns['num_assigned'], dtype=float)
+    revenue = np.asarray(columns['revenue'], dtype=float) * revenue_per_mbps
+    cost = np.asarray(columns['cost'], dtype=float) * cost_per_mbps
+    nan = np.full(num_assigned.shape, np.nan)
+    # Capacidad de respaldo por unidad de capacidad primaria (NaN sin protección)
+    primary_capacity = np.asarray(columns.get('primary_capacity', nan), dtype=float)
+    backup_capacity = np.asarray(columns.get('backup_capacity', nan), dtype=float)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        protection_overhead = np.where(primary_capacity > 0, backup_capacity / primary_capacity, np.nan)
+    return {
+        'acceptance_ratio': _safe_ratio(num_assigned, columns['total_demands']),
+        'revenue_cost_ratio': _safe_ratio(revenue, cost),
+        'total_revenue': revenue,
+        'total_cost': cost,
+        'num_assigned': num_assigned,
+        'num_rejected': np.asarray(columns['num_rejected'], dtype=float),
+        'total_combinations': np.asarray(columns.get('total_combinations', nan), dtype=float),
+        'valid_combinations': np.asarray(columns.get('valid_combinations', nan), dtype=float),
+        'protection_overhead': protection_overhead,
+    }
+
+
+def summarize_kpis(kpis, groups=None, percentiles=(5, 50, 95), confidence=0.95):
+    """
+    Resumen agrupado de KPIs (por topología, política, ...).
+
+    groups es un array con la etiqueta de cada ejecución (None = un único grupo).
+    Para cada grupo y KPI devuelve count, mean, std, los percentiles pedidos
+    (p5, p50, ...) y el intervalo de confianza normal de la media (ci_low, ci_high).
+    Los NaN se ignoran.
+    Devuelve {grupo: {kpi: {estadístico: valor}}}.
+    """
+    size = len(next(iter(kpis.values())))
+    labels, inverse = np.unique(np.zeros(size) if groups is None else np.asarray(groups),
+                                return_inverse=True)
+    num_groups = len(labels)
+    from statistics import NormalDist
+    z = NormalDist().inv_cdf(0.5 + confidence / 2)
+
+    # Ordenar una vez por grupo para que cada grupo sea un bloque contiguo
+    order = np.argsort(inverse, kind='stable')
+    bounds = np.searchsorted(inverse[order], np.arange(num_groups + 1))
+
+    summary = {(None if groups is None else label.item()): {} for label in labels}
+    keys = list(summary)
+    for name, values in kpis.items():
+        values = np.asarray(values, dtype=float)
+        valid = ~np.isnan(values)
+        filled = np.where(valid, values, 0.0)
+        counts = np.bincount(inverse, weights=valid, minlength=num_groups)
+        sums = np.bincount(inverse, weights=filled, minlength=num_groups)
+        means = _safe_ratio(sums, counts)
+        means[counts == 0] = np.nan
+        squares = np.bincount(inverse, weights=np.where(valid, (filled - means[inverse]) ** 2, 0.0),
+                              minlength=num_groups)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            stds = np.where(counts > 1, np.sqrt(squares / (counts - 1)), np.nan)
+            half_width = z * stds / np.sqrt(counts)
+
+        sorted_values = values[order]
+        for g, key in enumerate(keys):
+            block = sorted_values[bounds[g]:bounds[g + 1]]
+            block = block[~np.isnan(block)]
+            stats = {'count': int(counts[g]), 'mean': float(means[g]), 'std': float(stds[g]),
+                     'ci_low': float(means[g] - half_width[g]), 'ci_high': float(means[g] + half_width[g])}
+            points = np.percentile(block, percentiles) if len(block) else np.full(len(percentiles), np.nan)
+            for p, value in zip(percentiles, points):
+                stats[f"p{p:g}"] = float(value)
+            summary[key][name] = stats
+    return summary
+
+
+# --- Funciones escalares (un único resultado) ------------------------------
+
 def acceptance_ratio(allocated_demands, total_demands):
     """Calcula el ratio de aceptación de demandas."""
-    if total_demands == 0:
-        return 0.0
-    return len(allocated_demands) / total_demands
+    return float(_safe_ratio(len(allocated_demands), total_demands))
 
 def revenue_cost_ratio(total_revenue, total_cost):
     """Calcula el ratio ingresos/costos."""
-    if total_cost == 0:
-        return 0.0
-    return total_revenue / total_cost
+    return float(_safe_ratio(total_revenue, total_cost))
 
 def total_revenue(allocated_details, revenue_per_mbps=1.0):
     """Suma los ingresos de las demandas asignadas usando el parámetro de revenue por Mbps."""
-    return sum(detail.get('revenue', 0) * revenue_per_mbps for detail in allocated_details)
+    return float(_detail_sum(allocated_details, 'revenue') * revenue_per_mbps)
 
 def total_cost(allocated_details, cost_per_mbps=1.0):
     """Suma los costos de las demandas asignadas usando el parámetro de coste por Mbps."""
-    return sum(detail.get('cost', 0) * cost_per_mbps for detail in allocated_details)
+    return float(_detail_sum(allocated_details, 'cost') * cost_per_mbps)
 
 def num_demands_assigned(allocated_demands):
     """Cuenta las demandas asignadas."""
@@ -33,9 +163,16 @@ def num_demands_rejected(rejected_demands):
     return len(rejected_demands)
 
 def total_combinations_evaluated(result):
-    """Obtiene el número de combinaciones evaluadas."""
-    return result.get('total_combinations_evaluated', 'N/A')
+    """Obtiene el número de combinaciones evaluadas (NaN si no está disponible)."""
+    return result.get('total_combinations_evaluated', np.nan)
 
 def valid_combinations(result):
-    """Obtiene el número de combinaciones válidas."""
-    return result.get('valid_combinations', 'N/A')
+    """Obtiene el número de combinaciones válidas (NaN si no está disponible)."""
+    return result.get('valid_combinations', np.nan)
+
+def protection_overhead(result):
+    """Capacidad reservada para respaldo por unidad de capacidad primaria (NaN sin protección)."""
+    primary_capacity = result.get('primary_capacity', 0)
+    if not primary_capacity:
+        return np.nan
+    return result.get('backup_capacity', np.nan) / primary_capacity
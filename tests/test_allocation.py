@@ -0,0 +1,140 @@
+import numpy as np
+import pytest
+
+from Allocation.allocation import VirtualNetworkAllocation
+from Allocation.sparse_allocation import SparseVirtualNetworkAllocation
+
+BACKENDS = [VirtualNetworkAllocation, SparseVirtualNetworkAllocation]
+
+
+def _capacity(allocator, u, v):
+    if allocator.capacity_matrix.ndim == 1:
+        return allocator.capacity_matrix[allocator.edge_id(u, v)]
+    return allocator.capacity_matrix[u, v]
+
+
+@pytest.mark.parametrize('backend', BACKENDS)
+def test_allocation_reduces_the_reverse_arc_while_it_has_capacity(backend):
+    allocator = backend({'capacity_matrix': [[0, 10], [4, 0]], 'demands': []})
+    allocator.allocate_path([1, 0], 4)
+    assert (_capacity(allocator, 0, 1), _capacity(allocator, 1, 0)) == (6, 0)
+
+    # Once the reverse arc has no residual capacity it is left alone
+    allocator.allocate_path([0, 1], 6)
+    assert (_capacity(allocator, 0, 1), _capacity(allocator, 1, 0)) == (0, 0)
+
+
+@pytest.mark.parametrize('backend', BACKENDS)
+def test_allocate_and_deallocate_round_trip_on_symmetric_links(backend):
+    allocator = backend({'capacity_matrix': [[0, 10, 0], [10, 0, 8], [0, 8, 0]], 'demands': []})
+    original = np.array(allocator.capacity_matrix, copy=True)
+    operations = [([1, 0], 4), ([0, 1, 2], 6), ([2, 1], 2)]
+    for path, bandwidth in operations:
+        assert allocator.can_allocate_path(path, bandwidth)
+        allocator.allocate_path(path, bandwidth)
+    assert (_capacity(allocator, 0, 1), _capacity(allocator, 1, 2)) == (0, 0)
+    for path, bandwidth in reversed(operations):
+        allocator.deallocate_path(path, bandwidth)
+    np.testing.assert_array_equal(allocator.capacity_matrix, original)
+
+
+@pytest.mark.parametrize('backend', BACKENDS)
+def test_one_way_links_leave_the_missing_direction_alone(backend):
+    allocator = backend({'capacity_matrix': [[0, 10], [0, 0]], 'demands': []})
+    allocator.allocate_path([0, 1], 7)
+    assert _capacity(allocator, 0, 1) == 3
+    if allocator.capacity_matrix.ndim == 2:
+        assert allocator.capacity_matrix[1, 0] == 0
+    else:
+        assert allocator.edge_id(1, 0) < 0
+
+
+def test_blank_and_invalid_cells_become_zero_capacity():
+    allocator = VirtualNetworkAllocation({
+        'capacity_matrix': [["", "5", None], ["abc", 0, "3"], [5, 0, 0]],
+        'demands': []
+    })
+    np.testing.assert_array_equal(allocator.capacity_matrix, [[0, 5, 0], [0, 0, 3], [5, 0, 0]])
+
+
+@pytest.mark.parametrize('raw', [
+    [[0, float('inf'), None], [float('nan'), 0, 1], [0, 0, 0]],
+    np.array([[0, np.inf, 0], [np.nan, 0, 1], [0, 0, 0]]),
+])
+def test_non_finite_cells_are_kept_as_given(raw):
+    allocator = VirtualNetworkAllocation({'capacity_matrix': raw, 'demands': []})
+    np.testing.assert_array_equal(allocator.original_capacity_matrix,
+                                  [[0, np.inf, 0], [np.nan, 0, 1], [0, 0, 0]])
+
+
+def test_edge_list_matches_the_equivalent_matrix():
+    matrix = [[0, 10, 0], [10, 0, 4], [0, 6, 0]]
+    edges = [(0, 1, 10), (1, 0, 10), (1, 2, 4), (2, 1, 6)]
+    from_matrix = VirtualNetworkAllocation({'capacity_matrix': matrix, 'demands': []})
+    from_edges = VirtualNetworkAllocation({'edges': edges, 'num_nodes': 3, 'demands': []})
+    np.testing.assert_array_equal(from_edges.capacity_matrix, from_matrix.capacity_matrix)
+    np.testing.assert_array_equal(from_edges.adjacency_matrix, from_matrix.adjacency_matrix)
+
+
+def test_non_square_matrix_is_rejected():
+    with pytest.raises(ValueError):
+        VirtualNetworkAllocation({'capacity_matrix': [[0, 1, 2], [1, 0, 2]], 'demands': []})
+
+
+def test_residual_capacities_are_copied_on_first_write():
+    matrix = np.array([[0, 10], [10, 0]], dtype=float)
+    allocator = VirtualNetworkAllocation({'capacity_matrix': matrix, 'demands': []})
+    # The caller's array is copied and stays writable
+    assert not np.shares_memory(allocator.original_capacity_matrix, matrix)
+    assert matrix.flags.writeable
+    assert allocator.capacity_matrix is allocator.original_capacity_matrix
+    assert not allocator.original_capacity_matrix.flags.writeable
+
+    allocator.allocate_path([0, 1], 4)
+    assert allocator.capacity_matrix is not allocator.original_capacity_matrix
+    np.testing.assert_array_equal(allocator.capacity_matrix, [[0, 6], [6, 0]])
+    np.testing.assert_array_equal(matrix, [[0, 10], [10, 0]])
+
+    allocator.reset_network()
+    np.testing.assert_array_equal(allocator.capacity_matrix, matrix)
+    allocator.allocate_path([1, 0], 3)
+    np.testing.assert_array_equal(matrix, [[0, 10], [10, 0]])
+
+    # Later edits by the caller do not change the original capacities
+    matrix[0, 1] = 99
+    assert allocator.original_capacity_matrix[0, 1] == 10
+
+
+@pytest.mark.parametrize('backend', BACKENDS)
+def test_components_are_labelled_ignoring_link_direction(backend):
+    edges = [(0, 1, 10), (2, 1, 5), (3, 4, 10), (4, 3, 10)]
+    allocator = backend({'edges': edges, 'num_nodes': 6, 'demands': []})
+    np.testing.assert_array_equal(allocator.component_labels, [0, 0, 0, 1, 1, 2])
+    np.testing.assert_array_equal(allocator.component_sizes, [3, 2, 1])
+    assert allocator.num_components == 3
+    assert not allocator.network_connected
+    assert allocator.is_reachable(0, 2) and not allocator.is_reachable(2, 3)
+    assert allocator.find_shortest_path(0, 4) is None
+
+
+@pytest.mark.parametrize('backend', BACKENDS)
+def test_unreachable_demands_skip_the_path_search(backend, monkeypatch):
+    edges = [(0, 1, 10), (1, 0, 10), (2, 3, 10), (3, 2, 10)]
+    allocator = backend({'edges': edges, 'num_nodes': 4, 'demands': [[0, 1, 4], [1, 2, 4], [3, 2, 4]]})
+    searched = []
+    find_all_paths = allocator.find_all_paths
+    monkeypatch.setattr(allocator, 'find_all_paths',
+                        lambda source, destination: searched.append((source, destination))
+                        or find_all_paths(source, destination))
+    result = allocator.offline_brute_force_allocation(use_tree_solver=False)
+    assert searched == [(0, 1), (3, 2)]
+    assert [k for k, _ in result['allocated_demands']] == [0, 2]
+    assert result['rejected_demands'] == [1]
+
+
+def test_connectivity_check_handles_long_chains():
+    n = 5000
+    edges = [(u, u + 1, 10) for u in range(n - 1)] + [(u + 1, u, 10) for u in range(n - 1)]
+    allocator = SparseVirtualNetworkAllocation({'edges': edges, 'num_nodes': n, 'demands': []})
+    assert allocator.num_components == 1
+    assert allocator.network_connected
@@ -0,0 +1,37 @@
+import numpy as np
+
+from Allocation.allocation import VirtualNetworkAllocation
+from Allocation.batching import commit_batch, solve_batch
+
+LINKS = [(0, 1), (0, 3), (3, 4), (4, 1), (2, 0), (2, 7), (7, 8), (8, 9), (9, 10), (10, 1)]
+
+
+def _network():
+    edges = [(u, v, 10) for a, b in LINKS for u, v in ((a, b), (b, a))]
+    return VirtualNetworkAllocation({'edges': edges, 'num_nodes': 11, 'demands': []})
+
+
+def test_equal_revenue_is_broken_by_lower_cost():
+    # Greedy puts the first request on 0-1 and pushes the second onto a 5-hop
+    # detour; moving the first to 0-3-4-1 frees 2-0-1 for the same revenue
+    result = solve_batch(_network(), [(0, 1, 10, 11.0), (2, 1, 10, 9.0)])
+
+    assert result['exact']
+    assert result['revenue'] == 20.0
+    assert result['paths'] == [[0, 3, 4, 1], [2, 0, 1]]
+
+
+def test_requests_on_disjoint_links_are_all_accepted():
+    allocator = VirtualNetworkAllocation({'capacity_matrix': [[0, 10, 10], [10, 0, 10], [10, 10, 0]],
+                                          'demands': []})
+    result = solve_batch(allocator, [(0, 1, 10, 5.0), (0, 2, 10, 4.0), (2, 1, 10, 4.0)])
+    assert result['accepted'] == 3
+
+
+def test_commit_is_all_or_nothing():
+    allocator = _network()
+    before = allocator.capacity_matrix.copy()
+
+    assert not commit_batch(allocator, [10, 10], [[0, 1], [2, 0, 1]])
+    np.testing.assert_array_equal(allocator.capacity_matrix, before)
+    assert commit_batch(allocator, [10, 10], [[0, 3, 4, 1], [2, 0, 1]])
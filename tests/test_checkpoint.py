@@ -0,0 +1,81 @@
+import json
+import os
+
+import pytest
+
+from Allocation.allocation import VirtualNetworkAllocation
+from Allocation.checkpoint import read_checkpoint, search_fingerprint, write_checkpoint
+from Allocation.sparse_allocation import SparseVirtualNetworkAllocation
+
+BACKENDS = [VirtualNetworkAllocation, SparseVirtualNetworkAllocation]
+
+
+def _ring():
+    edges = []
+    for u in range(5):
+        v = (u + 1) % 5
+        edges += [(u, v, 10), (v, u, 10)]
+    edges += [(0, 2, 6), (2, 0, 6)]
+    return {'edges': edges, 'num_nodes': 5, 'demands': [[0, 2, 5], [1, 3, 4], [4, 2, 6], [3, 0, 3]]}
+
+
+class Interrupted(Exception):
+    pass
+
+
+def _interrupt_after(allocator, monkeypatch, calls):
+    evaluate = allocator.evaluate_allocation_scenario
+    count = [0]
+
+    def limited(scenario):
+        count[0] += 1
+        if count[0] > calls:
+            raise Interrupted
+        return evaluate(scenario)
+
+    monkeypatch.setattr(allocator, 'evaluate_allocation_scenario', limited)
+    return count
+
+
+@pytest.mark.parametrize('backend', BACKENDS)
+def test_resumed_search_matches_an_uninterrupted_run(backend, tmp_path, monkeypatch):
+    path = str(tmp_path / 'search.json')
+    expected = backend(_ring()).offline_brute_force_allocation(use_tree_solver=False, decompose=False)
+
+    interrupted = backend(_ring())
+    _interrupt_after(interrupted, monkeypatch, 35)
+    with pytest.raises(Interrupted):
+        interrupted.offline_brute_force_allocation(use_tree_solver=False, checkpoint_path=path,
+                                                   checkpoint_every=10)
+    with open(path) as f:
+        assert json.load(f)['total_combinations'] == 30
+    assert os.listdir(tmp_path) == ['search.json']
+
+    resumed = backend(_ring())
+    count = _interrupt_after(resumed, monkeypatch, 10 ** 6)
+    result = resumed.offline_brute_force_allocation(use_tree_solver=False, checkpoint_path=path,
+                                                    checkpoint_every=10)
+    for key in ('allocated_demands', 'rejected_demands', 'total_revenue', 'total_cost',
+                'total_combinations_evaluated', 'valid_combinations'):
+        assert result[key] == expected[key]
+    # Only the combinations after the checkpoint (plus the saved best scenario) are evaluated again
+    assert count[0] == expected['total_combinations_evaluated'] - 30 + 1
+    assert not os.path.exists(path)
+
+
+def test_checkpoint_of_another_search_is_rejected(tmp_path):
+    path = str(tmp_path / 'search.json')
+    allocator = VirtualNetworkAllocation(_ring())
+    write_checkpoint(path, {'fingerprint': search_fingerprint(allocator, None), 'total_combinations': 10,
+                            'valid_combinations': 4, 'best_scenario': None})
+    assert read_checkpoint(path, search_fingerprint(allocator, None))['total_combinations'] == 10
+    assert read_checkpoint(str(tmp_path / 'missing.json'), 'x') is None
+
+    other = _ring()
+    other['demands'][0][2] = 4
+    with pytest.raises(ValueError):
+        VirtualNetworkAllocation(other).offline_brute_force_allocation(use_tree_solver=False, checkpoint_path=path)
+    with pytest.raises(ValueError):
+        read_checkpoint(path, search_fingerprint(allocator, 2))
+    assert search_fingerprint(allocator, None) != search_fingerprint(SparseVirtualNetworkAllocation(_ring()), None)
+    assert os.path.exists(path)
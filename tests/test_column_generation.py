@@ -0,0 +1,88 @@
+import random
+
+import numpy as np
+import pytest
+
+pytest.importorskip('scipy')
+
+from Allocation.allocation import VirtualNetworkAllocation
+from Allocation.column_generation import column_generation_allocation
+from Allocation.sparse_allocation import SparseVirtualNetworkAllocation
+
+BACKENDS = [VirtualNetworkAllocation, SparseVirtualNetworkAllocation]
+
+
+def _random_network(seed):
+    rng = random.Random(seed)
+    n = rng.randint(4, 6)
+    edges = []
+    for u in range(n):
+        for v in range(u + 1, n):
+            if rng.random() < 0.5:
+                capacity = rng.choice([5, 10, 20])
+                edges += [(u, v, capacity), (v, u, capacity)]
+    demands = [rng.sample(range(n), 2) + [rng.choice([3, 5, 8])] for _ in range(rng.randint(2, 5))]
+    return {'edges': edges, 'num_nodes': n, 'demands': demands}
+
+
+@pytest.mark.parametrize('backend', BACKENDS)
+@pytest.mark.parametrize('seed', range(15))
+def test_chosen_paths_fit_and_never_beat_the_brute_force(backend, seed):
+    network = _random_network(seed)
+    allocator = backend(network)
+    result = column_generation_allocation(allocator, commit=False)
+    optimum = backend(network).offline_brute_force_allocation(use_tree_solver=False)
+
+    replay = backend(network)
+    for k, path in result['allocated_demands']:
+        demand = replay.demands[k]
+        assert path[0] == demand.source and path[-1] == demand.destination
+        assert replay.can_allocate_path(path, demand.bandwidth)
+        replay.allocate_path(path, demand.bandwidth)
+    accepted = len(result['allocated_demands'])
+    assert accepted <= len(optimum.get('allocated_demands', []))
+    assert result['lp_bound'] >= accepted - 1e-6
+    assert sorted(result['rejected_demands'] + [k for k, _ in result['allocated_demands']]) == \
+        list(range(len(allocator.demands)))
+
+
+@pytest.mark.parametrize('backend', BACKENDS)
+def test_pricing_finds_the_detour(backend):
+    # The direct link only fits one of the two demands; the other needs 0-2-1
+    capacity = [[0, 6, 10], [6, 0, 10], [10, 10, 0]]
+    allocator = backend({'capacity_matrix': capacity, 'demands': [[0, 1, 5], [0, 1, 5]]})
+    result = column_generation_allocation(allocator, initial_paths=1)
+    assert sorted(path for _, path in result['allocated_demands']) == [[0, 1], [0, 2, 1]]
+
+
+@pytest.mark.parametrize('backend', BACKENDS)
+def test_commit_reserves_the_chosen_paths(backend):
+    network = {'capacity_matrix': [[0, 10, 0], [10, 0, 10], [0, 10, 0]],
+               'demands': [[0, 2, 4], [1, 2, 3]]}
+    untouched = backend(network)
+    column_generation_allocation(untouched, commit=False)
+    np.testing.assert_array_equal(untouched.capacity_matrix, untouched.original_capacity_matrix)
+    assert untouched.allocation_paths == {}
+
+    allocator = backend(network)
+    result = column_generation_allocation(allocator)
+    assert allocator.allocation_paths == {0: [0, 1, 2], 1: [1, 2]}
+    replay = backend(network)
+    for k, path in result['allocated_demands']:
+        replay.allocate_path(path, replay.demands[k].bandwidth)
+    np.testing.assert_array_equal(allocator.capacity_matrix, replay.capacity_matrix)
+    assert allocator.current_revenue == result['total_revenue'] == 7
+
+    # The brute force credits the same scenario with the same revenue
+    brute_force = backend(network).offline_brute_force_allocation(use_tree_solver=False)
+    assert brute_force['allocated_demands'] == result['allocated_demands']
+    assert brute_force['total_revenue'] == result['total_revenue']
+    assert brute_force['revenue_cost_ratio'] == result['revenue_cost_ratio'] == 7 / 11
+
+
+def test_revenue_objective_prefers_the_better_paying_demand():
+    network = {'capacity_matrix': [[0, 10], [10, 0]],
+               'demands': [[0, 1, 6, 1, 1.0], [0, 1, 5, 1, 5.0]]}
+    result = column_generation_allocation(VirtualNetworkAllocation(network), objective='revenue')
+    assert [k for k, _ in result['allocated_demands']] == [1]
+    assert result['total_revenue'] == 25
@@ -0,0 +1,90 @@
+import random
+
+import pytest
+
+import Allocation.decomposition as decomposition
+from Allocation.allocation import VirtualNetworkAllocation
+from Allocation.decomposition import conflict_components
+from Allocation.sparse_allocation import SparseVirtualNetworkAllocation
+
+
+def _random_network(seed):
+    rng = random.Random(seed)
+    n = rng.randint(4, 7)
+    edges = []
+    for u in range(n):
+        for v in range(u + 1, n):
+            if rng.random() < 0.3:
+                capacity = rng.choice([5, 10, 20])
+                edges += [(u, v, capacity), (v, u, capacity)]
+    demands = [rng.sample(range(n), 2) + [rng.choice([3, 5, 8])] for _ in range(rng.randint(2, 5))]
+    return {'edges': edges, 'num_nodes': n, 'demands': demands}
+
+
+def _three_rings():
+    edges, demands = [], []
+    for base in (0, 4, 8):
+        ring = [base, base + 1, base + 2, base + 3]
+        for u, v in zip(ring, ring[1:] + ring[:1]):
+            edges += [(u, v, 10), (v, u, 10)]
+        edges += [(base, base + 2, 10), (base + 2, base, 10)]
+        demands += [[base + s, base + d, 4] for s, d in ((0, 1), (1, 3), (2, 3), (0, 3), (1, 2))]
+    return {'edges': edges, 'num_nodes': 12, 'demands': demands}
+
+
+def _solve(backend, network, **options):
+    allocator = backend(network)
+    result = allocator.offline_brute_force_allocation(use_tree_solver=False, **options)
+    return allocator, result
+
+
+def test_conflict_components_join_demands_through_shared_links():
+    demand_paths = [
+        (0, [[0, 1, 2]]),
+        (1, [[3, 4]]),
+        (2, [[2, 1]]),            # reverse direction of a link of demand 0
+        (3, [[5, 6], [5, 7, 6]]),
+        (4, [[4, 8]]),
+    ]
+    groups = [[k for k, _ in group] for group in conflict_components(demand_paths)]
+    assert groups == [[0, 2], [1], [3], [4]]
+
+
+@pytest.mark.parametrize('backend', [VirtualNetworkAllocation, SparseVirtualNetworkAllocation])
+@pytest.mark.parametrize('seed', range(40))
+def test_decomposition_matches_the_full_brute_force(backend, seed):
+    network = _random_network(seed)
+    full_allocator, full = _solve(backend, network, decompose=False)
+    split_allocator, split = _solve(backend, network)
+
+    assert split.get('allocated_demands') == full.get('allocated_demands')
+    assert split.get('total_revenue') == full.get('total_revenue')
+    assert split_allocator.capacity_matrix.tolist() == full_allocator.capacity_matrix.tolist()
+
+
+def test_components_are_reported_and_searched_as_a_sum():
+    _, result = _solve(VirtualNetworkAllocation, _three_rings())
+    components = result['components']
+
+    assert [row['demands'] for row in components] == [[0, 1, 2, 3, 4], [5, 6, 7, 8, 9], [10, 11, 12, 13, 14]]
+    assert result['total_combinations_evaluated'] == sum(row['search_space'] for row in components)
+    assert result['acceptance_ratio'] == 1.0
+
+
+def test_worker_pool_gives_the_same_scenario(monkeypatch):
+    monkeypatch.setattr(decomposition, 'PARALLEL_MIN_COMBINATIONS', 100)
+    allocator, sequential = _solve(SparseVirtualNetworkAllocation, _three_rings())
+    pooled_allocator, pooled = _solve(SparseVirtualNetworkAllocation, _three_rings(), processes=2)
+
+    assert pooled['allocated_demands'] == sequential['allocated_demands']
+    assert pooled_allocator.capacity_matrix.tolist() == allocator.capacity_matrix.tolist()
+
+
+def test_default_runs_without_worker_processes(monkeypatch):
+    def no_pool(*args, **kwargs):
+        raise AssertionError("no se esperaba un pool de procesos")
+
+    monkeypatch.setattr(decomposition, 'PARALLEL_MIN_COMBINATIONS', 100)
+    monkeypatch.setattr(decomposition, 'ProcessPoolExecutor', no_pool)
+    _, result = _solve(VirtualNetworkAllocation, _three_rings())
+    assert len(result['components']) == 3
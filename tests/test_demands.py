@@ -0,0 +1,76 @@
+import numpy as np
+import pytest
+
+from Allocation.allocation import VirtualNetworkAllocation
+from Allocation.demands import DEFAULT_DURATION, DEFAULT_PRICE_PER_UNIT, DemandTable
+from Allocation.result import AllocationResult
+
+
+def test_rows_fill_defaults_and_skip_incomplete_entries():
+    table = DemandTable.from_rows([[0, 2, 5], [1, 0], [2, 1, 3.5]])
+    assert len(table) == 2
+    np.testing.assert_array_equal(table.as_array(), [[0, 2, 5, DEFAULT_DURATION, DEFAULT_PRICE_PER_UNIT],
+                                                     [2, 1, 3.5, DEFAULT_DURATION, DEFAULT_PRICE_PER_UNIT]])
+    assert len(DemandTable.from_rows([])) == 0
+    assert len(DemandTable.from_rows([[0, 1]])) == 0
+
+
+def test_five_column_rows_round_trip():
+    rows = [[0, 2, 5, 3, 1.5], [1, 0, 2, 1, 4.0]]
+    table = DemandTable.from_rows(rows)
+    np.testing.assert_array_equal(table.as_array(), rows)
+    np.testing.assert_array_equal(DemandTable.from_columns(table.as_array()).records, table.records)
+
+
+def test_mixed_length_rows_keep_their_own_duration_and_price():
+    table = DemandTable.from_rows([[0, 2, 5, 3, 1.5], [1, 0, 2], [2, 1, 4, 6], [1]])
+    np.testing.assert_array_equal(table.as_array(), [[0, 2, 5, 3, 1.5],
+                                                     [1, 0, 2, DEFAULT_DURATION, DEFAULT_PRICE_PER_UNIT],
+                                                     [2, 1, 4, 6, DEFAULT_PRICE_PER_UNIT]])
+
+
+def test_demand_views_behave_like_the_former_dicts():
+    table = DemandTable.from_rows([[0, 2, 5, 3, 1.5], [1, 0, 2]])
+    demand = table[0]
+    assert demand['source'] == 0 and demand.destination == 2
+    assert demand.get('bandwidth') == 5.0 and demand.get('missing', 7) == 7
+    assert demand == {'source': 0, 'destination': 2, 'bandwidth': 5.0, 'duration': 3, 'price_per_unit': 1.5}
+    assert table[-1] == table[1] and table[1] != table[0]
+    assert [d.index for d in table] == [0, 1]
+    with pytest.raises(KeyError):
+        demand['path']
+    with pytest.raises(IndexError):
+        table[2]
+
+    allocator = VirtualNetworkAllocation({'capacity_matrix': [[0, 1], [1, 0]], 'demands': []})
+    assert allocator.calculate_revenue(demand) == 5.0 * 3 * 1.5
+
+
+def test_result_details_are_built_once_on_first_access():
+    allocator = VirtualNetworkAllocation({
+        'capacity_matrix': [[0, 10, 0], [10, 0, 10], [0, 10, 0]],
+        'demands': [[0, 2, 4], [1, 2, 3]]
+    })
+    calls = []
+    cost = allocator.calculate_path_cost
+    allocator.calculate_path_cost = lambda path, bandwidth: calls.append(path) or cost(path, bandwidth)
+    result = AllocationResult({'success': True, 'allocated_demands': [(0, [0, 1, 2])]},
+                              allocator, [(0, [0, 1, 2])])
+
+    assert result['success'] and result.get('missing') is None
+    assert calls == []
+    details = result['allocation_details']
+    assert details == [{'demand_index': 0, 'source': 0, 'destination': 2, 'bandwidth': 4.0,
+                        'path': [0, 1, 2], 'path_length': 2, 'cost': 8.0, 'revenue': 4.0}]
+    assert result.allocation_details is details
+    assert len(calls) == 1
+    assert list(result) == ['success', 'allocated_demands', 'allocation_details']
+    assert result.to_dict() == {'success': True, 'allocated_demands': [(0, [0, 1, 2])],
+                                'allocation_details': details}
+
+
+def test_result_keeps_details_given_by_the_caller():
+    details = [{'demand_index': 0, 'cost': 1, 'revenue': 2}]
+    result = AllocationResult({'success': True, 'allocation_details': details})
+    assert result['allocation_details'] is details
+    assert len(result) == 2
@@ -0,0 +1,67 @@
+import numpy as np
+import pytest
+
+from Allocation.allocation import VirtualNetworkAllocation
+from Allocation.embedding import VirtualNetworkEmbedder
+from Allocation.sparse_allocation import SparseVirtualNetworkAllocation
+
+BACKENDS = [VirtualNetworkAllocation, SparseVirtualNetworkAllocation]
+
+SQUARE = [[0, 10, 0, 10], [10, 0, 10, 0], [0, 10, 0, 10], [10, 0, 10, 0]]
+
+
+def test_virtual_nodes_are_placed_on_distinct_substrate_nodes():
+    allocator = VirtualNetworkAllocation({'capacity_matrix': SQUARE, 'demands': []})
+    embedder = VirtualNetworkEmbedder(allocator, [4, 4, 4, 4])
+    result = embedder.embed({'cpu': [2, 2, 2], 'links': [(0, 1, 5), (1, 2, 5)]})
+
+    assert result['success']
+    mapping = result['node_mapping']
+    assert len(set(mapping.values())) == 3
+    for index, (u, v, _) in enumerate([(0, 1, 5), (1, 2, 5)]):
+        path = result['link_paths'][index]
+        assert (path[0], path[-1]) == (mapping[u], mapping[v])
+
+
+def test_request_that_does_not_fit_leaves_the_substrate_unchanged():
+    allocator = VirtualNetworkAllocation({'capacity_matrix': SQUARE, 'demands': []})
+    embedder = VirtualNetworkEmbedder(allocator, [4, 4, 4, 4])
+    result = embedder.embed({'cpu': [3, 3, 3, 3, 3], 'links': []})
+
+    assert not result['success']
+    np.testing.assert_array_equal(embedder.node_cpu, [4, 4, 4, 4])
+    np.testing.assert_array_equal(allocator.capacity_matrix, SQUARE)
+
+
+def test_release_returns_cpu_and_bandwidth():
+    allocator = VirtualNetworkAllocation({'capacity_matrix': SQUARE, 'demands': []})
+    embedder = VirtualNetworkEmbedder(allocator, [4, 4, 4, 4])
+    result = embedder.embed({'cpu': [1, 1], 'links': [(0, 1, 6)]})
+    embedder.release(result['embedding_id'])
+
+    np.testing.assert_array_equal(embedder.node_cpu, [4, 4, 4, 4])
+    np.testing.assert_array_equal(allocator.capacity_matrix, SQUARE)
+
+
+@pytest.mark.parametrize('backend', BACKENDS)
+def test_nodes_reached_only_by_incoming_links_are_candidates(backend):
+    # Node 2 sends 2 but receives 20: it can host the end of a 5 Mbps virtual link
+    allocator = backend({'edges': [(0, 2, 10), (1, 2, 10), (2, 0, 2)], 'num_nodes': 3, 'demands': []})
+    embedder = VirtualNetworkEmbedder(allocator, [1, 1, 5])
+    result = embedder.embed({'cpu': [3, 1], 'links': [(1, 0, 5)]})
+    assert result['success']
+    assert result['node_mapping'][0] == 2
+    assert result['link_paths'][0][-1] == 2
+
+
+@pytest.mark.parametrize('backend', BACKENDS)
+def test_backtracking_restores_asymmetric_residual_capacities(backend):
+    allocator = backend({'edges': [(0, 1, 10), (1, 0, 4), (1, 2, 4)], 'num_nodes': 3, 'demands': []})
+    # 1 -> 0 is used up, so routing 0 -> 1 leaves it alone; releasing would add to it
+    allocator.allocate_path([1, 0], 4)
+    before = np.array(allocator.capacity_matrix, copy=True)
+
+    embedder = VirtualNetworkEmbedder(allocator, [3, 2, 1])
+    result = embedder.embed({'cpu': [3, 2, 1], 'links': [(0, 1, 5), (1, 2, 5)]})
+    assert not result['success'] and result['backtracks'] > 0
+    np.testing.assert_array_equal(allocator.capacity_matrix, before)
@@ -0,0 +1,61 @@
+import numpy as np
+import pytest
+
+from Allocation.allocation import VirtualNetworkAllocation
+from Allocation.failure_sweep import failure_sweep, network_links
+from Allocation.sparse_allocation import SparseVirtualNetworkAllocation
+
+BACKENDS = [VirtualNetworkAllocation, SparseVirtualNetworkAllocation]
+
+
+def _allocated(backend):
+    # Ring 0-1-2-3 plus node 4 hanging from node 1
+    edges = []
+    for u, v in ((0, 1), (1, 2), (2, 3), (3, 0), (1, 4)):
+        edges += [(u, v, 10), (v, u, 10)]
+    allocator = backend({'edges': edges, 'num_nodes': 5, 'demands': [[0, 1, 4], [4, 1, 3], [2, 3, 5]]})
+    for demand_idx, path in ((0, [0, 1]), (1, [4, 1]), (2, [2, 3])):
+        allocator.allocate_path(path, allocator.demands[demand_idx].bandwidth)
+        allocator.allocation_paths[demand_idx] = path
+    return allocator
+
+
+@pytest.mark.parametrize('backend', BACKENDS)
+def test_failures_reroute_or_lose_the_affected_demands(backend):
+    allocator = _allocated(backend)
+    residual = np.array(allocator.capacity_matrix)
+    paths = dict(allocator.allocation_paths)
+
+    sweep = failure_sweep(allocator, processes=1)
+    assert network_links(allocator) == [(0, 1), (0, 3), (1, 2), (1, 4), (2, 3)]
+    impacts = {row['links'][0]: row for row in sweep['impacts']}
+    assert sweep['baseline_acceptance_ratio'] == 1
+
+    # 0-1 fails: demand 0 moves to 0-3-2-1, which still has room next to demand 2
+    assert impacts[(0, 1)]['rerouted_demands'] == 1 and impacts[(0, 1)]['extra_hops'] == 2
+    # 1-4 is a bridge: demand 1 is lost
+    assert impacts[(1, 4)]['lost_demands'] == 1 and impacts[(1, 4)]['revenue_lost'] == 3
+    assert impacts[(1, 4)]['acceptance_ratio'] == 2 / 3
+    # 2-3 fails: demand 2 moves to 2-1-0-3 over the 6 left next to demand 0
+    assert impacts[(2, 3)]['rerouted_demands'] == 1 and impacts[(2, 3)]['lost_demands'] == 0
+    assert impacts[(1, 2)]['affected_demands'] == 0
+    assert sweep['impacts'][0]['links'] == [(1, 4)]
+
+    np.testing.assert_array_equal(allocator.capacity_matrix, residual)
+    assert allocator.allocation_paths == paths
+
+
+@pytest.mark.parametrize('backend', BACKENDS)
+def test_shared_risk_groups_fail_together(backend):
+    allocator = _allocated(backend)
+    row, = failure_sweep(allocator, scenarios=[[(0, 1), (3, 2)]], processes=1)['impacts']
+    assert row['links'] == [(0, 1), (3, 2)]
+    assert row['affected_demands'] == 2 and row['lost_demands'] == 2
+
+
+@pytest.mark.parametrize('backend', BACKENDS)
+def test_pool_matches_the_sequential_sweep(backend):
+    allocator = _allocated(backend)
+    sequential = failure_sweep(allocator, processes=1)
+    pooled = failure_sweep(allocator, processes=2, chunksize=1)
+    assert pooled == sequential
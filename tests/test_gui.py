@@ -0,0 +1,142 @@
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+
+tk = pytest.importorskip('tkinter')
+
+from GUI.virtual_grid import VirtualGrid
+
+
+@pytest.fixture
+def root():
+    try:
+        window = tk.Tk()
+    except tk.TclError:
+        pytest.skip("No hay display disponible para Tk")
+    window.geometry('400x200')
+    yield window
+    window.destroy()
+
+
+def _grid(root, model, **options):
+    grid = VirtualGrid(root, model, height=160, **options)
+    grid.pack(fill='both', expand=True)
+    root.update()
+    return grid
+
+
+def _click(grid, row, col):
+    grid._on_click(SimpleNamespace(x=grid.header_width + col * grid.cell_width + 5,
+                                   y=(row + 1) * grid.cell_height + 5))
+
+
+def test_grid_only_draws_the_visible_cells(root):
+    grid = _grid(root, np.zeros((1000, 1000)))
+    _, _, rows, cols = grid._visible_range()
+    assert 0 < len(rows) < 20 and 0 < len(cols) < 20
+    # Two items per cell plus the headers, independent of the model size
+    assert len(grid.canvas.find_all()) <= 2 * (len(rows) + 1) * (len(cols) + 1) + 2
+
+    grid._yview('moveto', 0.5)
+    root.update()
+    _, _, rows, _ = grid._visible_range()
+    assert rows.start >= 490
+    assert len(grid.canvas.find_all()) <= 2 * (len(rows) + 1) * (len(cols) + 1) + 2
+
+
+def test_check_cells_toggle_the_model(root):
+    changes = []
+    model = np.zeros((3, 3), dtype=np.int8)
+    grid = _grid(root, model, kinds='check', disabled=lambda i, j: i == j,
+                 on_change=lambda *change: changes.append(change))
+    _click(grid, 1, 2)
+    _click(grid, 1, 1)
+    assert model[1, 2] == 1 and model[1, 1] == 0
+    _click(grid, 1, 2)
+    assert model[1, 2] == 0
+    assert changes == [(1, 2, 1), (1, 2, 0)]
+
+
+def test_entry_editor_writes_numbers_back_to_the_model(root):
+    model = np.zeros((2, 2))
+    grid = _grid(root, model)
+    for text, expected in (('7.5', 7.5), ('abc', 7.5), ('', 0.0)):
+        grid._open_editor(0, 1)
+        grid._editor.delete(0, 'end')
+        grid._editor.insert(0, text)
+        grid._close_editor(commit=True)
+        assert model[0, 1] == expected
+        assert grid._editor is None
+
+    grid._open_editor(1, 0)
+    grid._editor.insert(0, '9')
+    grid._close_editor(commit=False)
+    assert model[1, 0] == 0
+
+
+@pytest.fixture
+def app(root, monkeypatch):
+    from Allocation.result_cache import ResultCache
+    from GUI import gui
+    monkeypatch.setattr(gui, 'ResultCache', lambda: ResultCache(':memory:'))
+    app = gui.VirtualNetworkUI(root)
+    app.num_nodes.set(4)
+    app.update_matrices()
+    for i in range(4):
+        j = (i + 1) % 4
+        app.adjacency_matrix[i, j] = app.adjacency_matrix[j, i] = 1
+        app.capacity_matrix[i, j] = app.capacity_matrix[j, i] = 10
+    app.redraw_visualization()
+    return app
+
+
+def _edge_ids(app):
+    return {key: (items['line'], items['box'], items['text']) for key, items in app._edge_items.items()}
+
+
+def test_capacity_change_updates_only_its_edge(app):
+    ids = _edge_ids(app)
+    specs = {key: items['spec'] for key, items in app._edge_items.items()}
+    node_ids = {i: (items['oval'], items['label']) for i, items in app._node_items.items()}
+    canvas_items = set(app.viz_canvas.find_all())
+    assert len(ids) == 8
+
+    app.capacity_matrix[0, 1] = 3
+    app.redraw_visualization()
+    assert _edge_ids(app) == ids
+    assert {i: (items['oval'], items['label']) for i, items in app._node_items.items()} == node_ids
+    assert set(app.viz_canvas.find_all()) == canvas_items
+    changed = [key for key, items in app._edge_items.items() if items['spec'] != specs[key]]
+    assert changed == [(0, 1)]
+    assert app.viz_canvas.itemcget(ids[(0, 1)][0], 'fill') == 'red'
+
+
+def test_removed_links_and_nodes_delete_their_items(app):
+    ids = _edge_ids(app)
+    app.adjacency_matrix[2, 3] = 0
+    app.redraw_visualization()
+    assert (2, 3) not in app._edge_items
+    remaining = set(app.viz_canvas.find_all())
+    assert not remaining & set(ids[(2, 3)])
+    assert all(_edge_ids(app)[key] == ids[key] for key in app._edge_items)
+
+    app.num_nodes.set(3)
+    app.update_matrices()
+    app.redraw_visualization()
+    assert sorted(app._node_items) == [0, 1, 2]
+    assert sorted(app._edge_items) == [(0, 1), (1, 0), (1, 2), (2, 1)]
+
+
+def test_redraw_requests_are_coalesced(app, root):
+    root.update()
+    calls = []
+    redraw = app.redraw_visualization
+    app.redraw_visualization = lambda: calls.append(1) or redraw()
+    for _ in range(100):
+        app.update_visualization()
+    root.update()
+    assert calls == [1]
+    app.update_visualization()
+    root.update()
+    assert calls == [1, 1]
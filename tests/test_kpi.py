@@ -0,0 +1,77 @@
+import numpy as np
+import pytest
+
+from KPIs import kpi
+
+
+def _results():
+    return [
+        {'allocated_demands': [(0, [0, 1]), (1, [1, 2])], 'rejected_demands': [2],
+         'allocation_details': [{'revenue': 4, 'cost': 2}, {'revenue': 6, 'cost': 3}],
+         'total_combinations_evaluated': 9, 'valid_combinations': 5},
+        {'allocated_demands': [], 'rejected_demands': [0, 1],
+         'allocation_details': []},
+        {'allocated_demands': [(0, [0, 2])], 'rejected_demands': [],
+         'allocation_details': [{'revenue': 8, 'cost': 8}],
+         'total_combinations_evaluated': 3, 'valid_combinations': 3},
+    ]
+
+
+def test_columns_match_the_scalar_kpis():
+    results = _results()
+    kpis = kpi.compute_kpis(kpi.results_to_columns(results), revenue_per_mbps=10.0, cost_per_mbps=2.0)
+    assert set(kpis) == set(kpi.KPI_COLUMNS)
+    for i, result in enumerate(results):
+        details = result['allocation_details']
+        revenue = kpi.total_revenue(details, 10.0)
+        cost = kpi.total_cost(details, 2.0)
+        total = len(result['allocated_demands']) + len(result['rejected_demands'])
+        assert kpis['acceptance_ratio'][i] == kpi.acceptance_ratio(result['allocated_demands'], total)
+        assert kpis['revenue_cost_ratio'][i] == kpi.revenue_cost_ratio(revenue, cost)
+        assert kpis['total_revenue'][i] == revenue and kpis['total_cost'][i] == cost
+        assert kpis['num_assigned'][i] == kpi.num_demands_assigned(result['allocated_demands'])
+        assert kpis['num_rejected'][i] == kpi.num_demands_rejected(result['rejected_demands'])
+        np.testing.assert_array_equal(kpis['total_combinations'][i], kpi.total_combinations_evaluated(result))
+        np.testing.assert_array_equal(kpis['valid_combinations'][i], kpi.valid_combinations(result))
+
+    # Zero denominators give 0 instead of a warning or NaN
+    assert kpis['acceptance_ratio'][1] == 0 and kpis['revenue_cost_ratio'][1] == 0
+    assert np.isnan(kpis['total_combinations'][1])
+
+
+def test_total_demands_override_and_per_run_prices():
+    columns = kpi.results_to_columns(_results(), total_demands=4)
+    np.testing.assert_array_equal(columns['total_demands'], [4, 4, 4])
+    kpis = kpi.compute_kpis(columns, revenue_per_mbps=np.array([1.0, 2.0, 3.0]))
+    np.testing.assert_array_equal(kpis['acceptance_ratio'], [0.5, 0.0, 0.25])
+    np.testing.assert_array_equal(kpis['total_revenue'], [10, 0, 24])
+
+
+def test_grouped_summary_matches_per_group_statistics():
+    rng = np.random.default_rng(0)
+    values = rng.uniform(0, 1, size=60)
+    values[[3, 17]] = np.nan
+    groups = np.array(['ring', 'mesh', 'tree'] * 20)
+    summary = kpi.summarize_kpis({'acceptance_ratio': values}, groups=groups, percentiles=(5, 50))
+
+    assert sorted(summary) == ['mesh', 'ring', 'tree']
+    for label, stats in summary.items():
+        block = values[groups == label]
+        block = block[~np.isnan(block)]
+        stats = stats['acceptance_ratio']
+        assert stats['count'] == len(block)
+        assert stats['mean'] == pytest.approx(block.mean())
+        assert stats['std'] == pytest.approx(block.std(ddof=1))
+        assert stats['p50'] == pytest.approx(np.percentile(block, 50))
+        half_width = 1.959963984540054 * block.std(ddof=1) / np.sqrt(len(block))
+        assert stats['ci_low'] == pytest.approx(block.mean() - half_width)
+        assert stats['ci_high'] == pytest.approx(block.mean() + half_width)
+
+
+def test_summary_without_groups_and_with_missing_values():
+    summary = kpi.summarize_kpis({'total_cost': np.array([1.0, 3.0]),
+                                  'total_combinations': np.array([np.nan, np.nan])})
+    assert list(summary) == [None]
+    assert summary[None]['total_cost']['mean'] == 2.0
+    missing = summary[None]['total_combinations']
+    assert missing['count'] == 0 and np.isnan(missing['mean']) and np.isnan(missing['p50'])
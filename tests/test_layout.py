@@ -0,0 +1,68 @@
+import numpy as np
+
+from GUI.layout import (GRID_THRESHOLD, LayoutCache, _exact_repulsion, _grid_repulsion,
+                        force_directed_layout, topology_fingerprint)
+
+
+def _ring(n):
+    adjacency = np.zeros((n, n), dtype=np.int8)
+    nodes = np.arange(n)
+    adjacency[nodes, (nodes + 1) % n] = 1
+    adjacency[(nodes + 1) % n, nodes] = 1
+    return adjacency
+
+
+def test_fingerprint_depends_only_on_which_links_exist():
+    capacities = _ring(5) * 10.0
+    reweighted = _ring(5) * np.arange(25).reshape(5, 5)
+    reweighted[0, 1] = 3
+    assert topology_fingerprint(capacities) == topology_fingerprint(reweighted != 0)
+    assert topology_fingerprint(_ring(5)) == topology_fingerprint(capacities)
+
+    removed = _ring(5)
+    removed[2, 3] = 0
+    assert topology_fingerprint(removed) != topology_fingerprint(_ring(5))
+    assert topology_fingerprint(np.zeros((4, 4))) != topology_fingerprint(np.zeros((5, 5)))
+
+
+def test_grid_repulsion_matches_exact_when_all_pairs_share_a_cell():
+    positions = np.random.default_rng(0).uniform(0, 1, size=(20, 2))
+    # Cells of side 2k = 2 hold the whole unit square
+    np.testing.assert_allclose(_grid_repulsion(positions, 1.0), _exact_repulsion(positions, 1.0))
+
+
+def test_grid_repulsion_ignores_pairs_beyond_two_k():
+    positions = np.array([[0.0, 0.0], [0.05, 0.0], [0.9, 0.9]])
+    force = _grid_repulsion(positions, 0.1)
+    np.testing.assert_allclose(force[2], 0.0)
+    np.testing.assert_allclose(force[0], [-0.01 / 0.05, 0.0])
+
+
+def test_layout_stays_in_the_drawing_area_and_is_deterministic():
+    for n in (12, GRID_THRESHOLD + 50):
+        adjacency = _ring(n)
+        positions = force_directed_layout(adjacency, 480, 400, margin=60, top=120, seed=3)
+        assert sorted(positions) == list(range(n))
+        xs, ys = np.array(list(positions.values())).T
+        assert np.isfinite(xs).all() and np.isfinite(ys).all()
+        assert xs.min() >= 60 - 1e-6 and xs.max() <= 420 + 1e-6
+        assert ys.min() >= 180 - 1e-6 and ys.max() <= 340 + 1e-6
+        assert force_directed_layout(adjacency, 480, 400, margin=60, top=120, seed=3) == positions
+
+
+def test_layout_places_linked_nodes_closer_than_average():
+    n = 30
+    positions = np.array(list(force_directed_layout(_ring(n), 800, 800).values()))
+    distance = np.linalg.norm(positions[:, None] - positions[None, :], axis=-1)
+    nodes = np.arange(n)
+    assert distance[nodes, (nodes + 1) % n].mean() < 0.5 * distance[np.triu_indices(n, 1)].mean()
+
+
+def test_layout_cache_evicts_the_least_recently_used_entry():
+    cache = LayoutCache(max_entries=2)
+    cache.put('a', {0: (1, 1)})
+    cache.put('b', {0: (2, 2)})
+    assert cache.get('a') == {0: (1, 1)}
+    cache.put('c', {0: (3, 3)})
+    assert cache.get('b') is None
+    assert cache.get('a') == {0: (1, 1)} and cache.get('c') == {0: (3, 3)}
@@ -0,0 +1,70 @@
+import pytest
+
+pytest.importorskip('scipy')
+
+from Allocation.allocation import VirtualNetworkAllocation
+from Allocation.sparse_allocation import SparseVirtualNetworkAllocation
+from Allocation.mcf import solve_mcf, splittable_allocation, upper_bounds
+
+BACKENDS = [VirtualNetworkAllocation, SparseVirtualNetworkAllocation]
+
+# u -> v checks only its own arc but also reduces v -> u
+ASYMMETRIC_CASES = [
+    ([[0, 10], [5, 0]], [[0, 1, 7]], 1),
+    ([[0, 10, 0], [5, 0, 10], [0, 10, 0]], [[0, 1, 7], [1, 2, 5], [0, 2, 3]], 3),
+]
+
+
+@pytest.mark.parametrize('backend', BACKENDS)
+@pytest.mark.parametrize('capacity, demands, accepted', ASYMMETRIC_CASES)
+def test_upper_bounds_hold_on_asymmetric_capacities(backend, capacity, demands, accepted):
+    allocator = backend({'capacity_matrix': capacity, 'demands': demands})
+    bounds = upper_bounds(allocator)
+    result = allocator.offline_brute_force_allocation(use_tree_solver=False)
+
+    assert len(result['allocated_demands']) == accepted
+    assert bounds['max_accepted'] >= accepted
+    revenue = sum(allocator.calculate_revenue(allocator.demands[k]) for k, _ in result['allocated_demands'])
+    assert bounds['revenue'] >= revenue - 1e-6
+
+
+@pytest.mark.parametrize('capacity, demands, accepted', ASYMMETRIC_CASES)
+def test_upper_bound_does_not_stop_the_brute_force_early(capacity, demands, accepted):
+    allocator = VirtualNetworkAllocation({'capacity_matrix': capacity, 'demands': demands})
+    bound = upper_bounds(allocator)['max_accepted']
+    result = allocator.offline_brute_force_allocation(upper_bound=bound, use_tree_solver=False)
+    assert len(result['allocated_demands']) == accepted
+
+
+def test_fractional_flow_splits_a_demand_over_two_paths():
+    capacity = [[0, 5, 5, 0], [5, 0, 0, 5], [5, 0, 0, 5], [0, 5, 5, 0]]
+    allocator = VirtualNetworkAllocation({'capacity_matrix': capacity, 'demands': [[0, 3, 8]]})
+    assert solve_mcf(allocator, 'acceptance')['fractions'][0] == pytest.approx(1.0)
+
+    result = splittable_allocation(allocator)
+    assert result['fractions'][0] == pytest.approx(1.0)
+    assert len(result['allocated_demands'][0][1]) == 2
+    assert allocator.capacity_matrix[0].sum() == pytest.approx(2)
+
+
+@pytest.mark.parametrize('backend', BACKENDS)
+def test_unconverged_pricing_still_reports_a_valid_bound(backend):
+    # Both demands start on the same shortest path; the second path only comes from pricing
+    capacity = [[0, 10, 10, 0], [10, 0, 0, 10], [10, 0, 0, 10], [0, 10, 10, 0]]
+    network = {'capacity_matrix': capacity, 'demands': [[0, 3, 10], [0, 3, 10]]}
+    allocator = backend(network)
+
+    stopped = solve_mcf(allocator, 'acceptance', max_iterations=1)
+    assert not stopped['converged']
+    assert stopped['objective'] == pytest.approx(1.0)
+    assert stopped['bound'] >= 2 - 1e-6
+
+    bounds = upper_bounds(allocator, max_iterations=1)
+    assert not bounds['converged']
+    assert bounds['max_accepted'] == 2
+    assert bounds['revenue'] >= 20 - 1e-6
+    converged = upper_bounds(allocator)
+    assert converged['converged'] and converged['max_accepted'] == 2
+
+    result = allocator.offline_brute_force_allocation(upper_bound=bounds['max_accepted'], use_tree_solver=False)
+    assert len(result['allocated_demands']) == 2
@@ -0,0 +1,136 @@
+import json
+import xml.etree.ElementTree as ET
+
+import numpy as np
+import pytest
+
+from Allocation import network_io
+from Allocation.allocation import VirtualNetworkAllocation
+from Allocation.network_io import load_network, save_network
+
+NETWORK = {
+    'capacity_matrix': [[0, 10, 0, 5], [10, 0, 7, 0], [0, 3, 0, 0], [5, 0, 0, 0]],
+    'demands': [[0, 2, 4], [3, 1, 2.5]]
+}
+
+
+@pytest.mark.parametrize('fmt', ['json', 'csv', 'graphml'])
+def test_save_and_load_round_trip(tmp_path, fmt):
+    path = tmp_path / f'network.{fmt}'
+    save_network(NETWORK, str(path))
+    loaded = load_network(str(path))
+
+    assert loaded['num_nodes'] == 4
+    np.testing.assert_array_equal(loaded['demands'], NETWORK['demands'])
+    original = VirtualNetworkAllocation(NETWORK)
+    restored = VirtualNetworkAllocation(loaded)
+    np.testing.assert_array_equal(restored.capacity_matrix, original.capacity_matrix)
+
+
+def test_isolated_nodes_survive_the_round_trip(tmp_path):
+    network = {'edges': [(0, 1, 10), (1, 0, 10)], 'num_nodes': 5, 'demands': []}
+    for fmt in ('json', 'graphml'):
+        path = tmp_path / f'network.{fmt}'
+        save_network(network, str(path))
+        assert load_network(str(path))['num_nodes'] == 5
+
+
+def test_json_accepts_a_capacity_matrix(tmp_path):
+    path = tmp_path / 'network.json'
+    path.write_text(json.dumps({'capacity_matrix': [[0, ""], [4, 0]], 'demands': [[1, 0, 2]]}))
+    loaded = load_network(str(path))
+    assert loaded['num_nodes'] == 2
+    np.testing.assert_array_equal(loaded['edges'], [[1, 0, 4]])
+
+
+def test_csv_skips_headers_and_comments_and_mirrors_edges(tmp_path):
+    path = tmp_path / 'links.csv'
+    path.write_text("source,destination,capacity\n# backbone\n0,1,10\n\n1,2,4\n2,1,6\n")
+    (tmp_path / 'links_demands.csv').write_text("source,destination,bandwidth\n0,2,3\n")
+
+    loaded = load_network(str(path))
+    np.testing.assert_array_equal(loaded['edges'], [[0, 1, 10], [1, 2, 4], [2, 1, 6]])
+    np.testing.assert_array_equal(loaded['demands'], [[0, 2, 3]])
+
+    mirrored = load_network(str(path), bidirectional=True)
+    np.testing.assert_array_equal(mirrored['edges'], [[0, 1, 10], [1, 2, 4], [2, 1, 6], [1, 0, 10]])
+
+
+def test_graphml_undirected_edges_are_mirrored(tmp_path):
+    path = tmp_path / 'network.graphml'
+    path.write_text(
+        '<?xml version="1.0" encoding="UTF-8"?>\n'
+        '<graphml xmlns="http://graphml.graphdrawing.org/xmlns">\n'
+        '  <key id="c" for="edge" attr.name="capacity" attr.type="double"/>\n'
+        '  <graph edgedefault="undirected">\n'
+        '    <node id="a"/><node id="b"/><node id="c"/>\n'
+        '    <edge source="a" target="b"><data key="c">8</data></edge>\n'
+        '    <edge source="b" target="c" directed="true"><data key="c">2</data></edge>\n'
+        '  </graph>\n'
+        '</graphml>\n')
+    loaded = load_network(str(path))
+    assert loaded['num_nodes'] == 3
+    np.testing.assert_array_equal(loaded['edges'], [[0, 1, 8], [1, 0, 8], [1, 2, 2]])
+    assert loaded['demands'].shape == (0, 3)
+
+
+def test_invalid_inputs_are_rejected(tmp_path):
+    with pytest.raises(ValueError):
+        load_network(str(tmp_path / 'network.txt'))
+
+    path = tmp_path / 'network.json'
+    path.write_text(json.dumps({'num_nodes': 2, 'edges': [[0, 1, 5]], 'demands': [[0, 2, 1]]}))
+    with pytest.raises(ValueError):
+        load_network(str(path))
+
+
+def _ring(n):
+    edges = [(u, (u + 1) % n, 1 + u % 7) for u in range(n)]
+    return {'edges': edges, 'num_nodes': n, 'demands': [[0, n // 2, 1.5], [1, 2, 3]]}
+
+
+def test_json_is_read_in_chunks(tmp_path, monkeypatch):
+    path = tmp_path / 'network.json'
+    path.write_text(json.dumps({'extra': {'nested': [1, "]"]}, 'edges': _ring(50)['edges'],
+                                'num_nodes': 50, 'demands': [[0, 25, 1.5], [1, 2, 3]]}, indent=1))
+    expected = load_network(str(path))
+
+    # Tiny chunks split numbers, strings and rows; the whole document is never decoded at once
+    monkeypatch.setattr(network_io._JsonStream, 'CHUNK_SIZE', 3)
+    monkeypatch.setattr(json, 'load', None)
+    monkeypatch.setattr(json, 'loads', None)
+    loaded = load_network(str(path))
+    assert loaded['num_nodes'] == 50
+    np.testing.assert_array_equal(loaded['edges'], expected['edges'])
+    np.testing.assert_array_equal(loaded['edges'], np.array(_ring(50)['edges'], dtype=float))
+    np.testing.assert_array_equal(loaded['demands'], [[0, 25, 1.5], [1, 2, 3]])
+
+
+def test_non_square_json_matrix_is_rejected(tmp_path):
+    path = tmp_path / 'network.json'
+    path.write_text(json.dumps({'capacity_matrix': [[0, 1, 2], [1, 0, 2]], 'demands': []}))
+    with pytest.raises(ValueError):
+        load_network(str(path))
+
+
+def test_graphml_parsing_keeps_the_tree_small(tmp_path, monkeypatch):
+    path = tmp_path / 'network.graphml'
+    save_network(_ring(3000), str(path))
+    iterparse = ET.iterparse
+    sizes = []
+
+    def watched(*args, **kwargs):
+        graph = None
+        for event, element in iterparse(*args, **kwargs):
+            if graph is None and element.tag.endswith('graph'):
+                graph = element
+            if graph is not None:
+                sizes.append(len(graph))
+            yield event, element
+
+    monkeypatch.setattr(ET, 'iterparse', watched)
+    loaded = load_network(str(path))
+    assert len(loaded['edges']) == 3000
+    # Consumed nodes and edges do not pile up under the graph element; only
+    # the elements of the chunk iterparse has read ahead are held at a time
+    assert max(sizes) < 1000
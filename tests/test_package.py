@@ -0,0 +1,43 @@
+import importlib
+import os
+import subprocess
+import sys
+
+import pytest
+
+import Allocation
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def _loaded_after(statement):
+    """
+    Top-level packages present in sys.modules after running statement in a new interpreter
+    """
+    code = f"{statement}\nimport sys\nprint(' '.join(sorted({{name.split('.')[0] for name in sys.modules}})))"
+    completed = subprocess.run([sys.executable, '-c', code], cwd=ROOT, capture_output=True, text=True, check=True)
+    return set(completed.stdout.split())
+
+
+@pytest.mark.parametrize('statement, forbidden', [
+    ('import Allocation', ('numpy', 'scipy', 'tkinter')),
+    ('from Allocation import VirtualNetworkAllocation', ('scipy', 'tkinter')),
+    ('import Allocation.server', ('scipy', 'tkinter')),
+    ('import KPIs.kpi', ('scipy', 'tkinter')),
+])
+def test_headless_imports_stay_light(statement, forbidden):
+    loaded = _loaded_after(statement)
+    assert not loaded & set(forbidden)
+
+
+@pytest.mark.parametrize('name, module', sorted(Allocation._EXPORTS.items()))
+def test_every_export_resolves_to_its_module(name, module):
+    value = getattr(Allocation, name)
+    assert value is getattr(importlib.import_module(f'Allocation.{module}'), name)
+    assert name in dir(Allocation) and name in Allocation.__all__
+
+
+def test_submodules_and_unknown_names():
+    assert Allocation.mcf is importlib.import_module('Allocation.mcf')
+    with pytest.raises(AttributeError):
+        Allocation.not_a_name
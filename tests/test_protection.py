@@ -0,0 +1,119 @@
+import itertools
+import random
+
+import numpy as np
+import pytest
+
+from Allocation.allocation import VirtualNetworkAllocation
+from Allocation.links import residual_links
+from Allocation.protection import disjoint_pair, protected_allocation
+from Allocation.sparse_allocation import SparseVirtualNetworkAllocation
+from KPIs import kpi
+
+BACKENDS = [VirtualNetworkAllocation, SparseVirtualNetworkAllocation]
+
+
+def _random_network(seed):
+    rng = random.Random(seed)
+    n = rng.randint(4, 7)
+    edges = []
+    for u in range(n):
+        for v in range(u + 1, n):
+            if rng.random() < 0.5:
+                capacity = rng.choice([5, 10, 20])
+                edges += [(u, v, capacity), (v, u, capacity)]
+    return {'edges': edges, 'num_nodes': n, 'demands': []}
+
+
+def _links_of(path):
+    return {frozenset(hop) for hop in zip(path[:-1], path[1:])}
+
+
+def _is_path(allocator, path, source, destination):
+    return (path[0] == source and path[-1] == destination and len(set(path)) == len(path)
+            and all(allocator.original_capacity_matrix[u, v] > 0 for u, v in zip(path[:-1], path[1:])))
+
+
+@pytest.mark.parametrize('seed', range(40))
+def test_disjoint_pair_matches_the_shortest_pair_by_enumeration(seed):
+    allocator = VirtualNetworkAllocation(_random_network(seed))
+    links = residual_links(allocator)
+    usable = np.ones(links.num_arcs, dtype=bool)
+    for source, destination in itertools.permutations(range(allocator.num_nodes), 2):
+        paths = allocator.find_all_paths(source, destination)
+        lengths = [len(p) + len(q) - 2 for p, q in itertools.combinations(paths, 2)
+                   if not _links_of(p) & _links_of(q)]
+        found = disjoint_pair(links, source, destination, usable)
+        if not lengths:
+            assert found is None
+            continue
+        (first, first_arcs), (second, _) = found
+        assert _is_path(allocator, first, source, destination)
+        assert _is_path(allocator, second, source, destination)
+        assert not _links_of(first) & _links_of(second)
+        assert len(first_arcs) == len(first) - 1 and len(first) <= len(second)
+        assert len(first) + len(second) - 2 == min(lengths)
+
+
+def test_disjoint_pair_escapes_the_shortest_path_trap():
+    # The shortest path 0-1-2-3 blocks every disjoint partner; the pair is 0-1-5-3 and 0-4-2-3
+    edges = []
+    for u, v in ((0, 1), (1, 2), (2, 3), (0, 4), (4, 2), (1, 5), (5, 3)):
+        edges += [(u, v, 10), (v, u, 10)]
+    allocator = VirtualNetworkAllocation({'edges': edges, 'num_nodes': 6, 'demands': []})
+    links = residual_links(allocator)
+    shortcut = ((links.sources == 1) & (links.destinations == 2)) | ((links.sources == 2) & (links.destinations == 1))
+    weights = np.where(shortcut, 0.5, 1.0)
+    (first, _), (second, _) = disjoint_pair(links, 0, 3, np.ones(links.num_arcs, dtype=bool), weights)
+    assert sorted([first, second]) == [[0, 1, 5, 3], [0, 4, 2, 3]]
+
+
+@pytest.mark.parametrize('backend', BACKENDS)
+@pytest.mark.parametrize('mode', ['dedicated', 'shared'])
+def test_protected_allocation_reserves_disjoint_primaries_and_backups(backend, mode):
+    edges = []
+    for u, v in ((0, 1), (1, 2), (2, 3), (3, 0), (1, 3)):
+        edges += [(u, v, 10), (v, u, 10)]
+    network = {'edges': edges, 'num_nodes': 4, 'demands': [[0, 1, 4], [2, 3, 4], [0, 2, 5]]}
+    allocator = backend(network)
+    result = protected_allocation(allocator, mode)
+
+    for k, primary in result['allocated_demands']:
+        backup = result['backup_paths'][k]
+        demand = allocator.demands[k]
+        assert primary[0] == backup[0] == demand.source and primary[-1] == backup[-1] == demand.destination
+        assert not _links_of(primary) & _links_of(backup)
+    assert len(result['allocated_demands']) >= 2
+    assert kpi.protection_overhead(result) == result['backup_capacity'] / result['primary_capacity']
+
+    # Undoing every primary and backup reservation gives the original capacities back
+    for k, primary in result['allocated_demands']:
+        allocator.deallocate_path(primary, allocator.demands[k].bandwidth)
+        for hop, amount in result['backup_reservations'][k]:
+            allocator.deallocate_path(hop, amount)
+    np.testing.assert_array_equal(allocator.capacity_matrix, allocator.original_capacity_matrix)
+
+
+def test_shared_backups_reserve_less_than_dedicated_ones():
+    # Two demands with link-disjoint primaries can share their backup capacity
+    edges = []
+    for u, v in ((0, 1), (1, 2), (0, 3), (3, 2)):
+        edges += [(u, v, 10), (v, u, 10)]
+    network = {'edges': edges, 'num_nodes': 4, 'demands': [[0, 1, 4], [1, 2, 4]]}
+    dedicated = protected_allocation(VirtualNetworkAllocation(network), 'dedicated', commit=False)
+    shared = protected_allocation(VirtualNetworkAllocation(network), 'shared', commit=False)
+    assert len(dedicated['allocated_demands']) == len(shared['allocated_demands']) == 2
+    assert dedicated['backup_capacity'] == 24
+    assert shared['backup_capacity'] == 16
+    assert kpi.protection_overhead(shared) < kpi.protection_overhead(dedicated)
+
+
+def test_demands_without_two_disjoint_paths_are_rejected():
+    network = {'capacity_matrix': [[0, 10, 0], [10, 0, 10], [0, 10, 0]], 'demands': [[0, 2, 1]]}
+    allocator = VirtualNetworkAllocation(network)
+    result = protected_allocation(allocator)
+    assert result['rejected_demands'] == [0] and not result['success']
+    assert np.isnan(kpi.protection_overhead(result))
+    np.testing.assert_array_equal(allocator.capacity_matrix, allocator.original_capacity_matrix)
+    with pytest.raises(ValueError):
+        protected_allocation(allocator, 'partial')
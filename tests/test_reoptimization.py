@@ -0,0 +1,71 @@
+import numpy as np
+import pytest
+
+from Allocation.allocation import VirtualNetworkAllocation
+from Allocation.reoptimization import PathTransaction, reoptimize
+
+RING = [[0, 10, 0, 10], [10, 0, 10, 0], [0, 10, 0, 10], [10, 0, 10, 0]]
+
+
+def _fragmented():
+    """
+    Demand 0 holds the long way round the ring, so demand 1 was rejected
+    """
+    allocator = VirtualNetworkAllocation({'capacity_matrix': RING, 'demands': [[0, 1, 10], [3, 2, 10]]})
+    scenario = [(0, [0, 3, 2, 1])]
+    metrics = allocator.evaluate_allocation_scenario(scenario)
+    allocator.allocate_path([0, 3, 2, 1], 10)
+    allocator.allocation_paths = dict(scenario)
+    allocator.allocated_demands = [allocator.demands[0]]
+    allocator.rejected_demands = [allocator.demands[1]]
+    allocator.current_revenue = metrics['total_revenue']
+    allocator.current_cost = metrics['total_cost']
+    return allocator
+
+
+def test_migration_frees_capacity_for_a_rejected_demand():
+    allocator = _fragmented()
+    report = reoptimize(allocator)
+
+    assert [m['new_path'] for m in report['migrations']] == [[0, 1]]
+    assert report['readmitted_demands'] == [1]
+    assert report['acceptance_ratio_after'] == 1.0
+    assert allocator.allocation_paths == {0: [0, 1], 1: [3, 2]}
+
+
+def test_totals_follow_the_scenario_accounting():
+    allocator = _fragmented()
+    report = reoptimize(allocator)
+
+    scenario = sorted(allocator.allocation_paths.items())
+    metrics = VirtualNetworkAllocation({'capacity_matrix': RING, 'demands': [[0, 1, 10], [3, 2, 10]]}
+                                       ).evaluate_allocation_scenario(scenario)
+    assert allocator.current_revenue == pytest.approx(metrics['total_revenue'])
+    assert allocator.current_cost == pytest.approx(metrics['total_cost'])
+    assert report['migrations'][0]['revenue'] == allocator.calculate_revenue(allocator.demands[0])
+
+
+def test_failed_transaction_is_rolled_back():
+    allocator = VirtualNetworkAllocation({'capacity_matrix': RING, 'demands': [[0, 2, 10]]})
+    allocator.allocate_path([0, 1, 2], 10)
+    before = allocator.capacity_matrix.copy()
+
+    with pytest.raises(ValueError):
+        with PathTransaction(allocator) as transaction:
+            transaction.deallocate([0, 1, 2], 10)
+            transaction.allocate([0, 3, 2], 10)
+            transaction.allocate([0, 3], 10)
+    np.testing.assert_array_equal(allocator.capacity_matrix, before)
+
+
+def test_rollback_is_exact_on_asymmetric_links():
+    allocator = VirtualNetworkAllocation({'capacity_matrix': [[0, 10], [4, 0]], 'demands': []})
+    allocator.allocate_path([1, 0], 4)
+    before = allocator.capacity_matrix.copy()
+
+    # 1 -> 0 has no residual left, so 0 -> 1 does not reduce it but a release would add to it
+    with pytest.raises(ValueError):
+        with PathTransaction(allocator) as transaction:
+            transaction.allocate([0, 1], 5)
+            transaction.allocate([0, 1], 5)
+    np.testing.assert_array_equal(allocator.capacity_matrix, before)
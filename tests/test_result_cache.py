@@ -0,0 +1,50 @@
+import numpy as np
+
+from Allocation.allocation import VirtualNetworkAllocation
+from Allocation.result_cache import ResultCache, canonical_key
+
+NETWORK = {
+    'capacity_matrix': [[0, 10, 10, 0], [10, 0, 5, 10], [10, 5, 0, 10], [0, 10, 10, 0]],
+    'demands': [[0, 3, 6], [1, 2, 4], [0, 3, 8]],
+}
+
+
+def test_key_covers_duration_and_price():
+    short = dict(NETWORK, demands=[[0, 3, 6]])
+    defaults = dict(NETWORK, demands=[[0, 3, 6, 1, 1.0]])
+    longer = dict(NETWORK, demands=[[0, 3, 6, 5, 1.0]])
+    pricier = dict(NETWORK, demands=[[0, 3, 6, 1, 2.0]])
+
+    assert canonical_key(short) == canonical_key(defaults)
+    assert len({canonical_key(defaults), canonical_key(longer), canonical_key(pricier)}) == 3
+
+
+def test_key_ignores_the_container_type():
+    as_arrays = {'capacity_matrix': np.array(NETWORK['capacity_matrix']),
+                 'demands': np.array(NETWORK['demands'])}
+    assert canonical_key(as_arrays) == canonical_key(NETWORK)
+    assert canonical_key(NETWORK, settings={'upper_bound': 2}) != canonical_key(NETWORK)
+
+
+def test_hit_restores_the_allocator_state(tmp_path):
+    cache = ResultCache(str(tmp_path / 'results.sqlite'))
+    solved = VirtualNetworkAllocation(NETWORK)
+    first = cache.allocate(solved, NETWORK)
+    restored = VirtualNetworkAllocation(NETWORK)
+    second = cache.allocate(restored, NETWORK)
+
+    assert cache.stats()['hits'] == 1
+    assert second['allocated_demands'] == first['allocated_demands']
+    np.testing.assert_array_equal(restored.capacity_matrix, solved.capacity_matrix)
+    assert restored.allocation_paths == solved.allocation_paths
+    assert restored.current_revenue == solved.current_revenue
+    cache.close()
+
+
+def test_least_recently_used_entries_are_evicted(tmp_path):
+    cache = ResultCache(str(tmp_path / 'results.sqlite'), max_bytes=200)
+    for name in ('a', 'b', 'c'):
+        cache.put(name, {'payload': name * 50})
+    assert cache.get('a') is None
+    assert cache.get('c') == {'payload': 'c' * 50}
+    cache.close()
@@ -0,0 +1,46 @@
+import pytest
+
+pytest.importorskip('scipy')
+
+from Allocation.allocation import VirtualNetworkAllocation
+from Allocation.sensitivity import capacity_sensitivity
+from Allocation.sparse_allocation import SparseVirtualNetworkAllocation
+
+# Two demands of 6 Mbps share the 0-1 link of 10 Mbps; 1-2 has room to spare
+NETWORK = {
+    'capacity_matrix': [[0, 10, 0], [10, 0, 20], [0, 20, 0]],
+    'demands': [[0, 1, 6], [0, 2, 6], [1, 2, 4]],
+}
+
+
+@pytest.mark.parametrize('backend', [VirtualNetworkAllocation, SparseVirtualNetworkAllocation])
+def test_bottleneck_link_ranks_first_with_the_allocated_gain(backend):
+    allocator = backend(NETWORK)
+    report = capacity_sensitivity(allocator, top=2, delta=2)
+    best = report['links'][0]
+
+    assert best['link'] == (0, 1)
+    assert report['base_accepted'] == 2
+    assert best['accepted_gain'] == 1
+    assert best['revenue_gain'] == pytest.approx(6.0)
+    assert report['links'][1]['accepted_gain'] == 0
+
+
+def test_fractional_lp_gain_is_kept_apart_from_the_allocated_gain():
+    # One more Mbps on 0-1 helps the LP, but no whole demand fits in 11 Mbps
+    report = capacity_sensitivity(VirtualNetworkAllocation(NETWORK), top=1, delta=1)
+    best = report['links'][0]
+
+    assert best['link'] == (0, 1)
+    assert best['lp_revenue_gain_per_mbps'] > 0
+    assert best['accepted_gain'] == 0
+    assert best['revenue_gain'] == 0
+
+
+def test_the_allocator_itself_is_left_untouched():
+    allocator = VirtualNetworkAllocation(NETWORK)
+    capacity = allocator.capacity_matrix.copy()
+    capacity_sensitivity(allocator, top=1)
+
+    assert (allocator.capacity_matrix == capacity).all()
+    assert allocator.allocation_paths == {}
@@ -0,0 +1,142 @@
+import asyncio
+import json
+
+import numpy as np
+import pytest
+
+from Allocation.allocation import VirtualNetworkAllocation
+from Allocation.server import AdmissionServer
+
+LINE = {'capacity_matrix': [[0, 10, 0, 0], [10, 0, 10, 0], [0, 10, 0, 10], [0, 0, 10, 0]], 'demands': []}
+
+
+async def _with_server(server, session):
+    listener = await server.start('127.0.0.1', 0)
+    port = listener.sockets[0].getsockname()[1]
+    reader, writer = await asyncio.open_connection('127.0.0.1', port)
+
+    async def request(message):
+        line = message if isinstance(message, bytes) else json.dumps(message).encode()
+        writer.write(line + b'\n')
+        await writer.drain()
+        return json.loads(await reader.readline())
+
+    try:
+        return await session(request)
+    finally:
+        writer.close()
+        await server.close()
+
+
+def test_allocate_release_and_status_over_tcp():
+    allocator = VirtualNetworkAllocation(LINE)
+    server = AdmissionServer(allocator, duration=2, price_per_unit=1.5)
+
+    async def session(request):
+        first = await request({'op': 'allocate', 'source': 0, 'destination': 3, 'bandwidth': 6, 'id': 'a'})
+        assert first == {'ok': True, 'session': 0, 'path': [0, 1, 2, 3], 'id': 'a'}
+        rejected = await request({'op': 'allocate', 'source': 1, 'destination': 2, 'bandwidth': 5})
+        assert rejected == {'ok': False, 'error': 'Capacidad insuficiente'}
+        status = (await request({'op': 'status'}))['status']
+        assert status['active_sessions'] == 1 and status['rejected_requests'] == 1
+        assert status['allocated_demands'] == 1 and status['acceptance_ratio'] == 0.5
+        assert status['total_revenue'] == 6 * 2 * 1.5 and status['total_cost'] == 18
+
+        assert await request({'op': 'release', 'session': 0}) == {'ok': True}
+        assert not (await request({'op': 'release', 'session': 0}))['ok']
+        status = (await request({'op': 'status'}))['status']
+        assert status['active_sessions'] == 0 and status['total_revenue'] == 0
+
+        assert (await request(b'{not json'))['error'] == 'JSON no válido'
+        assert not (await request({'op': 'move'}))['ok']
+        assert not (await request({'op': 'allocate', 'source': 0, 'destination': 9, 'bandwidth': 1}))['ok']
+        assert not (await request({'op': 'allocate', 'source': 0, 'destination': 1, 'bandwidth': -1}))['ok']
+
+    asyncio.run(_with_server(server, session))
+    np.testing.assert_array_equal(allocator.capacity_matrix, allocator.original_capacity_matrix)
+
+
+def test_concurrent_clients_never_oversubscribe_a_link():
+    allocator = VirtualNetworkAllocation(LINE)
+    server = AdmissionServer(allocator)
+
+    async def run():
+        await server.start('127.0.0.1', 0)
+        try:
+            responses = await asyncio.gather(*(
+                server.dispatch({'op': 'allocate', 'source': 0, 'destination': 3, 'bandwidth': 3})
+                for _ in range(10)))
+            assert sum(response['ok'] for response in responses) == 3
+            assert (allocator.capacity_matrix >= 0).all()
+            await asyncio.gather(*(server.dispatch({'op': 'release', 'session': response['session']})
+                                   for response in responses if response['ok']))
+        finally:
+            await server.close()
+
+    asyncio.run(run())
+    np.testing.assert_array_equal(allocator.capacity_matrix, allocator.original_capacity_matrix)
+    assert server.status['admitted_requests'] == 3 and server.status['rejected_requests'] == 7
+
+
+def test_requests_within_the_window_are_admitted_as_one_batch():
+    allocator = VirtualNetworkAllocation(LINE)
+    server = AdmissionServer(allocator, batch_window_ms=200, max_batch=4)
+
+    async def run():
+        await server.start('127.0.0.1', 0)
+        try:
+            return await asyncio.gather(
+                server.dispatch({'op': 'allocate', 'source': 0, 'destination': 3, 'bandwidth': 8}),
+                server.dispatch({'op': 'allocate', 'source': 0, 'destination': 1, 'bandwidth': 5}),
+                server.dispatch({'op': 'allocate', 'source': 2, 'destination': 3, 'bandwidth': 5}),
+                server.dispatch({'op': 'allocate', 'source': 1, 'destination': 2, 'bandwidth': 5}))
+        finally:
+            await server.close()
+
+    responses = asyncio.run(run())
+    assert server.status['batches'] == 1 and server.status['mean_batch_size'] == 4
+    # Admitting the three short requests pays more than the long one alone
+    assert [response['ok'] for response in responses] == [False, True, True, True]
+    np.testing.assert_array_equal(allocator.capacity_matrix[[0, 1, 2], [1, 2, 3]], [5, 5, 5])
+
+
+@pytest.mark.parametrize('max_batch', [1, 3])
+def test_a_failing_request_leaves_no_partial_state(max_batch):
+    allocator = VirtualNetworkAllocation(LINE)
+    server = AdmissionServer(allocator, batch_window_ms=200, max_batch=max_batch)
+    path_cost = allocator.calculate_path_cost
+
+    def failing_cost(path, bandwidth):
+        if list(path) == [2, 3]:
+            raise RuntimeError('fallo')
+        return path_cost(path, bandwidth)
+
+    allocator.calculate_path_cost = failing_cost
+
+    async def run():
+        await server.start('127.0.0.1', 0)
+        try:
+            return await asyncio.gather(*(
+                server.dispatch({'op': 'allocate', 'source': u, 'destination': u + 1, 'bandwidth': 5})
+                for u in (0, 2, 1)))
+        finally:
+            await server.close()
+
+    responses = asyncio.run(run())
+    # Only the request whose bookkeeping fails is answered with an error, and its path is released
+    assert [response['ok'] for response in responses] == [True, False, True]
+    assert responses[1]['error'] == 'Error interno: fallo'
+    np.testing.assert_array_equal(allocator.capacity_matrix[[0, 1, 2], [1, 2, 3]], [5, 5, 10])
+    assert [session['path'] for session in server.sessions.values()] == [[0, 1], [1, 2]]
+    assert server.status['total_cost'] == 10 and server.status['admitted_requests'] == 2
+
+
+def test_over_long_lines_are_answered_with_an_error():
+    server = AdmissionServer(VirtualNetworkAllocation(LINE))
+
+    async def session(request):
+        # Well past the 64 KiB stream limit; the connection keeps serving afterwards
+        assert await request(b'x' * (1 << 17)) == {'ok': False, 'error': 'Línea demasiado larga'}
+        assert (await request({'op': 'status', 'id': 1}))['id'] == 1
+
+    asyncio.run(_with_server(server, session))
@@ -0,0 +1,103 @@
+import json
+import multiprocessing
+import os
+import subprocess
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+
+import numpy as np
+import pytest
+
+from Allocation.allocation import VirtualNetworkAllocation
+from Allocation.shared_topology import SharedTopology, attach_worker_topology, worker_topology
+from Allocation.sparse_allocation import SparseVirtualNetworkAllocation
+
+NETWORK = {
+    'capacity_matrix': [[0, 10, 10, 0], [10, 0, 5, 10], [10, 5, 0, 10], [0, 10, 10, 0]],
+    'demands': [[0, 3, 6], [1, 2, 4]],
+}
+
+
+def _worker_task(demand_idx):
+    topology = worker_topology()
+    allocator = topology.allocator()
+    demand = allocator.demands[demand_idx]
+    path = allocator.find_shortest_path(demand.source, demand.destination, demand.bandwidth)
+    allocator.allocate_path(path, demand.bandwidth)
+    return path, topology.paths(demand_idx), float(np.sum(allocator.capacity_matrix))
+
+
+@pytest.mark.parametrize('backend', [VirtualNetworkAllocation, SparseVirtualNetworkAllocation])
+def test_published_paths_are_read_back(backend):
+    allocator = backend(NETWORK)
+    demand_paths = {0: [[0, 1, 3], [0, 2, 3]], 1: [[1, 2]]}
+    with SharedTopology.create(allocator, demand_paths=demand_paths) as topology:
+        assert topology.paths(0) == demand_paths[0]
+        assert topology.paths(1) == demand_paths[1]
+
+
+def test_paths_are_enumerated_on_first_use_when_not_published():
+    allocator = VirtualNetworkAllocation(NETWORK)
+    with SharedTopology.create(allocator) as topology:
+        assert 'path_nodes' not in topology.arrays
+        assert topology.paths(1) == allocator.find_all_paths(1, 2)
+
+
+@pytest.mark.parametrize('start_method', ['fork', 'spawn'])
+def test_workers_share_the_topology_without_unlinking_it(start_method):
+    if start_method not in multiprocessing.get_all_start_methods():
+        pytest.skip(f'{start_method} no disponible')
+    allocator = SparseVirtualNetworkAllocation(NETWORK)
+    total = float(np.sum(allocator.capacity_matrix))
+    with SharedTopology.create(allocator) as topology:
+        with ProcessPoolExecutor(max_workers=2, mp_context=multiprocessing.get_context(start_method),
+                                 initializer=attach_worker_topology, initargs=(topology.descriptor,)) as pool:
+            results = list(pool.map(_worker_task, [0, 1]))
+        block_names = [name for name, _, _ in topology.descriptor['arrays'].values()]
+
+        # Workers allocate on private copies, and their exit leaves the blocks in place
+        assert [path for path, _, _ in results] == [[0, 1, 3], [1, 2]]
+        assert results[1][1] == allocator.find_all_paths(1, 2)
+        assert all(remaining < total for _, _, remaining in results)
+        np.testing.assert_array_equal(topology.allocator().capacity_matrix, allocator.capacity_matrix)
+        shared_memory.SharedMemory(name=block_names[0]).close()
+
+    with pytest.raises(FileNotFoundError):
+        shared_memory.SharedMemory(name=block_names[0])
+
+
+def test_an_unrelated_process_can_attach_and_exit_without_unlinking():
+    allocator = VirtualNetworkAllocation(NETWORK)
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    script = ("import json, sys\n"
+              "from Allocation.shared_topology import SharedTopology\n"
+              "topology = SharedTopology.attach(json.loads(sys.stdin.read()))\n"
+              "print(topology.allocator().find_shortest_path(0, 3))\n"
+              "topology.close()\n")
+    with SharedTopology.create(allocator) as topology:
+        output = subprocess.run([sys.executable, '-c', script], input=json.dumps(topology.descriptor),
+                                capture_output=True, text=True, cwd=root, check=True)
+        assert output.stdout.strip() == '[0, 1, 3]'
+        assert 'resource_tracker' not in output.stderr
+        name = next(iter(topology.descriptor['arrays'].values()))[0]
+        shared_memory.SharedMemory(name=name).close()
+
+
+@pytest.mark.parametrize('backend', [VirtualNetworkAllocation, SparseVirtualNetworkAllocation])
+def test_allocators_outlive_the_closed_topology(backend):
+    allocator = backend(NETWORK)
+    topology = SharedTopology.create(allocator)
+    fresh = topology.allocator()
+    used = topology.allocator(np.array(allocator.capacity_matrix))
+    used.allocate_path([0, 1, 3], 6)
+    topology.close()
+
+    # Both keep private copies of the topology once the shared blocks are gone
+    np.testing.assert_array_equal(fresh.original_capacity_matrix, allocator.original_capacity_matrix)
+    assert fresh.capacity_matrix is fresh.original_capacity_matrix
+    assert not fresh.original_capacity_matrix.flags.writeable
+    assert fresh.find_shortest_path(0, 3, 6) == [0, 1, 3]
+    fresh.allocate_path([0, 1, 3], 6)
+    np.testing.assert_array_equal(fresh.capacity_matrix, used.capacity_matrix)
+    assert used.find_all_paths(1, 2) == allocator.find_all_paths(1, 2)
@@ -0,0 +1,67 @@
+import os
+
+import numpy as np
+import pytest
+
+from Allocation.allocation import VirtualNetworkAllocation
+from Allocation.snapshot import load_snapshot, save_snapshot
+from Allocation.sparse_allocation import SparseVirtualNetworkAllocation
+
+NETWORK = {
+    'capacity_matrix': [[0, 10, 10, 0], [10, 0, 5, 10], [10, 5, 0, 10], [0, 10, 10, 0]],
+    'demands': [[0, 3, 6], [1, 2, 4], [0, 3, 8]],
+}
+
+
+def _allocated(backend):
+    allocator = backend(NETWORK)
+    allocator.offline_brute_force_allocation()
+    return allocator
+
+
+@pytest.mark.parametrize('backend', [VirtualNetworkAllocation, SparseVirtualNetworkAllocation])
+@pytest.mark.parametrize('mmap_mode', ['r', None])
+def test_snapshot_round_trip(tmp_path, backend, mmap_mode):
+    allocator = _allocated(backend)
+    save_snapshot(allocator, str(tmp_path / 'snapshot'))
+    restored = load_snapshot(str(tmp_path / 'snapshot'), mmap_mode=mmap_mode)
+
+    assert type(restored) is backend
+    np.testing.assert_array_equal(restored.capacity_matrix, allocator.capacity_matrix)
+    np.testing.assert_array_equal(restored.original_capacity_matrix, allocator.original_capacity_matrix)
+    assert restored.allocation_paths == allocator.allocation_paths
+    assert [d.index for d in restored.allocated_demands] == [d.index for d in allocator.allocated_demands]
+    assert restored.current_revenue == allocator.current_revenue
+    assert restored.find_shortest_path(0, 3, 1) is not None
+
+
+def test_allocating_on_a_mapped_snapshot_leaves_the_files_unchanged(tmp_path):
+    allocator = VirtualNetworkAllocation(NETWORK)
+    save_snapshot(allocator, str(tmp_path / 'snapshot'))
+    restored = load_snapshot(str(tmp_path / 'snapshot'))
+    restored.allocate_path([0, 1, 3], 5)
+
+    reloaded = load_snapshot(str(tmp_path / 'snapshot'), mmap_mode=None)
+    np.testing.assert_array_equal(reloaded.capacity_matrix, allocator.capacity_matrix)
+
+
+def test_save_replaces_an_existing_snapshot(tmp_path):
+    target = str(tmp_path / 'snapshot')
+    save_snapshot(VirtualNetworkAllocation(NETWORK), target)
+    allocator = _allocated(VirtualNetworkAllocation)
+    save_snapshot(allocator, target)
+
+    assert allocator.allocation_paths
+    assert load_snapshot(target).allocation_paths == allocator.allocation_paths
+    assert sorted(os.listdir(tmp_path)) == ['snapshot']
+
+
+def test_save_refuses_to_overwrite_other_directories(tmp_path):
+    target = tmp_path / 'project'
+    target.mkdir()
+    (target / 'notes.txt').write_text('keep me')
+
+    with pytest.raises(FileExistsError):
+        save_snapshot(VirtualNetworkAllocation(NETWORK), str(target))
+    assert (target / 'notes.txt').read_text() == 'keep me'
+    assert sorted(os.listdir(tmp_path)) == ['project']
@@ -0,0 +1,128 @@
+import random
+
+import numpy as np
+import pytest
+
+from Allocation.allocation import VirtualNetworkAllocation
+from Allocation.sparse_allocation import SparseVirtualNetworkAllocation
+
+
+def _random_network(seed):
+    rng = random.Random(seed)
+    n = rng.randint(3, 6)
+    edges = []
+    for u in range(n):
+        for v in range(u + 1, n):
+            if rng.random() < 0.5:
+                # Asymmetric and one-way links included
+                edges.append((u, v, rng.choice([5, 10, 20])))
+                if rng.random() < 0.8:
+                    edges.append((v, u, rng.choice([0, 5, 10, 20])))
+    demands = [rng.sample(range(n), 2) + [rng.choice([3, 5, 8])] for _ in range(rng.randint(1, 4))]
+    return {'edges': edges, 'num_nodes': n, 'demands': demands}
+
+
+def _dense_residual(allocator):
+    """
+    Residual capacities of the sparse backend laid out as an n x n matrix
+    """
+    matrix = np.zeros((allocator.num_nodes, allocator.num_nodes))
+    matrix[allocator.edge_sources, allocator.edge_destinations] = allocator.capacity_matrix
+    return matrix
+
+
+def _pairs(allocator):
+    return [(u, v) for u in range(allocator.num_nodes) for v in range(allocator.num_nodes) if u != v]
+
+
+def test_matrix_edges_and_scipy_inputs_build_the_same_edges():
+    matrix = [[0, 10, 0], [4, 0, ""], [0, 7, 0]]
+    from_matrix = SparseVirtualNetworkAllocation({'capacity_matrix': matrix, 'demands': []})
+    from_edges = SparseVirtualNetworkAllocation({
+        'edges': [(2, 1, 7), (0, 1, 10), (1, 0, 4), (1, 2, 0)], 'num_nodes': 3, 'demands': []
+    })
+    for allocator in (from_matrix, from_edges):
+        assert allocator.num_edges == 3
+        np.testing.assert_array_equal(_dense_residual(allocator), [[0, 10, 0], [4, 0, 0], [0, 7, 0]])
+        assert allocator.edge_id(1, 2) == -1
+        assert allocator.reverse_edge[allocator.edge_id(2, 1)] == -1
+        assert allocator.reverse_edge[allocator.edge_id(0, 1)] == allocator.edge_id(1, 0)
+
+    sparse = pytest.importorskip('scipy.sparse')
+    from_scipy = SparseVirtualNetworkAllocation({
+        'capacity_matrix': sparse.csr_matrix(np.array([[0, 10, 0], [4, 0, 0], [0, 7, 0]], dtype=float)),
+        'demands': []
+    })
+    np.testing.assert_array_equal(from_scipy.capacity_matrix, from_matrix.capacity_matrix)
+
+
+@pytest.mark.parametrize('seed', range(30))
+def test_paths_and_reachability_match_the_dense_backend(seed):
+    network = _random_network(seed)
+    dense = VirtualNetworkAllocation(network)
+    sparse = SparseVirtualNetworkAllocation(network)
+
+    np.testing.assert_array_equal(sparse.component_labels, dense.component_labels)
+    assert sparse.network_connected == dense.network_connected
+    assert sparse.total_links == dense.total_links
+    for u, v in _pairs(dense):
+        assert sparse.is_reachable(u, v) == dense.is_reachable(u, v)
+        assert sparse.find_all_paths(u, v) == dense.find_all_paths(u, v)
+        assert sparse.find_shortest_path(u, v, 6) == dense.find_shortest_path(u, v, 6)
+
+
+@pytest.mark.parametrize('seed', range(30))
+def test_allocations_leave_the_same_residual_capacities(seed):
+    network = _random_network(seed)
+    dense = VirtualNetworkAllocation(network)
+    sparse = SparseVirtualNetworkAllocation(network)
+    rng = random.Random(seed)
+
+    allocated = []
+    for _ in range(6):
+        u, v = rng.choice(_pairs(dense))
+        paths = dense.find_all_paths(u, v)
+        if not paths:
+            continue
+        path, bandwidth = rng.choice(paths), rng.choice([2, 4, 6])
+        assert sparse.can_allocate_path(path, bandwidth) == dense.can_allocate_path(path, bandwidth)
+        if dense.can_allocate_path(path, bandwidth):
+            dense.allocate_path(path, bandwidth)
+            sparse.allocate_path(path, bandwidth)
+            allocated.append((path, bandwidth))
+        np.testing.assert_array_equal(_dense_residual(sparse), dense.capacity_matrix * dense.adjacency_matrix)
+
+    # Releases restore every reverse arc of the original topology in both backends
+    for path, bandwidth in reversed(allocated):
+        dense.deallocate_path(path, bandwidth)
+        sparse.deallocate_path(path, bandwidth)
+        np.testing.assert_array_equal(_dense_residual(sparse), dense.capacity_matrix * dense.adjacency_matrix)
+
+
+@pytest.mark.parametrize('seed', range(30))
+def test_brute_force_matches_the_dense_backend(seed):
+    network = _random_network(seed)
+    dense = VirtualNetworkAllocation(network)
+    sparse = SparseVirtualNetworkAllocation(network)
+    dense_result = dense.offline_brute_force_allocation(use_tree_solver=False, decompose=False)
+    sparse_result = sparse.offline_brute_force_allocation(use_tree_solver=False, decompose=False)
+
+    for key in ('success', 'acceptance_ratio', 'allocated_demands', 'rejected_demands',
+                'total_revenue', 'total_cost', 'total_combinations_evaluated', 'valid_combinations'):
+        assert sparse_result.get(key) == dense_result.get(key)
+    np.testing.assert_array_equal(_dense_residual(sparse), dense.capacity_matrix * dense.adjacency_matrix)
+    status_keys = ('allocated_demands', 'rejected_demands', 'network_utilization', 'total_revenue')
+    assert ({key: sparse.get_network_status()[key] for key in status_keys}
+            == {key: dense.get_network_status()[key] for key in status_keys})
+
+
+def test_paths_over_missing_links_are_rejected():
+    chain = {'edges': [(0, 1, 10), (1, 0, 10), (1, 2, 10), (2, 1, 10), (2, 3, 10), (3, 2, 10)],
+             'num_nodes': 4, 'demands': []}
+    allocator = SparseVirtualNetworkAllocation(chain)
+    assert not allocator.can_allocate_path([0, 2, 3], 1)
+    with pytest.raises(ValueError, match='0 -> 2'):
+        allocator.allocate_path([0, 2, 3], 1)
+    with pytest.raises(ValueError, match='0 -> 2'):
+        allocator.deallocate_path([0, 2, 3], 1)
+    np.testing.assert_array_equal(allocator.capacity_matrix, allocator.original_capacity_matrix)
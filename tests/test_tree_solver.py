@@ -0,0 +1,109 @@
+import random
+
+import numpy as np
+import pytest
+
+from Allocation.allocation import VirtualNetworkAllocation
+from Allocation.sparse_allocation import SparseVirtualNetworkAllocation
+from Allocation.tree_solver import residual_forest, tree_allocation
+
+BACKENDS = [VirtualNetworkAllocation, SparseVirtualNetworkAllocation]
+
+
+def _random_tree(seed, chain=False, symmetric=True):
+    rng = random.Random(seed)
+    n = rng.randint(3, 8)
+    edges = []
+    for node in range(1, n):
+        parent = node - 1 if chain else rng.randrange(node)
+        capacity = rng.choice([5, 10, 20])
+        reverse = capacity if symmetric else rng.choice([0, 5, 10, 20])
+        edges.append((parent, node, capacity))
+        if reverse:
+            edges.append((node, parent, reverse))
+    demands = [rng.sample(range(n), 2) + [rng.choice([3, 5, 8])] for _ in range(rng.randint(2, 7))]
+    return {'edges': edges, 'num_nodes': n, 'demands': demands}
+
+
+@pytest.mark.parametrize('backend', BACKENDS)
+@pytest.mark.parametrize('chain', [False, True])
+@pytest.mark.parametrize('symmetric', [True, False])
+@pytest.mark.parametrize('seed', range(25))
+def test_tree_dp_matches_the_brute_force(backend, chain, symmetric, seed):
+    network = _random_tree(seed, chain, symmetric)
+    allocator = backend(network)
+    result = tree_allocation(allocator)
+    expected = backend(network).offline_brute_force_allocation(use_tree_solver=False)
+
+    assert result['solver'] == 'tree_dp'
+    # Same scenario as the enumeration, ties included
+    for key in ('success', 'allocated_demands', 'rejected_demands'):
+        assert result[key] == expected[key]
+    if expected['success']:
+        for key in ('total_revenue', 'total_cost', 'acceptance_ratio'):
+            assert result[key] == expected[key]
+        assert result['total_combinations_evaluated'] == result['valid_combinations'] == result['dp_states']
+
+    # The allocator ends up as if the chosen paths were reserved in demand order
+    replay = backend(network)
+    for k, path in result['allocated_demands']:
+        assert replay.can_allocate_path(path, replay.demands[k].bandwidth)
+        replay.allocate_path(path, replay.demands[k].bandwidth)
+    np.testing.assert_array_equal(allocator.capacity_matrix, replay.capacity_matrix)
+    assert allocator.allocation_paths == dict(result['allocated_demands'])
+
+
+@pytest.mark.parametrize('backend', BACKENDS)
+@pytest.mark.parametrize('seed', range(10))
+def test_tree_dp_matches_the_bounded_brute_force(backend, seed):
+    network = _random_tree(seed, symmetric=False)
+    bound = len(network['demands'])
+    result = backend(network).offline_brute_force_allocation(upper_bound=bound)
+    expected = backend(network).offline_brute_force_allocation(upper_bound=bound, use_tree_solver=False)
+    assert result['solver'] == 'tree_dp'
+    for key in ('allocated_demands', 'rejected_demands', 'total_revenue', 'total_cost'):
+        assert result.get(key) == expected.get(key)
+
+
+@pytest.mark.parametrize('backend', BACKENDS)
+def test_ties_are_broken_as_the_enumeration_does(backend):
+    # Either demand fills the chain: the enumeration rejects demand 0 first
+    chain = {'edges': [(0, 1, 10), (1, 0, 10), (1, 2, 10), (2, 1, 10), (2, 3, 10), (3, 2, 10)],
+             'num_nodes': 4, 'demands': [[0, 1, 10], [0, 3, 10]]}
+    for bound, kept in ((None, 1), (2, 0)):
+        result = backend(chain).offline_brute_force_allocation(upper_bound=bound)
+        expected = backend(chain).offline_brute_force_allocation(upper_bound=bound, use_tree_solver=False)
+        assert result['solver'] == 'tree_dp'
+        assert [k for k, _ in result['allocated_demands']] == [kept]
+        assert result['allocated_demands'] == expected['allocated_demands']
+        assert result['total_revenue'] == expected['total_revenue']
+
+
+@pytest.mark.parametrize('backend', BACKENDS)
+def test_cycles_fall_back_to_the_brute_force(backend):
+    ring = {'capacity_matrix': [[0, 10, 10], [10, 0, 10], [10, 10, 0]], 'demands': [[0, 1, 4]]}
+    assert residual_forest(backend(ring)) is None
+    assert tree_allocation(backend(ring)) is None
+    assert 'solver' not in backend(ring).offline_brute_force_allocation()
+
+
+@pytest.mark.parametrize('backend', BACKENDS)
+def test_saturated_links_leave_a_forest(backend):
+    # Once 0-2 has no residual capacity the remaining links form the chain 2-1-0
+    ring = {'capacity_matrix': [[0, 10, 10], [10, 0, 10], [10, 10, 0]], 'demands': [[0, 2, 4], [1, 2, 5]]}
+    allocator = backend(ring)
+    allocator.allocate_path([0, 2], 10)
+    assert residual_forest(allocator) is not None
+    result = allocator.offline_brute_force_allocation()
+    assert result['solver'] == 'tree_dp'
+    assert result['allocated_demands'] == [(0, [0, 1, 2]), (1, [1, 2])]
+
+
+def test_state_limit_gives_up_without_reserving():
+    network = _random_tree(3, chain=True)
+    allocator = VirtualNetworkAllocation(network)
+    assert tree_allocation(allocator, max_states=0) is None
+    # Nothing is reserved when the DP gives up
+    assert allocator.allocation_paths == {}
+    np.testing.assert_array_equal(allocator.capacity_matrix, allocator.original_capacity_matrix)
+    assert tree_allocation(allocator)['solver'] == 'tree_dp'